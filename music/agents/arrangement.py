@@ -0,0 +1,156 @@
+# Rhythm and arrangement engine: jianpu melody -> multi-track PrettyMIDI (melody, chord pad, bass).
+from typing import Optional
+
+import numpy as np
+import pretty_midi
+
+import pitch
+import score
+import synth
+
+PAD_PROGRAM = 48   # String Ensemble 1
+BASS_PROGRAM = 32  # Acoustic Bass
+
+PAD_LOW = 53       # lowest note of a pad voicing (F3)
+BASS_LOW = 36      # lowest bass root (C2)
+
+MODES = ("major", "minor")
+SCALES = {"major": pitch.MAJOR_INTERVALS, "minor": pitch.MINOR_INTERVALS}
+
+# Diatonic triad on each degree: semitone offsets of (root, third, fifth) from the tonic.
+TRIADS = {
+    mode: np.stack([np.take(np.r_[scale, scale + 12], [d, d + 2, d + 4]) for d in range(7)])
+    for mode, scale in SCALES.items()
+}  # mode -> (7, 3)
+
+# Chord preference per degree (I, IV, V strongest; vii° weakest), added to the fit score.
+DEGREE_PRIOR = {
+    "major": np.array([0.30, 0.05, 0.05, 0.20, 0.25, 0.10, 0.00]),
+    "minor": np.array([0.30, 0.00, 0.10, 0.20, 0.25, 0.10, 0.05]),
+}
+
+
+def _voicing(pcs: np.ndarray, low: int) -> np.ndarray:
+    # Closest-position voicing of the given pitch classes, all notes in [low, low + 12).
+    return np.sort(low + (pcs - low) % 12)
+
+
+def _build_tables():
+    # (mode, tonic, degree) -> chord-tone mask over pitch classes, pad voicing and bass root.
+    masks = np.zeros((2, 12, 7, 12))
+    pads = np.zeros((2, 12, 7, 3), dtype=np.int64)
+    bass = np.zeros((2, 12, 7), dtype=np.int64)
+    for m, mode in enumerate(MODES):
+        for tonic in range(12):
+            for d in range(7):
+                pcs = (tonic + TRIADS[mode][d]) % 12
+                masks[m, tonic, d, pcs] = 1.0
+                pads[m, tonic, d] = _voicing(pcs, PAD_LOW)
+                bass[m, tonic, d] = BASS_LOW + pcs[0]
+    return masks, pads, bass
+
+
+CHORD_MASKS, PAD_VOICINGS, BASS_ROOTS = _build_tables()
+
+
+def choose_chords(
+    pitches: np.ndarray,
+    onsets: np.ndarray,
+    durations: np.ndarray,
+    tonic_pc: int,
+    mode: str,
+    chord_beats: float,
+    n_chords: int,
+) -> np.ndarray:
+    # Scale degree (0..6) per chord slot: duration-weighted melody pitch classes vs chord-tone masks.
+    voiced = pitches != score.REST
+    slot = np.minimum((onsets[voiced] // chord_beats).astype(np.int64), n_chords - 1)
+    hist = np.zeros((n_chords, 12))
+    np.add.at(hist, (slot, pitches[voiced] % 12), durations[voiced])
+    masks = CHORD_MASKS[MODES.index(mode), tonic_pc]  # (7, 12)
+    fit = hist @ masks.T / np.maximum(hist.sum(axis=1, keepdims=True), 1e-9)  # (n_chords, 7)
+    # Slots with only rests keep the previous chord; leading ones get the tonic.
+    degrees = np.argmax(fit + DEGREE_PRIOR[mode], axis=1)
+    last = np.where(hist.sum(axis=1) > 0, np.arange(n_chords), -1)
+    np.maximum.accumulate(last, out=last)
+    return np.where(last >= 0, degrees[np.maximum(last, 0)], 0)
+
+
+def _add_notes(inst: pretty_midi.Instrument, pitches, starts, ends, velocity: int):
+    inst.notes.extend(
+        pretty_midi.Note(velocity=velocity, pitch=int(p), start=float(s), end=float(e))
+        for p, s, e in zip(pitches, starts, ends)
+    )
+
+
+def arrange(
+    notation,
+    bpm: int = 90,
+    note_len_beats: float = 0.5,
+    style: str = "straight",
+    program: int = 0,
+    accompaniment: bool = True,
+    beats_per_bar: int = 4,
+    chord_beats: Optional[float] = None,
+    swing_ratio: float = 2 / 3,
+    tonic_midi: int = 60,
+) -> pretty_midi.PrettyMIDI:
+    """
+    Build a PrettyMIDI arrangement of a jianpu melody.
+    - notation: jianpu text, or a score (score.SCORE_DTYPE) parsed with 1-beat slots
+    - melody: one note per token, note_len_beats long; rests keep their slot
+    - pads: a diatonic triad per chord slot (one bar by default), chosen from the
+      melody notes under it in the key estimated by pitch.estimate_key_ks
+    - bass: chord root on every strong beat (beats 1 and 3 in 4/4)
+    - style="swing": melody note times go through synth.swing_times (off-beat eighths
+      land at swing_ratio of the beat), so the MIDI itself swings on every renderer
+    Chord shapes, voicings and bass roots come from tables built at import time, so
+    the per-tune work is a handful of array operations.
+    """
+    beat = 60.0 / float(bpm)
+    if isinstance(notation, str):
+        notation = score.parse_jianpu(notation, tonic_midi)
+    melody_score = score.stretch(notation, note_len_beats)
+    pitches = melody_score["pitch"].astype(np.int64)
+    onsets = melody_score["onset"]  # in beats
+    durations = melody_score["duration"]
+    total_beats = float((onsets + durations).max()) if pitches.size else 0.0
+
+    def to_seconds(beats: np.ndarray) -> np.ndarray:
+        seconds = np.asarray(beats, dtype=np.float64) * beat
+        return synth.swing_times(seconds, bpm, swing_ratio) if style == "swing" else seconds
+
+    pm = pretty_midi.PrettyMIDI(initial_tempo=bpm)
+
+    melody = pretty_midi.Instrument(program=program, name="melody")
+    voiced = pitches != score.REST
+    _add_notes(melody, pitches[voiced], to_seconds(onsets[voiced]), to_seconds(onsets[voiced] + durations[voiced]), 90)
+    pm.instruments.append(melody)
+
+    if not accompaniment or not voiced.any():
+        return pm
+
+    tonic_pc, mode, _ = pitch.estimate_key_ks(pitches[voiced].astype(float))
+    chord_beats = float(chord_beats or beats_per_bar)
+    n_chords = max(1, int(np.ceil(total_beats / chord_beats)))
+    degrees = choose_chords(pitches, onsets, durations, tonic_pc, mode, chord_beats, n_chords)
+    m = MODES.index(mode)
+
+    # Pads: each chord slot's voicing, held for the slot.
+    slot_start = np.arange(n_chords) * chord_beats
+    slot_end = np.minimum(slot_start + chord_beats, total_beats)
+    voicings = PAD_VOICINGS[m, tonic_pc, degrees]  # (n_chords, 3)
+    pad = pretty_midi.Instrument(program=PAD_PROGRAM, name="pad")
+    _add_notes(pad, voicings.ravel(), np.repeat(slot_start * beat, 3), np.repeat(slot_end * beat, 3), 55)
+    pm.instruments.append(pad)
+
+    # Bass: chord root on the strong beats (every half bar).
+    step = beats_per_bar / 2
+    bass_start = np.arange(0.0, total_beats, step)
+    bass_end = np.minimum(bass_start + step, total_beats)
+    roots = BASS_ROOTS[m, tonic_pc, degrees[np.minimum((bass_start // chord_beats).astype(np.int64), n_chords - 1)]]
+    bass = pretty_midi.Instrument(program=BASS_PROGRAM, name="bass")
+    _add_notes(bass, roots, bass_start * beat, bass_end * beat, 75)
+    pm.instruments.append(bass)
+    return pm
+
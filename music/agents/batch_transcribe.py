@@ -0,0 +1,314 @@
+# Batch transcription: run the pitch pipeline over a directory of recordings and report timings.
+#
+# Usage:
+#   python synth_corpus.py corpus/ --count 20
+#   python batch_transcribe.py corpus/ --out out/ --workers 4 --report out/report.json
+#
+# Writes <name>.jianpu.txt and <name>.mid per recording. If a <name>.json ground-truth
+# sidecar (as written by synth_corpus.py) sits next to a recording, note accuracy is
+# reported as well.
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+
+import pitch
+
+AUDIO_EXTENSIONS = {
+    ".wav": "audio/wav",
+    ".flac": "audio/flac",
+    ".ogg": "audio/ogg",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".webm": "audio/webm",
+}
+
+STAGES = ("load", "f0", "jianpu", "midi")
+
+# Same defaults as MusicAgent.analysis_params.
+DEFAULT_PARAMS = {
+    "bpm": 90,
+    "fmin": "C2",
+    "fmax": "C6",
+    "frame_length": 2048,
+    "hop_length": 256,
+    "rms_floor": 0.02,
+    "rms_ratio": 0.2,
+    "min_run_frames": 3,
+    "f0_backend": "pyin",
+    "gate": True,
+    "analysis": "frames",
+}
+
+
+def find_recordings(in_dir: str) -> List[Path]:
+    return sorted(p for p in Path(in_dir).rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    # Peak RSS of this process; None where the resource module is missing (Windows).
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _edit_distance(a: List[int], b: List[int]) -> int:
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, y in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y))
+        prev = cur
+    return prev[-1]
+
+
+def note_accuracy(jianpu: str, truth_midi: List[int]) -> Optional[float]:
+    """
+    1 - (edit distance / reference length) over the melodic intervals.
+    - The transcription is read the way jianpu_to_midi renders it, so this scores the MIDI users get
+    - Intervals make the score independent of the detected key and octave
+    - Consecutive repeats are merged on both sides, as the pipeline cannot split a held pitch
+    """
+    notes = [pitch.jianpu_token_to_midi(t, 60) for t in jianpu.split()]
+    got = [n for n in notes if n is not None]
+    ref = list(truth_midi)
+    got = [n for i, n in enumerate(got) if i == 0 or n != got[i - 1]]
+    ref = [n for i, n in enumerate(ref) if i == 0 or n != ref[i - 1]]
+    if len(ref) < 2:
+        return None
+    got_iv = np.diff(got).tolist() if len(got) > 1 else []
+    ref_iv = np.diff(ref).tolist()
+    return max(0.0, 1.0 - _edit_distance(got_iv, ref_iv) / len(ref_iv))
+
+
+def _analyze_frames(y: np.ndarray, sr: int, params: dict, timings: dict) -> tuple:
+    # Frame-level path of pitch.transcribe, timed per stage.
+    t0 = time.perf_counter()
+    rms = pitch.compute_rms(y, frame_length=params["frame_length"], hop_length=params["hop_length"])
+    thr = pitch.adaptive_rms_threshold(rms, floor=params["rms_floor"], ratio=params["rms_ratio"])
+    f0_params = dict(
+        fmin=params["fmin"],
+        fmax=params["fmax"],
+        frame_length=params["frame_length"],
+        hop_length=params["hop_length"],
+        backend=params["f0_backend"],
+    )
+    if params["gate"]:
+        f0, _, _ = pitch.estimate_f0_gated(y, sr, rms >= thr, **f0_params)
+    else:
+        f0, _, _ = pitch.estimate_f0(y, sr, **f0_params)
+    f0[rms < thr] = float("nan")
+    timings["f0"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    # f0_to_jianpu prints key diagnostics per call; keep worker output to the report.
+    with contextlib.redirect_stdout(io.StringIO()):
+        jianpu = pitch.f0_to_jianpu(f0, min_run_frames=params["min_run_frames"])
+    timings["jianpu"] = time.perf_counter() - t0
+
+    return jianpu, int(len(f0))
+
+
+def _analyze_notes(y: np.ndarray, sr: int, params: dict, timings: dict) -> tuple:
+    # Coarse-to-fine path of pitch.transcribe(analysis="notes"); hop_length is the fine resolution.
+    t0 = time.perf_counter()
+    notes = pitch.analyze_notes(
+        y, sr,
+        fmin=params["fmin"],
+        fmax=params["fmax"],
+        frame_length=params["frame_length"],
+        fine_hop=params["hop_length"],
+        rms_floor=params["rms_floor"],
+        rms_ratio=params["rms_ratio"],
+        backend=params["f0_backend"],
+    )
+    timings["f0"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    jianpu = pitch.notes_to_jianpu(notes)
+    timings["jianpu"] = time.perf_counter() - t0
+    # Frames at the fine hop after resampling, so frames/s compares with the frame-level path.
+    n_frames = int(len(y) * pitch.TARGET_SR / sr) // params["hop_length"] + 1 if sr else 0
+    return jianpu, n_frames
+
+
+def process_recording(path: str, out_dir: str, params: dict, decoder: str = "memory") -> dict:
+    # Worker job: one recording through load -> f0 -> jianpu -> midi, timing each stage.
+    path = Path(path)
+    out = Path(out_dir)
+    timings = {}
+
+    t0 = time.perf_counter()
+    if decoder == "file":
+        y, sr = pitch.load_audio(str(path))
+    else:
+        y, sr = pitch.load_audio_bytes(path.read_bytes(), AUDIO_EXTENSIONS[path.suffix.lower()])
+    timings["load"] = time.perf_counter() - t0
+
+    if params["analysis"] == "notes":
+        jianpu, n_frames = _analyze_notes(y, sr, params, timings)
+    elif params["analysis"] == "frames":
+        jianpu, n_frames = _analyze_frames(y, sr, params, timings)
+    else:
+        raise ValueError(f"Unknown analysis mode: {params['analysis']}")
+
+    t0 = time.perf_counter()
+    (out / f"{path.stem}.jianpu.txt").write_text(jianpu + "\n", encoding="utf-8")
+    pitch.jianpu_to_midi_file(jianpu, str(out / f"{path.stem}.mid"), tonic_midi=60, bpm=params["bpm"])
+    timings["midi"] = time.perf_counter() - t0
+
+    result = {
+        "file": path.name,
+        "audio_s": len(y) / sr if sr else 0.0,
+        "frames": n_frames,
+        "tokens": len(jianpu.split()),
+        "timings": timings,
+        "worker_pid": os.getpid(),
+        "worker_peak_rss_mb": _peak_rss_mb(),
+    }
+
+    truth_path = path.with_suffix(".json")
+    if truth_path.exists():
+        try:
+            truth = json.loads(truth_path.read_text(encoding="utf-8"))
+            result["accuracy"] = note_accuracy(jianpu, truth["midi"])
+        except (ValueError, KeyError) as e:
+            result["accuracy_error"] = str(e)
+    return result
+
+
+def run_batch(
+    in_dir: str,
+    out_dir: str,
+    workers: Optional[int] = None,
+    decoder: str = "memory",
+    params: Optional[dict] = None,
+) -> dict:
+    # Fan recordings out over a process pool and aggregate the per-file results.
+    files = find_recordings(in_dir)
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+
+    results, errors = [], []
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        futures = {ex.submit(process_recording, str(p), out_dir, params, decoder): p for p in files}
+        for fut in as_completed(futures):
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                errors.append({"file": futures[fut].name, "error": f"{type(e).__name__}: {e}"})
+    wall = time.perf_counter() - t_start
+
+    results.sort(key=lambda r: r["file"])
+    stage_totals = {s: sum(r["timings"][s] for r in results) for s in STAGES}
+    frames = sum(r["frames"] for r in results)
+    audio_s = sum(r["audio_s"] for r in results)
+    accs = [r["accuracy"] for r in results if r.get("accuracy") is not None]
+    worker_rss = {r["worker_pid"]: r["worker_peak_rss_mb"] for r in results}
+
+    return {
+        "files": len(files),
+        "ok": len(results),
+        "errors": errors,
+        "workers": workers,
+        "decoder": decoder,
+        "params": params,
+        "wall_s": wall,
+        "audio_s": audio_s,
+        "realtime_factor": audio_s / wall if wall else 0.0,
+        "frames": frames,
+        "frames_per_s": frames / wall if wall else 0.0,
+        "f0_frames_per_worker_s": frames / stage_totals["f0"] if stage_totals["f0"] else 0.0,
+        "stage_worker_s": stage_totals,
+        "peak_rss_mb": {
+            "parent": _peak_rss_mb(),
+            "worker_max": max((v for v in worker_rss.values() if v is not None), default=None),
+        },
+        "accuracy_mean": float(np.mean(accs)) if accs else None,
+        "accuracy_min": float(np.min(accs)) if accs else None,
+        "results": results,
+    }
+
+
+def print_report(report: dict):
+    print(
+        f"{report['ok']}/{report['files']} recordings, {report['audio_s']:.1f}s audio, "
+        f"{report['workers']} workers, decoder={report['decoder']}, "
+        f"f0={report['params']['f0_backend']}, analysis={report['params']['analysis']}"
+    )
+    print(
+        f"wall {report['wall_s']:.2f}s   x{report['realtime_factor']:.1f} realtime   "
+        f"{report['frames_per_s']:,.0f} frames/s   (f0: {report['f0_frames_per_worker_s']:,.0f} frames per worker-s)"
+    )
+    total = sum(report["stage_worker_s"].values()) or 1.0
+    for stage, t in report["stage_worker_s"].items():
+        print(f"  {stage:<7} {t:8.2f}s  {100 * t / total:5.1f}%")
+    rss = report["peak_rss_mb"]
+    if rss["parent"] is None:
+        print("peak RSS: n/a on this platform")
+    else:
+        print(f"peak RSS: parent {rss['parent']:.0f} MB, worker max {rss['worker_max']:.0f} MB")
+    if report["accuracy_mean"] is not None:
+        print(f"note accuracy: mean {report['accuracy_mean']:.3f}, min {report['accuracy_min']:.3f}")
+    for err in report["errors"]:
+        print(f"  FAILED {err['file']}: {err['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch Jianpu/MIDI transcription with a timing report")
+    parser.add_argument("in_dir", help="directory of recordings (searched recursively)")
+    parser.add_argument("--out", default="batch_out", help="output directory for .jianpu.txt/.mid files")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--decoder", choices=("memory", "file"), default="memory",
+        help="memory: load_audio_bytes (as MusicAgent); file: load_audio (pydub + temp WAV)",
+    )
+    parser.add_argument("--bpm", type=int, default=DEFAULT_PARAMS["bpm"])
+    parser.add_argument("--hop-length", type=int, default=DEFAULT_PARAMS["hop_length"])
+    parser.add_argument("--f0-backend", choices=sorted(pitch.F0_BACKENDS), default=DEFAULT_PARAMS["f0_backend"])
+    parser.add_argument("--no-gate", action="store_true", help="run F0 on silent frames too")
+    parser.add_argument(
+        "--analysis", choices=("frames", "notes"), default=DEFAULT_PARAMS["analysis"],
+        help="frames: frame-level F0 -> Jianpu; notes: coarse-to-fine note segmentation",
+    )
+    parser.add_argument("--report", default=None, help="write the full report as JSON here")
+    args = parser.parse_args()
+
+    report = run_batch(
+        args.in_dir,
+        args.out,
+        workers=args.workers,
+        decoder=args.decoder,
+        params={
+            "bpm": args.bpm,
+            "hop_length": args.hop_length,
+            "f0_backend": args.f0_backend,
+            "gate": not args.no_gate,
+            "analysis": args.analysis,
+        },
+    )
+    print_report(report)
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
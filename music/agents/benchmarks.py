@@ -0,0 +1,521 @@
+# Micro-benchmarks for the pitch pipeline.
+#
+# Benchmarks time the optimized code paths against reference implementations
+# (the original per-frame loops). The equivalence checks against the same
+# references live in music/tests.
+#
+# Usage:
+#   python benchmarks.py key --frames 200000
+#   python benchmarks.py smooth --frames 200000 --win 7
+#   python benchmarks.py load --seconds 30 --sr 48000
+#   python benchmarks.py f0 --count 8
+#   python benchmarks.py gate --count 6
+#   python benchmarks.py multires --count 6 --sr 48000
+#   python benchmarks.py synth --minutes 3 --voices 3
+#   python benchmarks.py arrange --minutes 5
+#   python benchmarks.py react --events 100000
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import re
+import types
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+import librosa
+import pretty_midi
+
+import arrangement
+import pitch
+import synth
+import synth_corpus
+from batch_transcribe import note_accuracy
+
+
+def _timeit(fn: Callable, repeat: int = 3) -> float:
+    # Best-of-N wall time in seconds.
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def synthetic_f0(n_frames: int, seed: int = 0, rest_ratio: float = 0.3) -> np.ndarray:
+    # Random-walk melody in Hz, held for a few frames per note, with NaN rests.
+    rng = np.random.default_rng(seed)
+    n_notes = max(1, n_frames // 12)
+    steps = rng.choice([-2, -1, 0, 1, 2, 3, -3], size=n_notes)
+    midi = np.clip(60 + np.cumsum(steps), 45, 80)
+    lengths = rng.integers(2, 22, size=n_notes)
+    frames = np.repeat(midi, lengths)[:n_frames].astype(float)
+    if frames.size < n_frames:
+        frames = np.pad(frames, (0, n_frames - frames.size), mode="edge")
+    frames += rng.normal(0, 0.15, size=n_frames)  # vibrato / tracking noise
+    f0 = librosa.midi_to_hz(frames)
+    f0[rng.random(n_frames) < rest_ratio] = np.nan
+    return f0
+
+
+# ---------------------------------------------------------------------------
+# Reference implementations (pre-vectorization)
+# ---------------------------------------------------------------------------
+
+def reference_estimate_key_ks(midi_notes: np.ndarray):
+    midi_int = np.round(midi_notes).astype(int)
+    pc = np.mod(midi_int, 12)
+    hist = np.bincount(pc, minlength=12).astype(float)
+    if hist.sum() == 0:
+        return 0, "major", 0.0
+    hist = hist / (hist.sum() + 1e-9)
+
+    best_score = -1e18
+    best_tonic = 0
+    best_mode = "major"
+    for t in range(12):
+        s_major = float(np.dot(hist, np.roll(pitch.KS_MAJOR, t)))
+        s_minor = float(np.dot(hist, np.roll(pitch.KS_MINOR, t)))
+        if s_major > best_score:
+            best_score, best_tonic, best_mode = s_major, t, "major"
+        if s_minor > best_score:
+            best_score, best_tonic, best_mode = s_minor, t, "minor"
+    return best_tonic, best_mode, best_score
+
+
+def reference_f0_symbols(f0: np.ndarray, min_run_frames: int = 3) -> List[str]:
+    # Original frame loop of f0_to_jianpu (before limit_rests).
+    midi_voiced = librosa.hz_to_midi(f0[~np.isnan(f0)])
+    midi_int = np.round(midi_voiced).astype(int)
+    tonic_pc, mode, _ = reference_estimate_key_ks(midi_voiced)
+    tonic_midi = pitch.pick_tonic_midi(tonic_pc, midi_int)
+
+    symbols: List[str] = []
+    it = iter(midi_int.tolist())
+    for v in f0:
+        if np.isnan(v):
+            symbols.append("0")
+        else:
+            symbols.append(pitch.midi_to_jianpu_symbol(int(next(it)), tonic_midi, mode))
+    return pitch.compress_symbols(symbols, min_len=min_run_frames)
+
+
+def reference_smooth_midi(midi: np.ndarray, win: int = 7) -> np.ndarray:
+    # Original per-frame np.median loop.
+    if len(midi) < win:
+        return midi
+    half = win // 2
+    sm = midi.copy()
+    for i in range(half, len(midi) - half):
+        sm[i] = np.median(midi[i - half : i + half + 1])
+    return sm
+
+
+def reference_agent_decode(file_bytes: bytes, suffix: str = ".wav"):
+    # Old MusicAgent path: bytes -> mkstemp file -> pitch.load_audio (pydub -> temp WAV -> librosa).
+    fd, tmp_path = tempfile.mkstemp(prefix="cache_in_", suffix=suffix)
+    os.close(fd)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(file_bytes)
+        return pitch.load_audio(tmp_path)
+    finally:
+        os.remove(tmp_path)
+
+
+def reference_f0_to_jianpu(f0: np.ndarray, min_run_frames: int = 3) -> str:
+    symbols = reference_f0_symbols(f0, min_run_frames)
+    return " ".join(pitch.limit_rests(symbols, max_rest_ratio=0.2))
+
+
+def reference_parse_controls(text: str) -> dict:
+    # Original SoundRenderAgent._parse_soundrender_controls (inline patterns, per-line split).
+    updates = {}
+    for p in re.split(r"[\n,]+", text.strip()):
+        for m in re.finditer(r"([a-zA-Z_]+)\s*[:：]\s*([^\s,]+)", p):
+            k, v = m.group(1).strip().lower(), m.group(2).strip()
+            if k in ("instrument", "instr"):
+                updates["instrument"] = v.lower()
+            elif k in ("bpm", "tempo", "temple"):
+                try:
+                    updates["bpm"] = int(float(v))
+                except ValueError:
+                    pass
+            elif k in ("notelen", "note_len", "note_len_beats", "notelenbeats", "len"):
+                try:
+                    updates["noteLen"] = float(v)
+                except ValueError:
+                    pass
+            elif k in ("style", "beat"):
+                updates["style"] = v.lower()
+            elif k in ("accompaniment", "accomp", "backing"):
+                updates["accompaniment"] = v.lower() not in ("off", "no", "false", "0", "none")
+    return updates
+
+
+def reference_react_prologue(event, agent_id: str, extract_text: Callable) -> bool:
+    # Original per-event work in SoundRenderAgent.react before it decided to act; True if it would act.
+    payload = event.payload or {}
+    print("payload", payload)
+    source = payload.get("source_id") or payload.get("sender_id") or payload.get("senderId")
+    if source == agent_id:
+        return False
+    text = extract_text(payload) or extract_text(getattr(event, "__dict__", {}) or {})
+    if not text:
+        text = extract_text({"payload": payload})
+    if not text:
+        return False
+    lower = text.strip().lower()
+    played = re.search(r"click to play", lower)
+    has_control = re.search(
+        r"\b(instrument|bpm|tempo|temple|notelen|note_len|note_len_beats|notelenbeats|style|beat|accompaniment|accomp|backing)\s*[:：]",
+        lower,
+    )
+    return bool(has_control and not played) or "@soundrender" in lower or "soundrender" in lower
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_key(n_frames: int, repeat: int):
+    # Key estimation + frame->Jianpu mapping, reference loop vs batched path.
+    f0 = synthetic_f0(n_frames)
+    midi_voiced = librosa.hz_to_midi(f0[~np.isnan(f0)])
+
+    # f0_to_jianpu prints key diagnostics; keep them out of the timing output.
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_ref = _timeit(lambda: reference_f0_to_jianpu(f0), repeat)
+        t_new = _timeit(lambda: pitch.f0_to_jianpu(f0), repeat)
+
+    t_key_ref = _timeit(lambda: reference_estimate_key_ks(midi_voiced), repeat)
+    t_key_new = _timeit(lambda: pitch.estimate_key_ks(midi_voiced), repeat)
+
+    print(f"frames: {n_frames}")
+    print(f"estimate_key_ks   ref {t_key_ref * 1e3:8.2f} ms   new {t_key_new * 1e3:8.2f} ms")
+    print(
+        f"f0_to_jianpu      ref {n_frames / t_ref:12,.0f} frames/s   "
+        f"new {n_frames / t_new:12,.0f} frames/s   x{t_ref / t_new:.1f}"
+    )
+
+
+def bench_smooth(n_frames: int, win: int, repeat: int):
+    # smooth_midi: per-frame np.median loop vs strided windows.
+    midi = librosa.hz_to_midi(synthetic_f0(n_frames, rest_ratio=0.0))
+    t_ref = _timeit(lambda: reference_smooth_midi(midi, win), 1)
+    t_new = _timeit(lambda: pitch.smooth_midi(midi, win), repeat)
+
+    print(f"frames: {n_frames}  win: {win}")
+    print(
+        f"smooth_midi       ref {n_frames / t_ref:12,.0f} frames/s   "
+        f"new {n_frames / t_new:12,.0f} frames/s   x{t_ref / t_new:.1f}"
+    )
+
+
+def _proc_io() -> dict:
+    # Linux per-process I/O counters (bytes through read/write syscalls, syscall counts).
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+
+def _measure_io(fn: Callable):
+    before = _proc_io()
+    t0 = time.perf_counter()
+    out = fn()
+    wall = time.perf_counter() - t0
+    after = _proc_io()
+    delta = {k: after[k] - before[k] for k in after} if before else {}
+    return out, wall, delta
+
+
+def bench_load(seconds: float, native_sr: int):
+    # Disk I/O and wall time of the agent's decode step, temp-file path vs in-memory path.
+    import soundfile as sf
+
+    t = np.arange(int(seconds * native_sr)) / native_sr
+    y = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    buf = io.BytesIO()
+    sf.write(buf, y, native_sr, format="WAV", subtype="PCM_16")
+    wav_bytes = buf.getvalue()
+
+    (y_old, sr_old), t_old, io_old = _measure_io(lambda: reference_agent_decode(wav_bytes))
+    (y_new, sr_new), t_new, io_new = _measure_io(lambda: pitch.load_audio_bytes(wav_bytes, "audio/wav"))
+
+    print(f"input: {len(wav_bytes):,} bytes WAV, {seconds:.0f}s @ {native_sr} Hz")
+    for name, wall, d, sr in (("temp files", t_old, io_old, sr_old), ("in-memory ", t_new, io_new, sr_new)):
+        if d:
+            print(
+                f"{name}  {wall * 1e3:8.1f} ms   written {d['wchar']:>12,} B ({d['syscw']} writes)   "
+                f"read {d['rchar']:>12,} B ({d['syscr']} reads)   -> {sr} Hz"
+            )
+        else:
+            print(f"{name}  {wall * 1e3:8.1f} ms   (no /proc/self/io on this platform)   -> {sr} Hz")
+
+
+def bench_f0(count: int, seed: int, backends: List[str]):
+    # Speed vs note accuracy of the F0 backends, through the full transcribe() pipeline.
+    rng = np.random.default_rng(seed)
+    sr = pitch.TARGET_SR
+    hums = []
+    for _ in range(count):
+        midi = synth_corpus.random_melody(int(rng.integers(8, 32)), rng)
+        hums.append((midi, synth_corpus.render_hum(midi, sr=sr, rng=rng)))
+    audio_s = sum(len(y) for _, y in hums) / sr
+
+    print(f"{count} synthetic hums, {audio_s:.1f}s audio")
+    for backend in backends:
+        pitch.estimate_f0(hums[0][1][:sr], sr, backend=backend)  # warm up (numba / FFT plans)
+        accs, t_f0 = [], 0.0
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for midi, y in hums:
+                t1 = time.perf_counter()
+                pitch.estimate_f0(y, sr, backend=backend)
+                t_f0 += time.perf_counter() - t1
+                jianpu, _ = pitch.transcribe(y, sr, f0_backend=backend)
+                accs.append(note_accuracy(jianpu, midi))
+        t_total = time.perf_counter() - t0 - t_f0  # transcribe() only
+        print(
+            f"{backend:<6} f0 {t_f0:7.2f}s  (x{audio_s / t_f0:6.1f} realtime)   "
+            f"transcribe {t_total:7.2f}s   accuracy mean {np.mean(accs):.3f} min {np.min(accs):.3f}"
+        )
+
+
+def bench_gate(count: int, seed: int, backends: List[str]):
+    # transcribe() with and without voiced-segment gating on hums with long pauses.
+    rng = np.random.default_rng(seed)
+    sr = pitch.TARGET_SR
+    hums = []
+    for _ in range(count):
+        midi = synth_corpus.random_melody(int(rng.integers(8, 24)), rng)
+        hums.append(synth_corpus.render_hum(midi, sr=sr, rng=rng, gap_sec=(0.2, 1.5), lead_silence=1.0))
+    audio_s = sum(len(y) for y in hums) / sr
+    rms = [pitch.compute_rms(y) for y in hums]
+    active = np.concatenate([r >= pitch.adaptive_rms_threshold(r) for r in rms])
+
+    print(f"{count} synthetic hums, {audio_s:.1f}s audio, {100 * (1 - active.mean()):.0f}% of frames below the RMS gate")
+    for backend in backends:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pitch.transcribe(hums[0][:sr], sr, f0_backend=backend)  # warm up
+            t_full, t_gated = 0.0, 0.0
+            for y in hums:
+                t0 = time.perf_counter()
+                pitch.transcribe(y, sr, f0_backend=backend, gate=False)
+                t1 = time.perf_counter()
+                pitch.transcribe(y, sr, f0_backend=backend, gate=True)
+                t_gated += time.perf_counter() - t1
+                t_full += t1 - t0
+        print(f"{backend:<6} full {t_full:7.2f}s   gated {t_gated:7.2f}s   x{t_full / t_gated:.2f}")
+
+
+def bench_multires(count: int, seed: int, native_sr: int):
+    # Frame-level transcription vs coarse-to-fine note analysis, on uploads at native_sr.
+    rng = np.random.default_rng(seed)
+    hums = []
+    for _ in range(count):
+        midi = synth_corpus.random_melody(int(rng.integers(8, 32)), rng)
+        y = synth_corpus.render_hum(midi, sr=pitch.TARGET_SR, rng=rng)
+        hums.append((midi, librosa.resample(y, orig_sr=pitch.TARGET_SR, target_sr=native_sr)))
+    audio_s = sum(len(y) for _, y in hums) / native_sr
+
+    print(f"{count} synthetic hums, {audio_s:.1f}s audio @ {native_sr} Hz")
+    runs = [
+        ("frames", "yin", {"analysis": "frames", "f0_backend": "yin"}),
+        ("notes", "yin", {"analysis": "notes", "f0_backend": "yin"}),
+        ("frames", "pyin", {"analysis": "frames", "f0_backend": "pyin"}),
+        ("notes", "pyin", {"analysis": "notes", "f0_backend": "pyin"}),
+    ]
+    for analysis, backend, params in runs:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pitch.transcribe(hums[0][1][:native_sr], native_sr, **params)  # warm up
+            accs = []
+            t0 = time.perf_counter()
+            for midi, y in hums:
+                jianpu, _ = pitch.transcribe(y, native_sr, **params)
+                accs.append(note_accuracy(jianpu, midi))
+            wall = time.perf_counter() - t0
+        print(
+            f"{analysis:<6} {backend:<5} {wall:7.2f}s  ({1e3 * wall / audio_s:6.1f} ms per audio-s)   "
+            f"accuracy mean {np.mean(accs):.3f} min {np.min(accs):.3f}"
+        )
+
+
+def bench_synth(minutes: float, voices: int, sr: int, repeat: int):
+    # Samples/s of the NumPy synth on a multi-voice eighth-note tune.
+    rng = np.random.default_rng(0)
+    bpm = 100
+    step = 30.0 / bpm  # eighth note
+    n_notes = int(minutes * 60 / step)
+    pm = pretty_midi.PrettyMIDI(initial_tempo=bpm)
+    programs = sorted(synth.TIMBRES)
+    for v in range(voices):
+        inst = pretty_midi.Instrument(program=programs[v % len(programs)])
+        melody = synth_corpus.random_melody(n_notes, rng, tonic_midi=48 + 12 * (v % 3))
+        for i, p in enumerate(melody):
+            inst.notes.append(pretty_midi.Note(velocity=90, pitch=int(p), start=i * step, end=(i + 1) * step))
+        pm.instruments.append(inst)
+
+    for style in ("straight", "swing"):
+        y = synth.render(pm, sr=sr, style=style)
+        wall = _timeit(lambda: synth.render(pm, sr=sr, style=style), repeat)
+        print(
+            f"{style:<8} {voices} voices x {n_notes} notes, {len(y) / sr:6.1f}s audio @ {sr} Hz   "
+            f"{wall * 1e3:8.1f} ms   {len(y) / wall:14,.0f} samples/s   x{len(y) / sr / wall:.0f} realtime"
+        )
+
+
+def bench_arrange(minutes: float, repeat: int):
+    # Time to build a full melody/pad/bass arrangement of a long tune.
+    rng = np.random.default_rng(0)
+    bpm, note_len = 100, 0.5
+    n_tokens = int(minutes * bpm / note_len)
+    jianpu = pitch.midi_to_jianpu_symbols(np.array(synth_corpus.random_melody(n_tokens, rng)), 60, "major")
+    jianpu = " ".join(jianpu.tolist())
+    for style in ("straight", "swing"):
+        pm = arrangement.arrange(jianpu, bpm=bpm, note_len_beats=note_len, style=style)
+        wall = _timeit(lambda: arrangement.arrange(jianpu, bpm=bpm, note_len_beats=note_len, style=style), repeat)
+        notes = sum(len(i.notes) for i in pm.instruments)
+        print(
+            f"{style:<8} {n_tokens} tokens, {pm.get_end_time() / 60:.1f} min, {len(pm.instruments)} tracks, "
+            f"{notes} notes   {wall * 1e3:7.2f} ms"
+        )
+
+
+def bench_react(n_events: int, channels: int, repeat: int):
+    # SoundRenderAgent.react() throughput on a firehose of traffic it must ignore.
+    import sound_agent  # pulls in openagents; only this benchmark needs it
+
+    rng = np.random.default_rng(0)
+    words = ["hello", "the", "melody", "sounds", "great", "lunch", "at", "noon", "ok", "thanks", "see", "you"]
+    events = []
+    for i in range(n_events):
+        text = " ".join(rng.choice(words, size=int(rng.integers(3, 15))).tolist())
+        if i % 10 == 0:
+            # Control-looking chatter in a channel with no pending notation.
+            channel = f"ch{int(rng.integers(1, channels))}"
+            text += "\nbpm: 120"
+        else:
+            channel = f"ch{int(rng.integers(channels))}"
+        if i % 7 == 0:
+            events.append(types.SimpleNamespace(
+                event_name="shared_cache.notification.created", source_id="MusicWorker",
+                payload={"cache_id": str(i), "mime_type": "audio/webm"},
+            ))
+        else:
+            events.append(types.SimpleNamespace(
+                event_name="thread.channel_message.notification", source_id=f"user{i % 13}",
+                payload={"channel": channel, "content": {"text": text}},
+            ))
+
+    agent = sound_agent.SoundRenderAgent(agent_id="SoundRender", synth_backend="numpy")
+    posts = []
+
+    class _Channel:
+        async def post(self, msg, **kwargs):
+            posts.append(msg)
+
+    agent.workspace = lambda: types.SimpleNamespace(channel=lambda name: _Channel())
+    agent._sessions.put("ch0", {"jianpu": "1 2 3", "bpm": 90})  # one channel with a pending notation
+    contexts = [types.SimpleNamespace(incoming_event=e) for e in events]
+    loop = asyncio.new_event_loop()
+
+    async def feed():
+        for ctx in contexts:
+            await agent.react(ctx)
+
+    def reference():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sum(reference_react_prologue(e, "SoundRender", sound_agent._extract_text) for e in events)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        loop.run_until_complete(feed())
+    acted = reference()
+    t_new = _timeit(lambda: loop.run_until_complete(feed()), repeat)
+    t_ref = _timeit(reference, repeat)
+    loop.close()
+    agent._renderer.close()
+    print(f"{n_events} events over {channels} channels, 1 with a pending notation")
+    print(f"reference prologue {t_ref * 1e3:8.1f} ms   {n_events / t_ref:12,.0f} events/s   (would have replied to {acted})")
+    print(
+        f"react()            {t_new * 1e3:8.1f} ms   {n_events / t_new:12,.0f} events/s   x{t_ref / t_new:.1f}   "
+        f"(replied to {len(posts) // (repeat + 1)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pitch pipeline micro-benchmarks")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_key = sub.add_parser("key", help="KS key estimation and Jianpu symbol mapping")
+    p_key.add_argument("--frames", type=int, default=200_000)
+    p_key.add_argument("--repeat", type=int, default=3)
+
+    p_smooth = sub.add_parser("smooth", help="median smoothing of MIDI pitch tracks")
+    p_smooth.add_argument("--frames", type=int, default=200_000)
+    p_smooth.add_argument("--win", type=int, default=7)
+    p_smooth.add_argument("--repeat", type=int, default=3)
+
+    p_load = sub.add_parser("load", help="disk I/O of the agent decode step")
+    p_load.add_argument("--seconds", type=float, default=30.0)
+    p_load.add_argument("--sr", type=int, default=48000)
+
+    p_f0 = sub.add_parser("f0", help="F0 backend speed vs note accuracy on synthetic hums")
+    p_f0.add_argument("--count", type=int, default=8)
+    p_f0.add_argument("--seed", type=int, default=0)
+    p_f0.add_argument("--backends", nargs="+", default=sorted(pitch.F0_BACKENDS))
+
+    p_gate = sub.add_parser("gate", help="voiced-segment gating speedup on hums with pauses")
+    p_gate.add_argument("--count", type=int, default=6)
+    p_gate.add_argument("--seed", type=int, default=0)
+    p_gate.add_argument("--backends", nargs="+", default=sorted(pitch.F0_BACKENDS))
+
+    p_multi = sub.add_parser("multires", help="frame-level vs coarse-to-fine note analysis")
+    p_multi.add_argument("--count", type=int, default=6)
+    p_multi.add_argument("--seed", type=int, default=0)
+    p_multi.add_argument("--sr", type=int, default=48000, help="sample rate of the simulated uploads")
+
+    p_synth = sub.add_parser("synth", help="NumPy synth render throughput")
+    p_synth.add_argument("--minutes", type=float, default=3.0)
+    p_synth.add_argument("--voices", type=int, default=3)
+    p_synth.add_argument("--sr", type=int, default=44100)
+    p_synth.add_argument("--repeat", type=int, default=3)
+
+    p_arr = sub.add_parser("arrange", help="melody/pad/bass arrangement build time")
+    p_arr.add_argument("--minutes", type=float, default=5.0)
+    p_arr.add_argument("--repeat", type=int, default=5)
+
+    p_react = sub.add_parser("react", help="SoundRenderAgent.react throughput on unrelated channel traffic")
+    p_react.add_argument("--events", type=int, default=100_000)
+    p_react.add_argument("--channels", type=int, default=50)
+    p_react.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+    if args.cmd == "key":
+        bench_key(args.frames, args.repeat)
+    elif args.cmd == "smooth":
+        bench_smooth(args.frames, args.win, args.repeat)
+    elif args.cmd == "load":
+        bench_load(args.seconds, args.sr)
+    elif args.cmd == "f0":
+        bench_f0(args.count, args.seed, args.backends)
+    elif args.cmd == "gate":
+        bench_gate(args.count, args.seed, args.backends)
+    elif args.cmd == "multires":
+        bench_multires(args.count, args.seed, args.sr)
+    elif args.cmd == "synth":
+        bench_synth(args.minutes, args.voices, args.sr, args.repeat)
+    elif args.cmd == "arrange":
+        bench_arrange(args.minutes, args.repeat)
+    elif args.cmd == "react":
+        bench_react(args.events, args.channels, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# Bounded worker pool that runs CPU-bound analysis jobs off the agent's event loop.
+import asyncio
+import functools
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+
+class PoolSaturated(Exception):
+    """Raised by JobPool.submit when max_pending jobs are already queued or running."""
+
+
+class JobPool:
+    """
+    Async front-end for a process (default) or thread pool.
+    - At most max_pending jobs are admitted; extra submissions raise PoolSaturated
+      so the caller can tell the user to retry instead of queueing without bound.
+    - Each job gets job_timeout seconds. A timed-out job is reported to the caller
+      right away; a process worker cannot be interrupted, so it finishes in the background
+      and keeps its worker slot (and its place under max_pending) until it does.
+    - metrics() reports queue depth, job latency and timed-out jobs still running.
+    """
+
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: Optional[int] = None,
+        max_pending: int = 8,
+        job_timeout: Optional[float] = 120.0,
+        latency_window: int = 200,
+    ):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_pending = max(1, int(max_pending))
+        self.job_timeout = job_timeout
+
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._abandoned = set()  # timed-out jobs whose worker is still busy
+        self._latencies = deque(maxlen=latency_window)  # submit -> result, seconds
+        self._waits = deque(maxlen=latency_window)  # submit -> worker start, seconds
+
+    def _ensure_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn: the agent process holds network threads that must not be forked.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        return self._executor
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending + len(self._abandoned) >= self.max_pending
+
+    @property
+    def queue_depth(self) -> int:
+        # Jobs admitted but not yet picked up by a worker.
+        return max(0, self._pending - (self._running - len(self._abandoned)))
+
+    def _job_done(self, job):
+        # Worker finished (or the job was cancelled before it started): free its slot.
+        self._running -= 1
+        self._abandoned.discard(job)
+        self._slots.release()
+
+    async def submit(self, fn: Callable, *args, **kwargs) -> Any:
+        # Run fn(*args, **kwargs) in the pool and await its result.
+        if self.saturated:
+            self._rejected += 1
+            raise PoolSaturated(f"{self._pending} jobs pending (max {self.max_pending})")
+
+        loop = asyncio.get_running_loop()
+        executor = self._ensure_executor()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        submitted = time.perf_counter()
+        self._pending += 1
+        try:
+            # Jobs wait here (not inside the executor) so queue depth is observable.
+            await self._slots.acquire()
+            self._waits.append(time.perf_counter() - submitted)
+            self._running += 1
+            try:
+                job = executor.submit(functools.partial(fn, *args, **kwargs))
+            except BaseException:
+                self._running -= 1
+                self._slots.release()
+                raise
+            # The slot is freed when the worker is done, not when the caller stops waiting,
+            # so the next job is never queued invisibly behind a busy worker.
+            def on_done(j):
+                try:
+                    loop.call_soon_threadsafe(self._job_done, j)
+                except RuntimeError:
+                    pass  # event loop already closed
+
+            job.add_done_callback(on_done)
+            try:
+                result = await asyncio.wait_for(asyncio.wrap_future(job), self.job_timeout)
+            except asyncio.TimeoutError:
+                if not job.done():
+                    self._abandoned.add(job)
+                raise
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+            self._latencies.append(time.perf_counter() - submitted)
+
+        self._completed += 1
+        return result
+
+    def metrics(self) -> dict:
+        lat = np.fromiter(self._latencies, dtype=float)
+        wait = np.fromiter(self._waits, dtype=float)
+        return {
+            "executor": self.kind,
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "running": self._running,
+            "timed_out_running": len(self._abandoned),
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "rejected": self._rejected,
+            "latency_avg_s": float(lat.mean()) if lat.size else 0.0,
+            "latency_p95_s": float(np.percentile(lat, 95)) if lat.size else 0.0,
+            "latency_max_s": float(lat.max()) if lat.size else 0.0,
+            "queue_wait_avg_s": float(wait.mean()) if wait.size else 0.0,
+        }
+
+    def shutdown(self, wait: bool = False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
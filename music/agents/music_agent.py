@@ -1,16 +1,21 @@
 # Music agent that listens for recorded audio, extracts a melody as Jianpu, and returns a MIDI file.
-import os
-import tempfile
-from pathlib import Path
 import asyncio
 import base64
+import logging
+import time
 from openagents.models.event import Event, EventVisibility
 from openagents.agents.worker_agent import (
     WorkerAgent,
     EventContext,
     FileContext,
 )
+import numpy as np
 import pitch
+from job_pool import JobPool, PoolSaturated
+import transcription_cache
+from transcription_cache import TranscriptionCache
+
+logger = logging.getLogger(__name__)
 
 
 class MusicAgent(WorkerAgent):
@@ -22,15 +27,96 @@ class MusicAgent(WorkerAgent):
 
     default_agent_id = "MusicWorker"
 
+    # Seconds of audio fed to the streaming transcriber per step.
+    stream_chunk_seconds = 1.0
+    # Streams with no new segment for this long are dropped (recorder closed without a final segment).
+    stream_idle_seconds = 300.0
+
+    # Everything that changes the transcription result; part of the cache key.
+    analysis_params = {
+        "bpm": 90,
+        "fmin": "C2",
+        "fmax": "C6",
+        "frame_length": 2048,
+        "hop_length": 256,
+        "rms_floor": 0.02,
+        "rms_ratio": 0.2,
+        "min_run_frames": 3,
+        "f0_backend": "pyin",
+        # "frames": frame-level F0 -> Jianpu; "notes": coarse-to-fine note segmentation (pitch.analyze_notes).
+        "analysis": "frames",
+    }
+
+    # Recordings longer than this are analysed with the fast YIN backend instead of pyin.
+    fast_f0_seconds = 60.0
+
+    def __init__(
+        self,
+        *args,
+        executor: str = "process",
+        max_workers: int | None = None,
+        max_pending: int = 4,
+        job_timeout: float = 120.0,
+        cache_entries: int = 256,
+        cache_bytes: int = 64 * 1024 * 1024,
+        cache_dir: str | None = None,
+        fast_f0_seconds: float | None = None,
+        analysis: str | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        if fast_f0_seconds is not None:
+            self.fast_f0_seconds = fast_f0_seconds
+        if analysis is not None:
+            self.analysis_params = {**self.analysis_params, "analysis": analysis}
+        # CPU-bound analysis runs here so the event loop keeps polling and heartbeating.
+        self._pool = JobPool(
+            kind=executor,
+            max_workers=max_workers,
+            max_pending=max_pending,
+            job_timeout=job_timeout,
+        )
+        # Streaming decoders and transcribers are stateful, so they run on threads, under the
+        # same admission and timeout limits as whole recordings.
+        self._stream_pool = JobPool(
+            kind="thread",
+            max_workers=self._pool.max_workers,
+            max_pending=max_pending,
+            job_timeout=job_timeout,
+        )
+        # Results keyed by decoded audio + analysis_params, so repeated recordings skip pyin.
+        self._cache = TranscriptionCache(max_entries=cache_entries, max_bytes=cache_bytes, cache_dir=cache_dir)
+
     async def on_startup(self):
         self._processing_cache_ids = set()
+        # stream_id -> {"decoder", "transcriber", "lock", "posted", "active"} for segmented uploads.
+        self._streams = {}
+        self._stream_sweeper = asyncio.create_task(self._sweep_streams())
         print("Music Agent is running.")
         print("mods loaded:", list(self.client.mod_adapters.keys()))
+        print(f"analysis pool: {self._pool.kind} x{self._pool.max_workers}, max pending {self._pool.max_pending}")
 
 
     async def on_shutdown(self):
+        self._stream_sweeper.cancel()
+        for stream_id in list(self._streams):
+            self._drop_stream(stream_id)
+        self._pool.shutdown(wait=False)
+        self._stream_pool.shutdown(wait=False)
         print("Music Agent stopped.")
 
+    def get_metrics(self) -> dict:
+        # Analysis pool queue depth / job latency, streaming pool load and transcription cache counters.
+        streams = {**self._stream_pool.metrics(), "open": len(getattr(self, "_streams", {}))}
+        return {**self._pool.metrics(), "streams": streams, "cache": self._cache.stats()}
+
+    async def _post_busy(self, channel: str):
+        m = self._pool.metrics()
+        await self.workspace().channel(channel).post(
+            f"MusicWorker is busy ({m['pending']} recordings in progress, {m['queue_depth']} waiting). "
+            "Please send your recording again in a moment."
+        )
+
     async def _upload_bytes_to_shared_cache(
             self,
             file_bytes: bytes,
@@ -63,16 +149,8 @@ class MusicAgent(WorkerAgent):
         return data.get("cache_id")
 
 
-    async def _send_midi(self, channel: str, midi_path: str, jianpu: str):
-        # Read the generated MIDI file, upload it, and announce it to the channel.
-        try:
-            with open(midi_path, "rb") as f:
-                midi_bytes = f.read()
-        except Exception as e:
-            await self.workspace().channel(channel).post(f"Failed to read MIDI file: {type(e).__name__}: {e}")
-            return
-
-
+    async def _send_midi(self, channel: str, midi_bytes: bytes, jianpu: str):
+        # Upload the generated MIDI bytes and announce them to the channel.
         cache_id = await self._upload_bytes_to_shared_cache(
             file_bytes=midi_bytes,
             filename="out.mid",
@@ -102,42 +180,31 @@ class MusicAgent(WorkerAgent):
         )
 
 
-    async def _run_pitch_to_midi(self, audio_path: str, bpm: int = 90) -> tuple[str, str]:
-        # Convert a single audio file to Jianpu notation and render a MIDI file.
-        y, sr = pitch.load_audio(audio_path)
+    async def _transcribe_cached(self, cache_id: str, file_bytes: bytes, mime_type: str) -> tuple[str, bytes]:
+        # Cache lookup by upload bytes, then by decoded audio; decoding, keying and analysis share one pool job.
+        params = self.analysis_params
+        raw_name = transcription_cache.raw_alias(file_bytes, params)
+        key = self._cache.resolve(raw_name)
+        hit = self._cache.get(key) if key else None
 
-        f0, voiced_flag, times = pitch.estimate_f0(
-            y, sr,
-            fmin="C2",
-            fmax="C6",
-            frame_length=2048,
-            hop_length=256,
-        )
-
-        rms = pitch.compute_rms(y, frame_length=2048, hop_length=256)
-        thr = pitch.adaptive_rms_threshold(rms, floor=0.02, ratio=0.2)
-        f0[rms < thr] = float("nan")
-
-        jianpu = pitch.f0_to_jianpu(
-            f0,
-
-            tonic_midi_user=None,
-            use_smoothing=False,
-            min_run_frames=3,
-        )
-
-        fd, midi_path = tempfile.mkstemp(prefix="out_", suffix=".mid")
-        os.close(fd)
-
-        pitch.jianpu_to_midi_file(
-            jianpu,
-            midi_path,
-            tonic_midi=60,
-            bpm=bpm,
-            note_len_beats=0.5,
-        )
+        if hit is None:
+            key, result = await self._pool.submit(
+                transcription_cache.transcribe_upload,
+                file_bytes, mime_type, params, self.fast_f0_seconds, self._cache.keys(),
+            )
+            hit = self._cache.get(key)
+            if hit is None:
+                if result is None:
+                    # Evicted while the job ran; analyse without the shortcut.
+                    key, result = await self._pool.submit(
+                        transcription_cache.transcribe_upload, file_bytes, mime_type, params, self.fast_f0_seconds,
+                    )
+                hit = result
+                self._cache.put(key, *hit)
+            self._cache.alias(raw_name, key)
 
-        return jianpu, midi_path
+        self._cache.alias(f"file:{cache_id}", key)
+        return hit
 
 
     async def react(self, context: EventContext):
@@ -182,7 +249,32 @@ class MusicAgent(WorkerAgent):
             )
             return
 
+        # Recorder uploads partial segments tagged with a stream_id; the last one has final=True.
+        file_meta = files[0] if files else {}
+        stream_id = file_meta.get("stream_id") or content.get("stream_id")
+        if stream_id:
+            final = bool(file_meta.get("final", content.get("final", False)))
+            asyncio.create_task(
+                self.process_stream_segment(cache_id, stream_id, channel, final=final)
+            )
+            return
+
+        if cache_id in self._processing_cache_ids:
+            return  # the studio re-sent a file that is still being analysed
 
+        # Same file_id seen before: answer from the cache without downloading it again.
+        key = self._cache.resolve(f"file:{cache_id}")
+        hit = self._cache.get(key) if key else None
+        if hit is not None:
+            jianpu, midi_bytes = hit
+            await self._send_midi(channel, midi_bytes, jianpu)
+            return
+
+        if self._pool.saturated:
+            await self._post_busy(channel)
+            return
+
+        self._processing_cache_ids.add(cache_id)
 
         await self.workspace().channel(channel).post(
             f"received recording, start analysing..."
@@ -192,8 +284,8 @@ class MusicAgent(WorkerAgent):
         asyncio.create_task(
             self.process_audio_by_cache_id(cache_id, channel)
         )
-    async def process_audio_by_cache_id(self, cache_id: str, channel: str):
-        # Download audio from shared_cache and run pitch→Jianpu→MIDI pipeline.
+    async def _download_cache_file(self, cache_id: str, channel: str) -> tuple[bytes, str, str] | None:
+        # Fetch a file from shared_cache, reporting failures to the channel.
         download_event = Event(
             event_name="shared_cache.file.download",
             source_id=self.agent_id,
@@ -219,24 +311,134 @@ class MusicAgent(WorkerAgent):
             )
             return
 
-        file_bytes = base64.b64decode(file_data_b64)
-        suffix = Path(filename).suffix or ".webm"
-        fd, tmp_path = tempfile.mkstemp(prefix="cache_in_", suffix=suffix)
-        os.close(fd)
-
-        try:
-            with open(tmp_path, "wb") as f:
-                f.write(file_bytes)
+        mime_type = data.get("mime_type") or "application/octet-stream"
+        return base64.b64decode(file_data_b64), filename, mime_type
 
-            jianpu, midi_path = await self._run_pitch_to_midi(tmp_path, bpm=90)
-            await self._send_midi(channel, midi_path, jianpu)
+    async def process_audio_by_cache_id(self, cache_id: str, channel: str):
+        # Download audio from shared_cache and run pitch→Jianpu→MIDI pipeline.
+        downloaded = await self._download_cache_file(cache_id, channel)
+        if downloaded is None:
+            self._processing_cache_ids.discard(cache_id)
+            return
+        file_bytes, filename, mime_type = downloaded
 
+        try:
+            jianpu, midi_bytes = await self._transcribe_cached(cache_id, file_bytes, mime_type)
+        except PoolSaturated:
+            await self._post_busy(channel)
+            return
+        except asyncio.TimeoutError:
+            await self.workspace().channel(channel).post(
+                f"Analysis timed out after {self._pool.job_timeout:.0f}s, try a shorter recording."
+            )
+            return
+        except Exception as e:
+            await self.workspace().channel(channel).post(f"Analysis failed: {type(e).__name__}: {e}")
+            return
         finally:
-            try:
-                self._processing_cache_ids.discard(cache_id)
-                os.remove(tmp_path)
-            except Exception:
-                pass
+            self._processing_cache_ids.discard(cache_id)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("metrics: %s", self.get_metrics())
+
+        await self._send_midi(channel, midi_bytes, jianpu)
+
+    def _feed_stream(self, state: dict, segment: bytes, final: bool):
+        # Push one segment through the stream's ffmpeg pipe and feed the samples it produced.
+        if state["decoder"] is None:
+            p = self.analysis_params
+            state["decoder"] = pitch.StreamDecoder(pitch.TARGET_SR)
+            state["transcriber"] = pitch.StreamingTranscriber(
+                pitch.TARGET_SR,
+                **{k: p[k] for k in ("fmin", "fmax", "frame_length", "hop_length", "min_run_frames", "rms_floor", "rms_ratio")},
+            )
+        y = state["decoder"].write(segment)
+        if final:
+            y = np.concatenate([y, state["decoder"].close()])
+
+        step = max(1, int(self.stream_chunk_seconds * pitch.TARGET_SR))
+        for i in range(0, len(y), step):
+            state["transcriber"].feed(y[i:i + step])
+
+    def _drop_stream(self, stream_id: str):
+        state = self._streams.pop(stream_id, None)
+        if state is not None and state["decoder"] is not None:
+            state["decoder"].abort()
+
+    def _expire_streams(self, now: float) -> list[str]:
+        # Drop idle streams that are not mid-segment; returns their ids.
+        expired = [
+            stream_id for stream_id, state in self._streams.items()
+            if now - state["active"] > self.stream_idle_seconds and not state["lock"].locked()
+        ]
+        for stream_id in expired:
+            self._drop_stream(stream_id)
+        return expired
+
+    async def _sweep_streams(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.stream_idle_seconds / 4))
+            for stream_id in self._expire_streams(time.monotonic()):
+                print(f"[MusicWorker] dropped idle stream {stream_id}")
+
+    async def _run_stream_job(self, stream_id: str, channel: str, fn, *args):
+        # Run one streaming step on the stream pool. On failure the stream is dropped (its
+        # decoder cannot skip a segment) and the channel is told; returns (ok, result).
+        try:
+            return True, await self._stream_pool.submit(fn, *args)
+        except PoolSaturated:
+            m = self._stream_pool.metrics()
+            message = (
+                f"MusicWorker is busy ({m['pending']} stream segments in progress). "
+                "Live notation stopped, please record again in a moment."
+            )
+        except asyncio.TimeoutError:
+            message = f"Streaming analysis timed out after {self._stream_pool.job_timeout:.0f}s."
+        except Exception as e:
+            message = f"Streaming analysis failed: {type(e).__name__}: {e}"
+        self._drop_stream(stream_id)
+        await self.workspace().channel(channel).post(message)
+        return False, None
+
+    async def process_stream_segment(self, cache_id: str, stream_id: str, channel: str, final: bool = False):
+        # Decode one recorder segment and transcribe only the audio it adds.
+        state = self._streams.setdefault(
+            stream_id,
+            {"decoder": None, "transcriber": None, "lock": asyncio.Lock(), "posted": "", "active": 0.0},
+        )
+        state["active"] = time.monotonic()
+        async with state["lock"]:
+            downloaded = await self._download_cache_file(cache_id, channel)
+            if downloaded is None:
+                if final:
+                    self._drop_stream(stream_id)
+                return
+            segment, _, _ = downloaded
+
+            # The per-stream lock keeps segments in order.
+            ok, _ = await self._run_stream_job(stream_id, channel, self._feed_stream, state, segment, final)
+            if not ok:
+                return
+            state["active"] = time.monotonic()
+            transcriber = state["transcriber"]
+
+            if not final:
+                final_tokens, provisional = transcriber.snapshot()
+                text = " ".join(final_tokens + provisional)
+                if text and text != state["posted"]:
+                    state["posted"] = text
+                    await self.workspace().channel(channel).post(f"Provisional notation: {text}")
+                return
+
+            ok, jianpu = await self._run_stream_job(stream_id, channel, transcriber.finish)
+            if not ok:
+                return
+
+        self._streams.pop(stream_id, None)
+
+        midi_bytes = pitch.jianpu_to_midi_bytes(
+            jianpu, tonic_midi=60, bpm=self.analysis_params["bpm"], note_len_beats=0.5
+        )
+        await self._send_midi(channel, midi_bytes, jianpu)
 
 
 async def main():
@@ -251,9 +453,30 @@ async def main():
         default=None,
         help="Connection URL (e.g., grpc://localhost:8600 for direct gRPC)"
     )
+    parser.add_argument("--executor", choices=["process", "thread"], default="process",
+                        help="Worker pool used for pitch analysis")
+    parser.add_argument("--workers", type=int, default=None, help="Analysis workers (default: cpu count - 1, max 4)")
+    parser.add_argument("--max-pending", type=int, default=4,
+                        help="Recordings queued or running before new ones are turned away")
+    parser.add_argument("--job-timeout", type=float, default=120.0, help="Seconds allowed per recording")
+    parser.add_argument("--cache-dir", default=None, help="Persist transcription results in this directory")
+    parser.add_argument("--cache-entries", type=int, default=256, help="Max cached transcriptions")
+    parser.add_argument("--fast-f0-seconds", type=float, default=MusicAgent.fast_f0_seconds,
+                        help="Use the fast YIN backend for recordings longer than this (0 = never)")
+    parser.add_argument("--analysis", choices=["frames", "notes"], default=MusicAgent.analysis_params["analysis"],
+                        help="frames: frame-level F0 -> Jianpu; notes: coarse-to-fine note segmentation")
     args = parser.parse_args()
 
-    agent = MusicAgent()
+    agent = MusicAgent(
+        executor=args.executor,
+        max_workers=args.workers,
+        max_pending=args.max_pending,
+        job_timeout=args.job_timeout,
+        cache_entries=args.cache_entries,
+        cache_dir=args.cache_dir,
+        fast_f0_seconds=args.fast_f0_seconds,
+        analysis=args.analysis,
+    )
 
     try:
         if args.url:
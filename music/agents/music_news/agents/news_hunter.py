@@ -1,33 +1,60 @@
 
 # Agent that periodically fetches music news, renders them as newspaper-style cards, and posts to a channel.
 from pathlib import Path
-import tempfile
 import asyncio
 import sys
 import base64
-from pathlib import Path
+import hashlib
 from openagents.models.event import Event, EventVisibility
 # Add parent directories to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from tools.card_render import render_newspaper_html, html_to_image
+from tools.card_render import RENDER_BACKENDS, CardRenderer
 from openagents.agents.worker_agent import WorkerAgent
-from tools.news_fetcher import fetch_hackernews_top, fetch_hackernews_new,fetch_nme_music_news
-from tools.news_fetcher import fetch_rollingstone_music_top
-from html.parser import HTMLParser
+from tools.news_fetcher import NME_RSS_URL, nme_stories_from_entries
+from tools.async_fetcher import AsyncFetcher
+from tools.feed_poller import FeedPoller
+from tools.seen_index import SeenIndex
 
 
 class NewsHunterAgent(WorkerAgent):
     # Default identifier used when this agent registers with the workspace.
     default_agent_id = "News-hunter"
 
-    def __init__(self, fetch_interval: int = 60, **kwargs):
+    def __init__(
+        self,
+        fetch_interval: int = 60,
+        feed_url: str = NME_RSS_URL,
+        max_concurrency: int = 8,
+        rate_per_host: float = None,
+        fetch_timeout: float = 10.0,
+        fetch_retries: int = 2,
+        max_interval: int = 900,
+        seen_index_path: str = "news_seen.idx",
+        seen_max_age_days: float = 30.0,
+        render_backend: str = "auto",
+        render_workers: int = 2,
+        **kwargs,
+    ):
 
         super().__init__(**kwargs)
-        # fetch_interval controls how often we poll for new stories.
+        # fetch_interval is the poll interval while the feed is moving; it backs off up to max_interval.
         self.fetch_interval = fetch_interval
-        self.posted_urls = set()
+        self.feed_url = feed_url
+        # URLs already posted, kept on disk so a restart does not re-post old news.
+        self.seen = SeenIndex(seen_index_path, max_age_days=seen_max_age_days)
+        # New feed entries not posted yet (at most 2 go out per cycle).
+        self._backlog = []
         self._hunting_task = None
+        # One pooled HTTP client for the agent's lifetime; article pages are fetched concurrently.
+        self._fetcher = AsyncFetcher(
+            max_concurrency=max_concurrency,
+            rate_per_host=rate_per_host,
+            timeout=fetch_timeout,
+            retries=fetch_retries,
+        )
+        self._cards = CardRenderer(backend=render_backend, workers=render_workers)
+        self._poller = FeedPoller(self._fetcher, feed_url, min_interval=fetch_interval, max_interval=max_interval)
 
     async def on_startup(self):
         # Start the background task once the agent is connected.
@@ -42,6 +69,9 @@ class NewsHunterAgent(WorkerAgent):
                 await self._hunting_task
             except asyncio.CancelledError:
                 pass
+        await self._fetcher.close()
+        await self._cards.close()
+        self.seen.save()
         print("News Hunter disconnected.")
 
     async def _hunt_news_loop(self):
@@ -55,7 +85,7 @@ class NewsHunterAgent(WorkerAgent):
                 print(f"Error in news hunt loop: {e}")
 
 
-            await asyncio.sleep(self.fetch_interval)
+            await asyncio.sleep(self._poller.interval)
 
     async def _upload_bytes_to_shared_cache(
             self,
@@ -95,30 +125,37 @@ class NewsHunterAgent(WorkerAgent):
         return data.get("cache_id")
 
     async def _fetch_and_post_news(self):
-        # Fetch a batch of stories and post a subset that have not been seen before.
+        # Poll the feed (304 when unchanged) and post up to 2 stories that have not been posted before.
         print("Hunting for news...")
 
-        stories = fetch_nme_music_news(limit=5)
-
+        entries = await self._poller.poll()
+        if entries is not None:
+            queued = {e.link for e in self._backlog}
+            fresh = [e for e in entries[:5] if e.get("link") and e.link not in queued and e.link not in self.seen]
+            self._backlog.extend(fresh)
+            self._poller.mark(bool(fresh))
+            if not fresh:
+                print("No new stories in the feed.")
+        else:
+            print(f"Feed unchanged; next poll in {self._poller.interval:.0f}s.")
 
-        if not stories:
-            print("No stories fetched from NME.")
+        if not self._backlog:
             return
 
+        # Only the stories about to be posted get their article pages fetched.
+        batch, self._backlog = self._backlog[:2], self._backlog[2:]
+        if self._backlog:
+            self._poller.mark(True)  # more to post: keep polling at the base interval
+        stories = await nme_stories_from_entries(self._fetcher, batch)
 
-        new_stories = [s for s in stories if s.get("url") not in self.posted_urls]
-
-        if not new_stories:
-            print("No new stories to post.")
-            return
-
-        for story in new_stories[:2]:
+        for story in stories:
             await self._post_story(story)
             if story.get("url"):
-                self.posted_urls.add(story["url"])
+                self.seen.add(story["url"])
             await asyncio.sleep(2)
+        self.seen.save()
 
-        print(f"Posted {min(len(new_stories), 2)} new stories. Total tracked: {len(self.posted_urls)}")
+        print(f"Posted {len(stories)} new stories. Total tracked: {len(self.seen)}, queued: {len(self._backlog)}")
 
     def _parse_news(self, news_text: str) -> list:
         """
@@ -203,48 +240,18 @@ class NewsHunterAgent(WorkerAgent):
 
         }
 
-        tmp_dir = Path("./tmp_news_cards")
-        tmp_dir.mkdir(exist_ok=True)
-
-        html_path = tmp_dir / f"news_card.html"
-        img_path = tmp_dir / f"news_card.jpg"
-
-        html_result = render_newspaper_html(story_for_html, html_path)
-
-        if isinstance(html_result, Path):
-            html_path = html_result
-        elif isinstance(html_result, str):
-            html_path.write_text(html_result, encoding="utf-8")
-        elif html_result is None:
-
-            pass
-        else:
-
-            print("[NewsHunter] render_newspaper_html returned unexpected type:", type(html_result))
-
-        try:
-            img_path = html_to_image(html_path, img_path)
-        except Exception as e:
-            print(f"[NewsHunter] html_to_image failed: {e}")
-            img_path = None
-
-
-        if not img_path or not img_path.exists():
-            await self.workspace().channel(channel).post(message_text)
-            return
-
-
+        # Rendered in memory on the warm renderer pool; a story already rendered comes from its cache.
         try:
-            with open(img_path, "rb") as f:
-                img_bytes = f.read()
+            img_bytes = await self._cards.render(story_for_html)
         except Exception as e:
-            print(f"[NewsHunter] read image failed: {e}")
+            print(f"[NewsHunter] card render failed: {e}")
             await self.workspace().channel(channel).post(message_text)
             return
+        filename = f"news_card_{hashlib.sha1(img_bytes).hexdigest()[:12]}.jpg"
 
         cache_id = await self._upload_bytes_to_shared_cache(
             file_bytes=img_bytes,
-            filename=img_path.name,
+            filename=filename,
             mime_type="image/jpeg",
         )
 
@@ -262,7 +269,7 @@ class NewsHunterAgent(WorkerAgent):
                     {
 
                         "file_id": cache_id,
-                        "filename": img_path.name,
+                        "filename": filename,
                         "size": len(img_bytes),
                         "mime_type": "image/jpeg",
                     }
@@ -281,9 +288,32 @@ async def main():
     parser.add_argument("--host", default="localhost", help="Network host")
     parser.add_argument("--port", type=int, default=8700, help="Network port")
     parser.add_argument("--interval", type=int, default=60, help="Fetch interval in seconds")
+    parser.add_argument("--feed-url", default=NME_RSS_URL, help="RSS feed to hunt")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Max HTTP requests in flight")
+    parser.add_argument("--rate-per-host", type=float, default=None, help="Max requests per second per host")
+    parser.add_argument("--fetch-timeout", type=float, default=10.0, help="Seconds per HTTP attempt")
+    parser.add_argument("--fetch-retries", type=int, default=2, help="Retries after a failed HTTP attempt")
+    parser.add_argument("--max-interval", type=int, default=900, help="Longest poll interval while the feed is unchanged")
+    parser.add_argument("--seen-index", default="news_seen.idx", help="File of already posted story URLs")
+    parser.add_argument("--render-backend", choices=RENDER_BACKENDS, default="auto",
+                        help="auto: playwright (warm headless Chromium) if installed, else wkhtmltoimage")
+    parser.add_argument("--render-workers", type=int, default=2, help="Cards rendered in parallel")
+    parser.add_argument("--seen-max-age-days", type=float, default=30.0, help="Forget posted URLs after this many days")
     args = parser.parse_args()
 
-    agent = NewsHunterAgent(fetch_interval=args.interval)
+    agent = NewsHunterAgent(
+        fetch_interval=args.interval,
+        feed_url=args.feed_url,
+        max_concurrency=args.max_concurrency,
+        rate_per_host=args.rate_per_host,
+        fetch_timeout=args.fetch_timeout,
+        fetch_retries=args.fetch_retries,
+        max_interval=args.max_interval,
+        seen_index_path=args.seen_index,
+        seen_max_age_days=args.seen_max_age_days,
+        render_backend=args.render_backend,
+        render_workers=args.render_workers,
+    )
 
     try:
         await agent.async_start(
@@ -2,17 +2,29 @@
 
 # Simple article extractor that fetches a web page, summarizes it, and returns card-ready fields.
 
+import asyncio
+
 import requests
 from bs4 import BeautifulSoup
-from transformers import pipeline
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+
+from .summarizer import get_summarizer
 
 
 def extract_article(url: str) -> dict:
     # Fetch the page and parse basic metadata + main paragraphs.
     resp = requests.get(url, timeout=10)
     resp.raise_for_status()
-    html = resp.text
+    return article_from_html(resp.text)
+
+
+async def extract_article_async(url: str, fetcher) -> dict:
+    # Same as extract_article, over a shared AsyncFetcher; parsing and summarizing run off the event loop.
+    html = await fetcher.get_text(url)
+    return await asyncio.to_thread(article_from_html, html)
+
+
+def article_from_html(html: str) -> dict:
+    # Card fields from an already fetched page.
     soup = BeautifulSoup(html, "html.parser")
 
 
@@ -60,14 +72,8 @@ def extract_article(url: str) -> dict:
     if full_text:
         try:
 
-            result = summarizer(
-                full_text,
-                max_length=120,
-                min_length=40,
-                do_sample=False,
-                truncation=True,
-            )
-            summary = result[0]["summary_text"]
+            # Model loads on first use; concurrent callers share one batched forward pass.
+            summary = get_summarizer().summarize(full_text)
         except Exception:
 
             summary = desc or (full_text[:200] + "...")
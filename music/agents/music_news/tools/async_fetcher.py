@@ -0,0 +1,214 @@
+"""
+Async HTTP fetcher shared by the news tools.
+One pooled aiohttp session per agent, bounded concurrency, per-host rate limits,
+timeouts and retries, so a fetch cycle runs its requests side by side instead of
+one blocking requests.get after another.
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0 Safari/537.36"
+    )
+}
+
+# Worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class FetchError(Exception):
+    """A request that still failed after its retries."""
+
+    def __init__(self, url: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{url}: {message}")
+        self.url = url
+        self.status = status
+
+
+class FetchResponse:
+    """Body and metadata of a finished request (the connection is already released)."""
+
+    def __init__(self, url: str, status: int, headers: CIMultiDict, body: bytes, encoding: Optional[str]):
+        self.url = url
+        self.status = status
+        self.headers = headers  # case-insensitive
+        self.body = body
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class _HostLimiter:
+    # Minimum spacing between request starts to one host (rate_per_host requests/s).
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AsyncFetcher:
+    """
+    Pooled async HTTP client.
+
+    Args:
+        max_concurrency: Requests in flight at once, over all hosts
+        per_host: Open connections per host
+        rate_per_host: Max request starts per second per host (None = unlimited)
+        timeout: Total seconds per attempt
+        retries: Extra attempts after a connection error, timeout or RETRY_STATUSES reply
+        backoff: Base delay in seconds between attempts (doubled each time, with jitter)
+        headers: Default request headers
+
+    Use as an async context manager, or call close() when done. The session is
+    created lazily inside the running event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        per_host: int = 8,
+        rate_per_host: Optional[float] = None,
+        timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host = max(1, int(per_host))
+        self.rate_per_host = rate_per_host
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._limiters: Dict[str, _HostLimiter] = {}
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.per_host,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _limiter(self, url: str) -> _HostLimiter:
+        host = urlsplit(url).netloc
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = _HostLimiter(self.rate_per_host)
+        return limiter
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, allow_status=()) -> FetchResponse:
+        """
+        GET url and read the whole body.
+
+        Args:
+            url: Absolute URL
+            headers: Extra headers for this request
+            allow_status: Non-2xx statuses to return instead of raising (e.g. 304)
+
+        Returns:
+            FetchResponse
+
+        Raises:
+            FetchError: After the last attempt failed
+        """
+        session = self._ensure_session()
+        limiter = self._limiter(url)
+        last_error, last_status = "no attempt made", None
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            await limiter.wait()
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    async with session.get(url, headers=headers) as resp:
+                        body = await resp.read()
+                        if resp.status < 400 or resp.status in allow_status:
+                            return FetchResponse(str(resp.url), resp.status, CIMultiDict(resp.headers), body, resp.charset)
+                        last_error, last_status = f"HTTP {resp.status}", resp.status
+                        if resp.status not in RETRY_STATUSES:
+                            break
+                        retry_after = resp.headers.get("Retry-After")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    last_error, last_status = f"{type(e).__name__}: {e}", None
+            if attempt < self.retries:
+                self.retried += 1
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        self.failed += 1
+        raise FetchError(url, last_error, last_status)
+
+    async def get_text(self, url: str, **kwargs) -> str:
+        return (await self.get(url, **kwargs)).text
+
+    async def get_json(self, url: str, **kwargs):
+        return (await self.get(url, **kwargs)).json()
+
+    async def get_many(self, urls, **kwargs) -> list:
+        # Fetch all urls concurrently; each slot is a FetchResponse or the exception it raised.
+        return await asyncio.gather(*(self.get(u, **kwargs) for u in urls), return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "retried": self.retried, "failed": self.failed}
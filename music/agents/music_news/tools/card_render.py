@@ -1,26 +1,43 @@
 
 
 # tools/card_renderer.py
+import asyncio
+import hashlib
+import io
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
+
 from jinja2 import Environment, FileSystemLoader
-TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
-from pathlib import Path
 import imgkit
 from PIL import Image
 
-WKHTMLTOIMAGE_PATH = r"D:\OpenAgents\music_free\wkhtmltopdf\bin\wkhtmltoimage.exe"
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+
+# wkhtmltoimage location: $WKHTMLTOIMAGE_PATH, then PATH, then the original Windows install.
+WKHTMLTOIMAGE_PATH = (
+    os.environ.get("WKHTMLTOIMAGE_PATH")
+    or shutil.which("wkhtmltoimage")
+    or r"D:\OpenAgents\music_free\wkhtmltopdf\bin\wkhtmltoimage.exe"
+)
+RENDER_BACKENDS = ("auto", "playwright", "wkhtmltoimage")
+
 env = Environment(
     loader=FileSystemLoader(str(TEMPLATE_DIR)),
     autoescape=True,
 )
 
 
-def render_newspaper_html(article: dict, output_html: Path) -> Path:
+def render_newspaper_html_string(article: dict) -> str:
     # Render the Jinja2 newspaper template with article content and sidebar summary.
     template = env.get_template("newspaper.html")
     summary = article.get("summary", article.get("caption", ""))
     quote = article.get("url", "")
-    html = template.render(
+    return template.render(
         headline=article["title"],
         image_url=article["image_url"],
         caption=article["caption"],
@@ -30,10 +47,21 @@ def render_newspaper_html(article: dict, output_html: Path) -> Path:
         sidebar_text_1=summary,
     )
 
-    output_html.write_text(html, encoding="utf-8")
+
+def render_newspaper_html(article: dict, output_html: Path) -> Path:
+    output_html.write_text(render_newspaper_html_string(article), encoding="utf-8")
     return output_html
 
 
+def encode_jpeg(image_bytes: bytes, max_width: int = 900, quality: int = 60) -> bytes:
+    # Lossless screenshot -> JPEG at the target width, encoded once.
+    im = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    w, h = im.size
+    if w > max_width:
+        im = im.resize((max_width, int(h * max_width / w)), Image.LANCZOS)
+    out = io.BytesIO()
+    im.save(out, format="JPEG", quality=quality, optimize=True)
+    return out.getvalue()
 
 
 def shrink_image(img_path: Path,
@@ -41,29 +69,153 @@ def shrink_image(img_path: Path,
                  quality: int = 60) -> None:
     # Downscale and recompress the image to keep cards lightweight for transport.
     img_path = Path(img_path)
-    im = Image.open(img_path).convert("RGB")
-    w, h = im.size
-
-    if w > max_width:
-        new_h = int(h * max_width / w)
-        im = im.resize((max_width, new_h), Image.LANCZOS)
+    img_path.write_bytes(encode_jpeg(img_path.read_bytes(), max_width=max_width, quality=quality))
 
 
-    im.save(img_path, format="JPEG", quality=quality, optimize=True)
-
 def html_to_image(html_path: Path, output_img: Path) -> Path:
-    # Use wkhtmltoimage via imgkit to rasterize the HTML card and then shrink it.
+    # One-off render of an HTML file to a JPEG file (the agent uses CardRenderer instead).
     config = imgkit.config(wkhtmltoimage=WKHTMLTOIMAGE_PATH)
-    options = {
-        "format": "jpg",
-        "quality": "70",
-        "width": "900",
-
-    }
-    imgkit.from_file(str(html_path), str(output_img), config=config, options=options)
-
-
-    shrink_image(output_img, max_width=900, quality=60)
+    png = imgkit.from_file(str(html_path), False, config=config, options={"format": "png", "width": "900", "quiet": ""})
+    output_img = Path(output_img)
+    output_img.write_bytes(encode_jpeg(png, max_width=900, quality=60))
     print("[html_to_image] final size:", output_img.stat().st_size, "bytes")
-
-    return output_img
\ No newline at end of file
+    return output_img
+
+
+class CardRenderer:
+    """
+    Newspaper card renderer: story dict -> JPEG bytes, nothing written to disk.
+    - "playwright": one headless Chromium started once, with `workers` pages kept open;
+      each job borrows a page, so there is no browser start-up per card
+    - "wkhtmltoimage": imgkit on `workers` threads, image returned on stdout (no temp files)
+    - "auto": playwright if installed, else wkhtmltoimage
+    - screenshots are lossless PNG, encoded to JPEG once at the target width
+    - results are cached by a hash of the rendered HTML (+ size/quality), and concurrent
+      requests for the same card share one render
+    """
+
+    def __init__(
+        self,
+        backend: str = "auto",
+        workers: int = 2,
+        width: int = 900,
+        quality: int = 60,
+        cache_entries: int = 64,
+        wkhtmltoimage_path: Optional[str] = None,
+    ):
+        if backend not in RENDER_BACKENDS:
+            raise ValueError(f"Unknown render backend: {backend}")
+        if backend == "auto":
+            try:
+                import playwright.async_api  # noqa: F401
+
+                backend = "playwright"
+            except ImportError:
+                backend = "wkhtmltoimage"
+        self.backend = backend
+        self.workers = max(1, int(workers))
+        self.width = int(width)
+        self.quality = int(quality)
+        self.cache_entries = max(1, int(cache_entries))
+        self.wkhtmltoimage_path = wkhtmltoimage_path or WKHTMLTOIMAGE_PATH
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._inflight: dict = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="card")
+        self._imgkit_config = None
+        self._imgkit_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._pages: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self.hits = 0
+        self.renders = 0
+
+    @staticmethod
+    def card_key(html: str, width: int, quality: int) -> str:
+        return hashlib.sha256(f"{width}:{quality}:".encode("utf-8") + html.encode("utf-8")).hexdigest()
+
+    async def start(self):
+        # Launch the warm browser pages (playwright); a no-op for wkhtmltoimage. Called lazily by render().
+        if self.backend != "playwright" or self._pages is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._pages is not None:
+                return
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch()
+            pages = asyncio.Queue()
+            for _ in range(self.workers):
+                await pages.put(await self._browser.new_page(viewport={"width": self.width, "height": 1200}))
+            self._pages = pages
+
+    async def render(self, article: dict) -> bytes:
+        html = render_newspaper_html_string(article)
+        key = self.card_key(html, self.width, self.quality)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            jpeg = await self._render_html(html)
+        except BaseException as e:
+            # Settle the shared future on every exit, cancellation included, or waiters hang
+            if isinstance(e, asyncio.CancelledError):
+                fut.cancel()
+            else:
+                fut.set_exception(e)
+                fut.exception()  # retrieved here, so waiters-less failures are not logged as unhandled
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        fut.set_result(jpeg)
+        self.renders += 1
+        self._cache[key] = jpeg
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+        return jpeg
+
+    async def _render_html(self, html: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        if self.backend == "playwright":
+            await self.start()
+            page = await self._pages.get()
+            try:
+                await page.set_content(html, wait_until="networkidle")
+                png = await page.screenshot(full_page=True, type="png")
+            finally:
+                self._pages.put_nowait(page)
+        else:
+            png = await loop.run_in_executor(self._executor, self._wkhtml_png, html)
+        return await loop.run_in_executor(self._executor, encode_jpeg, png, self.width, self.quality)
+
+    def _wkhtml_png(self, html: str) -> bytes:
+        with self._imgkit_lock:
+            if self._imgkit_config is None:
+                self._imgkit_config = imgkit.config(wkhtmltoimage=self.wkhtmltoimage_path)
+        options = {"format": "png", "width": str(self.width), "quiet": ""}
+        return imgkit.from_string(html, False, config=self._imgkit_config, options=options)
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        self._pages = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "renders": self.renders, "hits": self.hits, "cached": len(self._cache)}
@@ -0,0 +1,96 @@
+"""
+Conditional-GET feed poller with adaptive interval.
+Sends If-None-Match / If-Modified-Since from the last response, so an unchanged
+feed costs a 304 and no parsing; the poll interval grows while nothing changes
+and snaps back when new items appear.
+"""
+
+import asyncio
+import hashlib
+from typing import Optional
+
+import feedparser
+
+from .async_fetcher import AsyncFetcher, FetchError
+
+
+class FeedPoller:
+    """
+    Args:
+        fetcher: Shared AsyncFetcher
+        url: Feed URL
+        min_interval: Seconds between polls while the feed is moving
+        max_interval: Upper bound for the backed-off interval
+        backoff: Interval multiplier after an unchanged poll or a failed fetch
+    """
+
+    def __init__(
+        self,
+        fetcher: AsyncFetcher,
+        url: str,
+        min_interval: float = 60.0,
+        max_interval: float = 900.0,
+        backoff: float = 2.0,
+    ):
+        self.fetcher = fetcher
+        self.url = url
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.backoff = backoff
+        self.interval = self.min_interval
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self._body_hash: Optional[str] = None
+        self.polls = 0
+        self.not_modified = 0
+
+    def mark(self, changed: bool):
+        # Reset the interval after news, back off otherwise.
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+    def _conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    async def poll(self) -> Optional[list]:
+        """
+        Fetch the feed if it changed.
+
+        Returns:
+            Feed entries, or None when the server answered 304, the body is
+            byte-identical to the last one, or the fetch failed
+        """
+        self.polls += 1
+        try:
+            resp = await self.fetcher.get(self.url, headers=self._conditional_headers(), allow_status=(304,))
+        except FetchError as e:
+            print(f"[FeedPoller] {e}")
+            self.mark(False)
+            return None
+
+        if resp.status == 304:
+            self.not_modified += 1
+            self.mark(False)
+            return None
+
+        self.etag = resp.headers.get("ETag") or self.etag
+        self.last_modified = resp.headers.get("Last-Modified") or self.last_modified
+        # Servers without validators: a byte-identical body is just as unchanged.
+        body_hash = hashlib.sha1(resp.body).hexdigest()
+        if body_hash == self._body_hash:
+            self.mark(False)
+            return None
+        self._body_hash = body_hash
+
+        feed = await asyncio.to_thread(feedparser.parse, resp.body)
+        return list(feed.entries)
+
+    def stats(self) -> dict:
+        return {"polls": self.polls, "not_modified": self.not_modified, "interval": self.interval}
@@ -3,12 +3,17 @@ News Fetcher Tools
 Fetches tech news from various sources including Hacker News.
 """
 
+import asyncio
 import requests
 from typing import Optional
 from datetime import datetime
 from html.parser import HTMLParser
 import re
 from bs4 import BeautifulSoup
+
+from .async_fetcher import AsyncFetcher
+
+HN_API_BASE = "https://hacker-news.firebaseio.com/v0"
 class NMEExcerptParser(HTMLParser):
     """从 NME 的 summary HTML 中提取 第一张图片 + 纯文本内容"""
 
@@ -61,8 +66,12 @@ def fetch_nme_full_article(url: str) -> dict:
     }
     resp = requests.get(url, headers=headers, timeout=10)
     resp.raise_for_status()
+    return parse_nme_article(resp.text)
+
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+def parse_nme_article(html: str) -> dict:
+    """Article body paragraphs and main image from an NME article page (see fetch_nme_full_article)."""
+    soup = BeautifulSoup(html, "html.parser")
 
     # ---------- 1. 主图：优先用 og:image ----------
     image_url = None
@@ -107,108 +116,122 @@ def fetch_nme_full_article(url: str) -> dict:
         "paragraphs": paragraphs,
         "image_url": image_url,
     }
-def fetch_hackernews_top(count: int = 5) -> str:
+def _hn_story(story_id: int, story: Optional[dict]) -> Optional[dict]:
+    if not story or not story.get("title"):
+        return None
+    return {
+        "title": story.get("title", ""),
+        "url": story.get("url", f"https://news.ycombinator.com/item?id={story_id}"),
+        "score": story.get("score", 0),
+        "comments": story.get("descendants", 0),
+        "by": story.get("by", "unknown"),
+    }
+
+
+async def fetch_hackernews_stories(
+    fetcher: AsyncFetcher,
+    kind: str = "top",
+    count: int = 5,
+    base_url: str = HN_API_BASE,
+) -> list[dict]:
     """
-    Fetch top stories from Hacker News.
+    Fetch Hacker News stories, all item requests in flight at once.
 
     Args:
-        count: Number of stories to fetch (default 5, max 30)
+        fetcher: Shared AsyncFetcher
+        kind: "top", "new" or "best"
+        count: Number of stories to fetch (clamped to 1..30)
+        base_url: API root (point it at a local server in tests)
 
     Returns:
-        Formatted string with top stories
+        Story dicts in list order; items that fail or have no title are skipped
     """
-    try:
-        count = min(max(1, count), 30)  # Clamp between 1 and 30
+    count = min(max(1, count), 30)
+    base_url = base_url.rstrip("/")
+    story_ids = (await fetcher.get_json(f"{base_url}/{kind}stories.json"))[:count]
+    responses = await fetcher.get_many([f"{base_url}/item/{sid}.json" for sid in story_ids])
+    stories = []
+    for sid, resp in zip(story_ids, responses):
+        if isinstance(resp, Exception):
+            continue
+        story = _hn_story(sid, resp.json())
+        if story:
+            stories.append(story)
+    return stories
 
-        # Fetch top story IDs
-        response = requests.get(
-            "https://hacker-news.firebaseio.com/v0/topstories.json",
-            timeout=10
-        )
-        response.raise_for_status()
-        story_ids = response.json()[:count]
 
-        stories = []
-        for story_id in story_ids:
-            story_response = requests.get(
-                f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json",
-                timeout=10
-            )
-            if story_response.ok:
-                story = story_response.json()
-                if story and story.get("title"):
-                    stories.append({
-                        "title": story.get("title", ""),
-                        "url": story.get("url", f"https://news.ycombinator.com/item?id={story_id}"),
-                        "score": story.get("score", 0),
-                        "comments": story.get("descendants", 0),
-                        "by": story.get("by", "unknown")
-                    })
-
-        if not stories:
-            return "No stories found."
-
-        result = f"📰 Top {len(stories)} Hacker News Stories:\n\n"
-        for i, story in enumerate(stories, 1):
-            result += f"{i}. **{story['title']}**\n"
-            result += f"   🔗 {story['url']}\n"
+def _format_hackernews(stories: list[dict], kind: str) -> str:
+    if not stories:
+        return "No new stories found." if kind == "new" else "No stories found."
+    header = {
+        "top": f"📰 Top {len(stories)} Hacker News Stories:\n\n",
+        "new": f"🆕 {len(stories)} Newest Hacker News Stories:\n\n",
+        "best": f"⭐ {len(stories)} Best Hacker News Stories:\n\n",
+    }[kind]
+    result = header
+    for i, story in enumerate(stories, 1):
+        result += f"{i}. **{story['title']}**\n"
+        result += f"   🔗 {story['url']}\n"
+        if kind == "new":
+            result += f"   ⬆️ {story['score']} points | 👤 {story['by']}\n\n"
+        else:
             result += f"   ⬆️ {story['score']} points | 💬 {story['comments']} comments | 👤 {story['by']}\n\n"
+    return result
 
-        return result
 
+async def fetch_hackernews_async(kind: str = "top", count: int = 5, fetcher: Optional[AsyncFetcher] = None) -> str:
+    """Formatted Hacker News listing; uses (and leaves open) fetcher if given, else a short-lived one."""
+    try:
+        if fetcher is not None:
+            return _format_hackernews(await fetch_hackernews_stories(fetcher, kind, count), kind)
+        async with AsyncFetcher() as own:
+            return _format_hackernews(await fetch_hackernews_stories(own, kind, count), kind)
     except Exception as e:
         return f"Error fetching Hacker News: {str(e)}"
 
 
-def fetch_hackernews_new(count: int = 5) -> str:
+def _run_hackernews(kind: str, count: int) -> str:
+    # asyncio.run cannot nest; inside an event loop callers must await fetch_hackernews_async.
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_hackernews_async(kind, count))
+    raise RuntimeError(
+        f"fetch_hackernews_{kind}() called from a running event loop; "
+        f"use await fetch_hackernews_async({kind!r}, count) instead"
+    )
+
+
+def fetch_hackernews_top(count: int = 5) -> str:
     """
-    Fetch newest stories from Hacker News.
+    Fetch top stories from Hacker News.
 
     Args:
         count: Number of stories to fetch (default 5, max 30)
 
     Returns:
-        Formatted string with new stories
+        Formatted string with top stories
+
+    Raises:
+        RuntimeError: if called from a running event loop; await fetch_hackernews_async there
     """
-    try:
-        count = min(max(1, count), 30)
+    return _run_hackernews("top", count)
 
-        response = requests.get(
-            "https://hacker-news.firebaseio.com/v0/newstories.json",
-            timeout=10
-        )
-        response.raise_for_status()
-        story_ids = response.json()[:count]
 
-        stories = []
-        for story_id in story_ids:
-            story_response = requests.get(
-                f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json",
-                timeout=10
-            )
-            if story_response.ok:
-                story = story_response.json()
-                if story and story.get("title"):
-                    stories.append({
-                        "title": story.get("title", ""),
-                        "url": story.get("url", f"https://news.ycombinator.com/item?id={story_id}"),
-                        "score": story.get("score", 0),
-                        "by": story.get("by", "unknown")
-                    })
-
-        if not stories:
-            return "No new stories found."
-
-        result = f"🆕 {len(stories)} Newest Hacker News Stories:\n\n"
-        for i, story in enumerate(stories, 1):
-            result += f"{i}. **{story['title']}**\n"
-            result += f"   🔗 {story['url']}\n"
-            result += f"   ⬆️ {story['score']} points | 👤 {story['by']}\n\n"
+def fetch_hackernews_new(count: int = 5) -> str:
+    """
+    Fetch newest stories from Hacker News.
 
-        return result
+    Args:
+        count: Number of stories to fetch (default 5, max 30)
 
-    except Exception as e:
-        return f"Error fetching Hacker News: {str(e)}"
+    Returns:
+        Formatted string with new stories
+
+    Raises:
+        RuntimeError: if called from a running event loop; await fetch_hackernews_async there
+    """
+    return _run_hackernews("new", count)
 
 
 def fetch_hackernews_best(count: int = 5) -> str:
@@ -220,47 +243,11 @@ def fetch_hackernews_best(count: int = 5) -> str:
 
     Returns:
         Formatted string with best stories
-    """
-    try:
-        count = min(max(1, count), 30)
 
-        response = requests.get(
-            "https://hacker-news.firebaseio.com/v0/beststories.json",
-            timeout=10
-        )
-        response.raise_for_status()
-        story_ids = response.json()[:count]
-
-        stories = []
-        for story_id in story_ids:
-            story_response = requests.get(
-                f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json",
-                timeout=10
-            )
-            if story_response.ok:
-                story = story_response.json()
-                if story and story.get("title"):
-                    stories.append({
-                        "title": story.get("title", ""),
-                        "url": story.get("url", f"https://news.ycombinator.com/item?id={story_id}"),
-                        "score": story.get("score", 0),
-                        "comments": story.get("descendants", 0),
-                        "by": story.get("by", "unknown")
-                    })
-
-        if not stories:
-            return "No stories found."
-
-        result = f"⭐ {len(stories)} Best Hacker News Stories:\n\n"
-        for i, story in enumerate(stories, 1):
-            result += f"{i}. **{story['title']}**\n"
-            result += f"   🔗 {story['url']}\n"
-            result += f"   ⬆️ {story['score']} points | 💬 {story['comments']} comments | 👤 {story['by']}\n\n"
-
-        return result
-
-    except Exception as e:
-        return f"Error fetching Hacker News: {str(e)}"
+    Raises:
+        RuntimeError: if called from a running event loop; await fetch_hackernews_async there
+    """
+    return _run_hackernews("best", count)
 
 
 import requests
@@ -303,43 +290,74 @@ import feedparser
 NME_RSS_URL = "https://www.nme.com/news/music/rss"
 
 
+def _nme_story(entry, full: Optional[dict]) -> dict:
+    raw_summary = getattr(entry, "summary", "") or ""
+    summary_text, img_from_summary = parse_nme_summary(raw_summary)
+    full = full or {}
+    body = full.get("body") or ""
+    return {
+        "title": entry.title,
+        "url": entry.link,
+        # 短摘要，用在消息里的预览
+        "summary": summary_text or body[:200],
+        # 正文，给报纸模板用
+        "body": body,
+        "paragraphs": full.get("paragraphs") or [],
+        # 优先：正文页图片 > summary 里的图片
+        "image_url": full.get("image_url") or img_from_summary,
+    }
+
+
 def fetch_nme_music_news(limit: int = 5) -> list[dict]:
-    feed = feedparser.parse("https://www.nme.com/news/music/rss")
+    feed = feedparser.parse(NME_RSS_URL)
     stories: list[dict] = []
 
     for entry in feed.entries[:limit]:
-        raw_summary = getattr(entry, "summary", "") or ""
-        summary_text, img_from_summary = parse_nme_summary(raw_summary)
-
-        url = entry.link
-
-        body = ""
-        paragraphs = []
-        img_from_page = None
+        full = None
         try:
-            full = fetch_nme_full_article(url)
-            body = full.get("body") or ""
-            paragraphs = full.get("paragraphs") or []
-            img_from_page = full.get("image_url")
+            full = fetch_nme_full_article(entry.link)
         except Exception as e:
             print("[NME] fetch_nme_full_article error:", e)
-
-        story = {
-            "title": entry.title,
-            "url": url,
-            # 短摘要，用在消息里的预览
-            "summary": summary_text or body[:200],
-            # 正文，给报纸模板用
-            "body": body,
-            "paragraphs": paragraphs,
-            # 优先：正文页图片 > summary 里的图片
-            "image_url": img_from_page or img_from_summary,
-        }
-        stories.append(story)
+        stories.append(_nme_story(entry, full))
 
     return stories
 
 
+async def fetch_nme_music_news_async(
+    fetcher: AsyncFetcher,
+    limit: int = 5,
+    feed_url: str = NME_RSS_URL,
+) -> list[dict]:
+    """
+    Async fetch_nme_music_news: the feed, then every article page concurrently.
+    HTML parsing runs in a worker thread so the agent's event loop keeps going.
+    """
+    feed_resp = await fetcher.get(feed_url)
+    feed = await asyncio.to_thread(feedparser.parse, feed_resp.body)
+    return await nme_stories_from_entries(fetcher, feed.entries[:limit])
+
+
+async def nme_stories_from_entries(fetcher: AsyncFetcher, entries: list) -> list[dict]:
+    # Story dicts for already parsed feed entries: article pages fetched concurrently, parsed off the loop.
+    pages = await fetcher.get_many([entry.link for entry in entries])
+
+    def parse_all() -> list[dict]:
+        stories = []
+        for entry, page in zip(entries, pages):
+            full = None
+            if isinstance(page, Exception):
+                print("[NME] article fetch error:", page)
+            else:
+                try:
+                    full = parse_nme_article(page.text)
+                except Exception as e:
+                    print("[NME] parse_nme_article error:", e)
+            stories.append(_nme_story(entry, full))
+        return stories
+
+    return await asyncio.to_thread(parse_all)
+
+
 def fetch_url_content(url: str, max_length: int = 5000) -> str:
     """
     Fetch and extract text content from a URL.
@@ -0,0 +1,101 @@
+"""
+Persistent seen-item index for the news hunter.
+Stores an 8-byte hash and a first-seen time per URL (12 bytes a record), bounded by
+count and age, and survives restarts so old stories are not re-posted.
+"""
+
+import hashlib
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+_RECORD = struct.Struct("<QI")  # url hash, first-seen unix time
+_MAGIC = b"SEEN1\n"
+
+
+def url_key(url: str) -> int:
+    # Stable 64-bit key; whitespace and a trailing slash do not make a story new.
+    norm = url.strip().rstrip("/")
+    return int.from_bytes(hashlib.blake2b(norm.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class SeenIndex:
+    """
+    Hash set of seen URLs with age-based eviction.
+
+    Args:
+        path: File to load from and save to (None = memory only)
+        max_items: Keep at most this many, newest first-seen wins
+        max_age_days: Forget URLs first seen longer ago than this
+
+    Writes go to a temp file and are renamed into place, so a crash never leaves
+    a half-written index.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_items: int = 20000, max_age_days: float = 30.0):
+        self.path = Path(path) if path else None
+        self.max_items = max(1, int(max_items))
+        self.max_age = max_age_days * 86400
+        self._seen: dict = {}
+        self._dirty = False
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, url: str) -> bool:
+        return url_key(url) in self._seen
+
+    def add(self, url: str, now: Optional[float] = None):
+        key = url_key(url)
+        if key not in self._seen:
+            self._seen[key] = int(now if now is not None else time.time())
+            self._dirty = True
+
+    def add_many(self, urls: Iterable[str], now: Optional[float] = None):
+        for url in urls:
+            self.add(url, now)
+
+    def unseen(self, urls: Iterable[str]) -> list:
+        return [u for u in urls if u and u not in self]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        # Drop expired URLs, then the oldest beyond max_items; returns how many were dropped.
+        now = time.time() if now is None else now
+        before = len(self._seen)
+        cutoff = now - self.max_age
+        kept = [(k, t) for k, t in self._seen.items() if t >= cutoff]
+        if len(kept) > self.max_items:
+            kept.sort(key=lambda kt: kt[1])
+            kept = kept[-self.max_items:]
+        if len(kept) != before:
+            self._seen = dict(kept)
+            self._dirty = True
+        return before - len(self._seen)
+
+    def _load(self):
+        data = self.path.read_bytes()
+        if not data.startswith(_MAGIC):
+            print(f"[SeenIndex] ignoring {self.path}: not a seen index")
+            return
+        body = data[len(_MAGIC):]
+        body = body[: len(body) - len(body) % _RECORD.size]
+        self._seen = {k: t for k, t in _RECORD.iter_unpack(body)}
+        self.prune()
+        self._dirty = False
+
+    def save(self):
+        # Prune and write the index if it changed since the last save.
+        self.prune()
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(b"".join(_RECORD.pack(k, t) for k, t in self._seen.items()))
+        os.replace(tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,219 @@
+# tools/summarizer.py
+
+# Article summarizer shared by the news tools: a lazily loaded transformers model whose calls are
+# batched across threads, and a TF-IDF extractive fallback for hosts without the model.
+
+import math
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Optional
+
+MODES = ("auto", "abstractive", "extractive")
+DEFAULT_MODEL = "facebook/bart-large-cnn"
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his i in is it its of on or "
+    "our she that the their they this to was we were which who will with you".split()
+)
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text.strip()) if s.strip()]
+
+
+def extractive_summary(text: str, max_sentences: int = 3, max_chars: int = 600) -> str:
+    # Top sentences by summed TF-IDF weight (sentences as documents), kept in article order.
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)[:max_chars]
+    tokens = [[w for w in _WORD_RE.findall(s.lower()) if w not in _STOPWORDS] for s in sentences]
+    df = Counter(w for toks in tokens for w in set(toks))
+    n = len(sentences)
+    idf = {w: math.log((1 + n) / (1 + c)) + 1.0 for w, c in df.items()}
+    scores = []
+    for i, toks in enumerate(tokens):
+        if not toks:
+            scores.append(0.0)
+            continue
+        tf = Counter(toks)
+        weight = sum(c * idf[w] for w, c in tf.items()) / math.sqrt(len(toks))
+        scores.append(weight * (1.1 if i == 0 else 1.0))  # slight lead bias, news style
+    best = sorted(sorted(range(n), key=lambda i: -scores[i])[:max_sentences])
+    summary = ""
+    for i in best:
+        if summary and len(summary) + 1 + len(sentences[i]) > max_chars:
+            break
+        summary = f"{summary} {sentences[i]}".strip()
+    return summary or sentences[0][:max_chars]
+
+
+class Summarizer:
+    """
+    Summaries on demand, model loaded on first use.
+
+    Args:
+        mode: "abstractive" (transformers model), "extractive" (TF-IDF), or "auto"
+            (model if it loads, extractive otherwise)
+        model: Hugging Face model name for the abstractive mode
+        batch_size: Max texts per model forward pass
+        max_wait: Seconds the batcher waits for more texts before running a partial batch
+        device: transformers device (-1 = CPU)
+
+    summarize() may be called from many threads at once: abstractive requests are
+    queued and one worker thread runs them in batches.
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        model: str = DEFAULT_MODEL,
+        batch_size: int = 8,
+        max_wait: float = 0.05,
+        device: int = -1,
+        max_length: int = 120,
+        min_length: int = 40,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown summarizer mode: {mode}")
+        self.mode = mode
+        self.model = model
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max_wait
+        self.device = device
+        self.max_length = max_length
+        self.min_length = min_length
+        self._pipeline = None
+        self._load_error: Optional[str] = None
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._metrics_lock = threading.Lock()
+        self._metrics = {m: {"items": 0, "batches": 0, "seconds": 0.0} for m in ("abstractive", "extractive")}
+        self.load_seconds = 0.0
+
+    def _load(self):
+        # Build the transformers pipeline once; None (and remember why) if it cannot be loaded.
+        with self._load_lock:
+            if self._pipeline is None and self._load_error is None:
+                t0 = time.perf_counter()
+                try:
+                    from transformers import pipeline
+
+                    self._pipeline = pipeline("summarization", model=self.model, device=self.device)
+                except Exception as e:
+                    self._load_error = f"{type(e).__name__}: {e}"
+                    print(f"[Summarizer] could not load {self.model}: {self._load_error}")
+                self.load_seconds = time.perf_counter() - t0
+        return self._pipeline
+
+    def active_mode(self) -> str:
+        if self.mode == "extractive":
+            return "extractive"
+        if self._load() is None:
+            if self.mode == "abstractive":
+                raise RuntimeError(f"Summarization model {self.model} unavailable: {self._load_error}")
+            return "extractive"
+        return "abstractive"
+
+    def _record(self, mode: str, items: int, seconds: float):
+        with self._metrics_lock:
+            m = self._metrics[mode]
+            m["items"] += items
+            m["batches"] += 1
+            m["seconds"] += seconds
+
+    def summarize(self, text: str) -> str:
+        if self.active_mode() == "extractive":
+            t0 = time.perf_counter()
+            summary = extractive_summary(text)
+            self._record("extractive", 1, time.perf_counter() - t0)
+            return summary
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        self._ensure_worker()
+        return fut.result()
+
+    def summarize_many(self, texts: list[str]) -> list[str]:
+        # One call for a known batch (no queueing); same output as summarize() per text.
+        if not texts:
+            return []
+        if self.active_mode() == "extractive":
+            t0 = time.perf_counter()
+            out = [extractive_summary(t) for t in texts]
+            self._record("extractive", len(out), time.perf_counter() - t0)
+            return out
+        out = []
+        for i in range(0, len(texts), self.batch_size):
+            out.extend(self._run_model(texts[i:i + self.batch_size]))
+        return out
+
+    def _run_model(self, texts: list[str]) -> list[str]:
+        t0 = time.perf_counter()
+        results = self._pipeline(
+            texts,
+            max_length=self.max_length,
+            min_length=self.min_length,
+            do_sample=False,
+            truncation=True,
+            batch_size=len(texts),
+        )
+        self._record("abstractive", len(texts), time.perf_counter() - t0)
+        return [r["summary_text"] for r in results]
+
+    def _ensure_worker(self):
+        with self._load_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._batch_loop, name="summarizer", daemon=True)
+                self._worker.start()
+
+    def _batch_loop(self):
+        # Collect up to batch_size queued texts (waiting at most max_wait for stragglers), run them together.
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                summaries = self._run_model([text for text, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), summary in zip(batch, summaries):
+                fut.set_result(summary)
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            out = {"mode": self.mode, "model_loaded": self._pipeline is not None, "load_s": self.load_seconds}
+            for mode, m in self._metrics.items():
+                out[mode] = {
+                    **m,
+                    "avg_batch": m["items"] / m["batches"] if m["batches"] else 0.0,
+                    "items_per_s": m["items"] / m["seconds"] if m["seconds"] else 0.0,
+                }
+        return out
+
+
+_shared: Optional[Summarizer] = None
+_shared_lock = threading.Lock()
+
+
+def get_summarizer(**kwargs) -> Summarizer:
+    # Process-wide instance, created on first call (kwargs only apply then).
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Summarizer(**kwargs)
+        return _shared
@@ -1,14 +1,18 @@
 # Utilities for converting audio into Jianpu notation and MIDI using pitch tracking.
 
 import numpy as np
+import io
 import os
+import subprocess
 import tempfile
+import threading
 from typing import Optional, List
-from mido import Message, MidiFile, MidiTrack, MetaMessage, bpm2tempo
+from mido import MidiFile
 import matplotlib.pyplot as plt
 import librosa
 from pydub import AudioSegment
-import re
+
+import score
 
 
 
@@ -19,12 +23,20 @@ MAJOR_INTERVALS = np.array([0, 2, 4, 5, 7, 9, 11])
 MINOR_INTERVALS = np.array([0, 2, 3, 5, 7, 8, 10])
 
 DEGREE_STR = ["1","2","3","4","5","6","7"]
-TOKEN_RE = re.compile(r"^(?P<acc>[#b]*)(?P<deg>[1-7])(?P<oct>[',]*)$")
+REST_CODE = np.iinfo(np.int64).min  # frame code for rests in run-length compression
 FFMPEG = r"D:\OpenAgents\music_free\ffmpeg-2025-12-10-git-4f947880bd-essentials_build\bin\ffmpeg.exe"
 FFPROBE = r"D:\OpenAgents\music_free\ffmpeg-2025-12-10-git-4f947880bd-essentials_build\bin\ffprobe.exe"
 bin_dir = os.path.dirname(FFMPEG)
 os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
 
+# Fixed analysis rate for in-memory decoding (load_audio_bytes).
+TARGET_SR = 22050
+# Containers libsndfile reads directly; anything else (webm/opus, mp4, ...) is piped through ffmpeg.
+SOUNDFILE_MIME_TYPES = {
+    "audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave",
+    "audio/flac", "audio/x-flac", "audio/ogg", "audio/mpeg", "audio/mp3",
+}
+
 def limit_rests(tokens: List[str], max_rest_ratio: float = 0.2) -> List[str]:
     # Limit the proportion of rest tokens ("0") relative to note tokens.
     if not tokens:
@@ -95,6 +107,190 @@ def load_audio(path: str):
     return y, sr
 
 
+def load_audio_bytes(buf, mime_type: str = "application/octet-stream", sr: int = TARGET_SR):
+    """
+    Decode an in-memory recording straight to float32 mono at `sr`, without temp files.
+    - buf: bytes-like or a binary file object (e.g. BytesIO)
+    - WAV/FLAC/OGG/MP3 are decoded by libsndfile from a BytesIO
+    - other formats (browser webm/opus, ...) go through an ffmpeg stdin -> stdout pipe
+    """
+    data = buf.read() if hasattr(buf, "read") else bytes(buf)
+    if not data:
+        return np.zeros(0, dtype=np.float32), sr
+
+    mime = (mime_type or "").split(";")[0].strip().lower()
+    if mime in SOUNDFILE_MIME_TYPES:
+        try:
+            import soundfile as sf
+
+            y, native_sr = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+            y = y.mean(axis=1)
+            if native_sr != sr:
+                y = librosa.resample(y, orig_sr=native_sr, target_sr=sr)
+            return np.ascontiguousarray(y, dtype=np.float32), sr
+        except Exception:
+            pass  # let ffmpeg have a go
+
+    ffmpeg = FFMPEG if os.path.exists(FFMPEG) else "ffmpeg"
+    proc = subprocess.run(
+        [ffmpeg, "-v", "error", "-i", "pipe:0", "-f", "f32le", "-ac", "1", "-ar", str(sr), "pipe:1"],
+        input=data,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode {mime or 'audio'}: {proc.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(proc.stdout, dtype=np.float32).copy(), sr
+
+
+class StreamDecoder:
+    """
+    One ffmpeg process per recording uploaded in segments (browser webm/opus chunks).
+    - Segments only decode after the header of the first one, so they are written to a
+      persistent ffmpeg stdin pipe instead of re-decoding the whole upload each time.
+    - A reader thread drains stdout, so write() never blocks on a full pipe.
+    - write() returns the samples decoded so far (float32 mono at sr), close() the rest.
+    """
+
+    def __init__(self, sr: int = TARGET_SR):
+        self.sr = sr
+        ffmpeg = FFMPEG if os.path.exists(FFMPEG) else "ffmpeg"
+        self._proc = subprocess.Popen(
+            [
+                ffmpeg, "-v", "error", "-probesize", "32768", "-analyzeduration", "0",
+                "-i", "pipe:0", "-f", "f32le", "-ac", "1", "-ar", str(sr), "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._chunks: List[bytes] = []
+        self._lock = threading.Lock()
+        self._tail = b""  # partial float32 sample left over from the last read
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while True:
+            data = self._proc.stdout.read1(65536)
+            if not data:
+                return
+            with self._lock:
+                self._chunks.append(data)
+
+    def _take(self) -> np.ndarray:
+        with self._lock:
+            data = self._tail + b"".join(self._chunks)
+            self._chunks = []
+        n = len(data) - len(data) % 4
+        self._tail = data[n:]
+        return np.frombuffer(data[:n], dtype=np.float32).copy()
+
+    def _error(self) -> RuntimeError:
+        self._proc.wait()
+        return RuntimeError(f"ffmpeg failed to decode the stream: {self._proc.stderr.read().decode(errors='replace').strip()}")
+
+    def write(self, data: bytes) -> np.ndarray:
+        try:
+            self._proc.stdin.write(data)
+            self._proc.stdin.flush()
+        except BrokenPipeError:
+            raise self._error() from None
+        return self._take()
+
+    def close(self) -> np.ndarray:
+        # End of the recording: let ffmpeg flush and return the remaining samples.
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._reader.join()
+        if self._proc.wait() != 0:
+            raise self._error()
+        return self._take()
+
+    def abort(self):
+        # Drop an abandoned stream without waiting for ffmpeg to finish.
+        self._proc.kill()
+        self._proc.wait()
+        self._reader.join()
+
+
+def _f0_pyin(y, sr, fmin_hz, fmax_hz, frame_length, hop_length):
+    # Probabilistic YIN with Viterbi decoding: most robust, slowest.
+    f0, voiced_flag, _ = librosa.pyin(
+        y,
+        fmin=fmin_hz,
+        fmax=fmax_hz,
+        frame_length=frame_length,
+        hop_length=hop_length,
+    )
+    return f0, voiced_flag
+
+
+def _f0_yin(
+    y, sr, fmin_hz, fmax_hz, frame_length, hop_length,
+    threshold: float = 0.1,
+    silence_db: float = -60.0,
+    block: int = 2048,
+):
+    """
+    Vectorized YIN over all frames at once, framed like pyin (centered, zero padded).
+    - difference function d(tau) = E(0) + E(tau) - 2 r(tau), with r from one rFFT per frame
+    - first dip of the cumulative-mean-normalized d below `threshold`, then parabolic refinement
+    - frames without a dip (or below `silence_db` energy) are unvoiced (NaN), no Viterbi smoothing
+    - processed in blocks of `block` frames to bound memory on long recordings
+    """
+    y = np.asarray(y, dtype=np.float64)
+    frames = librosa.util.frame(
+        np.pad(y, frame_length // 2), frame_length=frame_length, hop_length=hop_length
+    ).T  # (n_frames, frame_length)
+
+    win = frame_length // 2
+    tau_min = max(1, int(np.floor(sr / fmax_hz)))
+    tau_max = min(frame_length - win, int(np.ceil(sr / fmin_hz)))
+    taus = np.arange(1, tau_max + 1)
+    silence = win * 10 ** (silence_db / 10)
+
+    f0 = np.full(frames.shape[0], np.nan)
+    for start in range(0, frames.shape[0], block):
+        x = frames[start:start + block]
+
+        spec = np.fft.rfft(x, frame_length, axis=1)
+        spec_w = np.fft.rfft(x[:, :win], frame_length, axis=1)
+        r = np.fft.irfft(spec * np.conj(spec_w), frame_length, axis=1)[:, : tau_max + 1]
+
+        csum = np.concatenate([np.zeros((len(x), 1)), np.cumsum(x ** 2, axis=1)], axis=1)
+        energy = csum[:, win : win + tau_max + 1] - csum[:, : tau_max + 1]  # E(tau), tau = 0..tau_max
+        d = np.maximum(energy[:, :1] + energy - 2 * r, 0.0)
+
+        cmnd = np.ones_like(d)
+        mean_d = np.cumsum(d[:, 1:], axis=1) / taus
+        np.divide(d[:, 1:], mean_d, out=cmnd[:, 1:], where=mean_d > 0)
+
+        # First local minimum under the threshold inside [tau_min, tau_max - 1].
+        c = cmnd[:, tau_min - 1 : tau_max + 1]
+        dip = (c[:, 1:-1] < threshold) & (c[:, 1:-1] <= c[:, :-2]) & (c[:, 1:-1] <= c[:, 2:])
+        found = dip.any(axis=1) & (energy[:, 0] > silence)
+        rows = np.nonzero(found)[0]
+        tau = dip[rows].argmax(axis=1) + tau_min
+
+        a, b, cc = cmnd[rows, tau - 1], cmnd[rows, tau], cmnd[rows, tau + 1]
+        den = a - 2 * b + cc
+        shift = np.divide(0.5 * (a - cc), den, out=np.zeros_like(den), where=np.abs(den) > 1e-12)
+        f0[start + rows] = sr / (tau + np.clip(shift, -1.0, 1.0))
+
+    return f0, ~np.isnan(f0)
+
+
+# Registered F0 estimators: name -> fn(y, sr, fmin_hz, fmax_hz, frame_length, hop_length) -> (f0, voiced).
+F0_BACKENDS = {
+    "pyin": _f0_pyin,
+    "yin": _f0_yin,
+}
+F0_BACKEND_ALIASES = {"fast": "yin", "accurate": "pyin"}
+
+
 def estimate_f0(
     y: np.ndarray,
     sr: int,
@@ -102,19 +298,81 @@ def estimate_f0(
     fmax: str = "C6",
     frame_length: int = 2048,
     hop_length: int = 256,
+    backend: str = "pyin",
 ):
-    # Estimate frame-level F0 using librosa's probabilistic YIN (pyin).
-    f0, voiced_flag, voiced_prob = librosa.pyin(
-        y,
-        fmin=librosa.note_to_hz(fmin),
-        fmax=librosa.note_to_hz(fmax),
-        frame_length=frame_length,
-        hop_length=hop_length,
+    # Estimate frame-level F0 (NaN where unvoiced) with the selected backend; pyin by default.
+    name = F0_BACKEND_ALIASES.get(backend, backend)
+    if name not in F0_BACKENDS:
+        raise ValueError(f"Unknown F0 backend: {backend} (choose from {sorted(F0_BACKENDS)})")
+    f0, voiced_flag = F0_BACKENDS[name](
+        y, sr,
+        librosa.note_to_hz(fmin),
+        librosa.note_to_hz(fmax),
+        frame_length,
+        hop_length,
     )
     times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=hop_length)
     return f0, voiced_flag, times
 
 
+def voiced_segments(active: np.ndarray, pad_frames: int = 2, min_gap_frames: int = 0) -> List[tuple]:
+    """
+    Frame ranges [start, stop) that cover the active frames.
+    - every active run is widened by pad_frames on both sides
+    - runs separated by fewer than min_gap_frames inactive frames are merged
+    """
+    active = np.asarray(active, dtype=bool)
+    if not active.any():
+        return []
+    idx = np.flatnonzero(np.diff(np.concatenate([[0], active.view(np.int8), [0]])))
+    starts = np.maximum(idx[0::2] - pad_frames, 0)
+    stops = np.minimum(idx[1::2] + pad_frames, active.size)
+    # A gap that the padding (plus min_gap_frames) closes is not worth a separate estimator call.
+    keep = np.concatenate([[True], starts[1:] > stops[:-1] + min_gap_frames])
+    return list(zip(starts[keep].tolist(), np.append(stops[:-1][keep[1:]], stops[-1]).tolist()))
+
+
+def estimate_f0_gated(
+    y: np.ndarray,
+    sr: int,
+    active: np.ndarray,
+    fmin: str = "C2",
+    fmax: str = "C6",
+    frame_length: int = 2048,
+    hop_length: int = 256,
+    backend: str = "pyin",
+    pad_frames: int = 2,
+):
+    """
+    estimate_f0 on the active frames only; everything else comes back unvoiced (NaN).
+    - active: bool per frame (len = 1 + len(y) // hop_length), e.g. rms >= threshold
+    - each segment is analysed on a slice with frame_length/2 of extra context on both
+      sides, so its frames see exactly the samples they would in a full-length run
+    """
+    n_frames = 1 + len(y) // hop_length
+    f0 = np.full(n_frames, np.nan)
+    voiced_flag = np.zeros(n_frames, dtype=bool)
+    ctx = -(-(frame_length // 2) // hop_length)  # context frames per side
+
+    for start, stop in voiced_segments(active[:n_frames], pad_frames, min_gap_frames=2 * ctx):
+        a, b = max(0, start - ctx), min(n_frames, stop + ctx)
+        s0 = a * hop_length
+        s1 = len(y) if b == n_frames else (b - 1) * hop_length
+        seg_f0, seg_voiced, _ = estimate_f0(
+            y[s0:s1], sr,
+            fmin=fmin,
+            fmax=fmax,
+            frame_length=frame_length,
+            hop_length=hop_length,
+            backend=backend,
+        )
+        f0[start:stop] = seg_f0[start - a : stop - a]
+        voiced_flag[start:stop] = seg_voiced[start - a : stop - a]
+
+    times = librosa.frames_to_time(np.arange(n_frames), sr=sr, hop_length=hop_length)
+    return f0, voiced_flag, times
+
+
 def compute_rms(y: np.ndarray, frame_length: int = 2048, hop_length: int = 256) -> np.ndarray:
     # Frame-level RMS energy for basic activity/volume estimation.
     return librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
@@ -168,8 +426,15 @@ def plot_f0(times: np.ndarray, f0: np.ndarray, ymin: float = 50.0, ymax: float =
     plt.tight_layout()
     plt.show()
 
+# Rows are the 24 candidate keys in (tonic 0 major, tonic 0 minor, tonic 1 major, ...) order,
+# so argmax keeps the tie-breaking of the original per-tonic loop.
+KS_PROFILES = np.stack(
+    [np.roll(p, t) for t in range(12) for p in (KS_MAJOR, KS_MINOR)]
+)
+
+
 def estimate_key_ks(midi_notes: np.ndarray):
-    # Key estimation using Krumhansl-Schmuckler profiles for major/minor.
+    # Key estimation using Krumhansl-Schmuckler profiles for major/minor (one 24x12 product).
     midi_int = np.round(midi_notes).astype(int)
     pc = np.mod(midi_int, 12)
     hist = np.bincount(pc, minlength=12).astype(float)
@@ -177,19 +442,9 @@ def estimate_key_ks(midi_notes: np.ndarray):
         return 0, "major", 0.0
     hist = hist / (hist.sum() + 1e-9)
 
-    best_score = -1e18
-    best_tonic = 0
-    best_mode = "major"
-
-    for t in range(12):
-        s_major = float(np.dot(hist, np.roll(KS_MAJOR, t)))
-        s_minor = float(np.dot(hist, np.roll(KS_MINOR, t)))
-        if s_major > best_score:
-            best_score, best_tonic, best_mode = s_major, t, "major"
-        if s_minor > best_score:
-            best_score, best_tonic, best_mode = s_minor, t, "minor"
-
-    return best_tonic, best_mode, best_score
+    scores = KS_PROFILES @ hist
+    best = int(np.argmax(scores))
+    return best // 2, ("major" if best % 2 == 0 else "minor"), float(scores[best])
 
 
 def pick_tonic_midi(tonic_pc: int, midi_int: np.ndarray) -> int:
@@ -240,6 +495,70 @@ def midi_to_jianpu_symbol(m: int, tonic_midi: int,mode:str) -> str:
     return degree
 
 
+def _degree_tables(intervals: np.ndarray):
+    # Lookup tables indexed by semitone-above-tonic (0..11): scale degree index and accidental.
+    rel = np.arange(12)
+    idx = np.argmin(np.abs(intervals[None, :] - rel[:, None]), axis=1)
+    acc = rel - intervals[idx]
+    acc = np.where(acc > 6, acc - 12, np.where(acc < -6, acc + 12, acc))
+    return idx, acc
+
+
+DEGREE_TABLES = {
+    "major": _degree_tables(MAJOR_INTERVALS),
+    "minor": _degree_tables(MINOR_INTERVALS),
+}
+
+
+def midi_to_jianpu_parts(midi_int: np.ndarray, tonic_midi: int, mode: str):
+    """
+    Array version of midi_to_jianpu_symbol.
+    Returns (degree 1..7, accidental in semitones, octave offset) per note.
+    """
+    delta = np.asarray(midi_int, dtype=np.int64) - int(tonic_midi)
+    octv = np.floor_divide(delta, 12)
+    rel = np.mod(delta, 12)
+    deg_idx, acc = DEGREE_TABLES["major" if mode == "major" else "minor"]
+    return deg_idx[rel] + 1, acc[rel], octv
+
+
+def _format_jianpu(degree: int, acc: int, octv: int) -> str:
+    s = DEGREE_STR[degree - 1]
+    if acc > 0:
+        s = "#" * acc + s
+    elif acc < 0:
+        s = "b" * (-acc) + s
+    if octv > 0:
+        s += "'" * octv
+    elif octv < 0:
+        s += "," * (-octv)
+    return s
+
+
+def midi_to_jianpu_symbols(midi_int: np.ndarray, tonic_midi: int, mode: str) -> np.ndarray:
+    # Batched midi_to_jianpu_symbol: only distinct pitches are formatted into strings.
+    midi_int = np.asarray(midi_int, dtype=np.int64)
+    if midi_int.size == 0:
+        return np.empty(0, dtype=object)
+    uniq, inv = np.unique(midi_int, return_inverse=True)
+    degree, acc, octv = midi_to_jianpu_parts(uniq, tonic_midi, mode)
+    table = np.array(
+        [_format_jianpu(int(d), int(a), int(o)) for d, a, o in zip(degree, acc, octv)],
+        dtype=object,
+    )
+    return table[inv.reshape(midi_int.shape)]
+
+
+def compress_codes(codes: np.ndarray, min_len: int = 3) -> np.ndarray:
+    # Array version of compress_symbols: one value per run of length >= min_len.
+    codes = np.asarray(codes)
+    if codes.size == 0:
+        return codes
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, codes.size])
+    return codes[starts[lengths >= min_len]]
+
+
 def compress_symbols(symbols: List[str], min_len: int = 3) -> List[str]:
     """
     Simple note-level compression:
@@ -265,18 +584,33 @@ def compress_symbols(symbols: List[str], min_len: int = 3) -> List[str]:
     return out
 
 
-def smooth_midi(midi: np.ndarray, win: int = 7) -> np.ndarray:
+def smooth_midi(midi: np.ndarray, win: int = 7, block: int = 1 << 16) -> np.ndarray:
     """
     Median filter to reduce jitter. Good for voice, sometimes too aggressive for staccato piano.
-
+    - Centered window of 2 * (win // 2) + 1 frames; the first/last win // 2 frames are kept as-is.
+    - Windows are strided views (no per-frame slices); rows are processed in blocks
+      so memory stays bounded on long recordings.
     """
-    # Apply a simple median filter in MIDI space to smooth noisy pitch tracks.
+    # Apply a median filter in MIDI space to smooth noisy pitch tracks.
     if len(midi) < win:
         return midi
     half = win // 2
+    w = 2 * half + 1
     sm = midi.copy()
-    for i in range(half, len(midi) - half):
-        sm[i] = np.median(midi[i - half : i + half + 1])
+    if half == 0 or len(midi) < w:
+        return sm
+
+    windows = np.lib.stride_tricks.sliding_window_view(midi, w)
+    # For an odd window the median is the middle order statistic; partition is O(w)
+    # per row. np.median is kept for NaN input so NaN propagates as before.
+    has_nan = np.issubdtype(midi.dtype, np.floating) and bool(np.isnan(midi).any())
+    for start in range(0, len(windows), block):
+        rows = windows[start : start + block]
+        if has_nan:
+            med = np.median(rows, axis=1)
+        else:
+            med = np.partition(rows, half, axis=1)[:, half]
+        sm[half + start : half + start + len(rows)] = med
     return sm
 
 
@@ -286,6 +620,7 @@ def f0_to_jianpu(
     tonic_midi_user: Optional[int] = None,  # if provided, treat as "1"
     use_smoothing: bool = False,
     min_run_frames: int = 3,
+    smooth_win: int = 7,
 ) -> str:
     """
     Convert f0 (Hz per frame) to simplified Jianpu sequence:
@@ -303,7 +638,7 @@ def f0_to_jianpu(
     midi_voiced = librosa.hz_to_midi(f0_voiced)
 
     if use_smoothing:
-        midi_voiced = smooth_midi(midi_voiced, win=7)
+        midi_voiced = smooth_midi(midi_voiced, win=smooth_win)
 
     midi_int = np.round(midi_voiced).astype(int)
 
@@ -321,18 +656,19 @@ def f0_to_jianpu(
     print("tonic_midi:", tonic_midi, "tonic_pc:", tonic_midi % 12, "mode:", mode_use, "score:", score)
     print("midi range:", int(midi_int.min()), int(midi_int.max()), "median:", int(np.median(midi_int)))
 
-    # 2) Convert each frame into a Jianpu symbol or rest, then compress.
-    symbols: List[str] = []
-    it = iter(midi_int.tolist())
-    for v in f0:
-        if np.isnan(v):
-            symbols.append("0")  # rest
-        else:
-            m = next(it)
-            symbols.append(midi_to_jianpu_symbol(int(m), tonic_midi, mode_use))
-
+    # 2) Run-length compress frame pitches (rests as a sentinel), then map the
+    #    surviving runs to Jianpu symbols. Pitch -> symbol is one-to-one for a
+    #    fixed tonic, so compressing pitches equals compressing symbols.
+    codes = np.full(len(f0), REST_CODE, dtype=np.int64)
+    codes[~np.isnan(f0)] = midi_int
+    runs = compress_codes(codes, min_len=min_run_frames)
 
-    symbols2 = compress_symbols(symbols, min_len=min_run_frames)
+    symbols2: List[str] = ["0"] * len(runs)  # rest
+    is_note = runs != REST_CODE
+    if np.any(is_note):
+        note_syms = midi_to_jianpu_symbols(runs[is_note], tonic_midi, mode_use)
+        for k, sym in zip(np.flatnonzero(is_note), note_syms):
+            symbols2[k] = sym
 
 
     symbols2 = limit_rests(symbols2, max_rest_ratio=0.2)
@@ -340,25 +676,343 @@ def f0_to_jianpu(
     return " ".join(symbols2)
 
 
+# Note-level output of analyze_notes: MIDI pitch, onset and duration in seconds.
+NOTE_DTYPE = np.dtype([("pitch", np.int16), ("onset", np.float64), ("duration", np.float64)])
+
+
+def _runs(codes: np.ndarray):
+    # (start, stop, code) arrays for the runs of equal values in codes.
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    stops = np.r_[starts[1:], codes.size]
+    return starts, stops, codes[starts]
+
+
+def analyze_notes(
+    y: np.ndarray,
+    sr: int,
+    fmin: str = "C2",
+    fmax: str = "C6",
+    frame_length: int = 2048,
+    coarse_hop: int = 1024,
+    fine_hop: int = 256,
+    rms_floor: float = 0.02,
+    rms_ratio: float = 0.2,
+    min_note_s: float = 0.08,
+    max_refine_per_s: float = 8.0,
+    backend: str = "yin",
+) -> np.ndarray:
+    """
+    Coarse-to-fine note segmentation; returns a NOTE_DTYPE array.
+    - audio is resampled to TARGET_SR first, so cost does not depend on the upload's rate
+    - coarse pass: F0 at coarse_hop on the RMS-gated frames, rounded to semitones; runs
+      shorter than min_note_s are merged into the previous run
+    - fine pass: F0 at fine_hop only between the two coarse frames around each note
+      boundary, to place the onset/offset at fine resolution
+    - at most max_refine_per_s boundaries per second of audio are refined (largest pitch
+      jumps first); the rest keep their coarse position, so compute per second is bounded
+    """
+    y = np.asarray(y, dtype=np.float32)
+    if sr != TARGET_SR:
+        y = librosa.resample(y, orig_sr=sr, target_sr=TARGET_SR)
+        sr = TARGET_SR
+    if y.size == 0:
+        return np.zeros(0, dtype=NOTE_DTYPE)
+
+    # 1) Coarse pass.
+    rms_c = compute_rms(y, frame_length=frame_length, hop_length=coarse_hop)
+    thr = adaptive_rms_threshold(rms_c, floor=rms_floor, ratio=rms_ratio)
+    f0_c, _, _ = estimate_f0_gated(
+        y, sr, rms_c >= thr,
+        fmin=fmin, fmax=fmax, frame_length=frame_length, hop_length=coarse_hop, backend=backend,
+    )
+    f0_c[rms_c < thr] = np.nan
+    midi_c = librosa.hz_to_midi(f0_c)
+    codes = np.full(f0_c.size, REST_CODE, dtype=np.int64)
+    voiced = ~np.isnan(midi_c)
+    codes[voiced] = np.round(midi_c[voiced]).astype(np.int64)
+
+    # Absorb runs that are too short to be notes (pitch glides, tracking blips).
+    min_frames = max(1, int(round(min_note_s * sr / coarse_hop)))
+    starts, stops, run_codes = _runs(codes)
+    for k in range(1, len(starts)):
+        if stops[k] - starts[k] < min_frames:
+            codes[starts[k]:stops[k]] = codes[starts[k] - 1]
+    starts, stops, run_codes = _runs(codes)
+    if not np.any(run_codes != REST_CODE):
+        return np.zeros(0, dtype=NOTE_DTYPE)
+
+    # Boundary k sits between coarse frames starts[k] - 1 and starts[k].
+    bounds = starts[1:].astype(np.float64) * coarse_hop  # in samples, coarse estimate
+    prev_c, next_c = run_codes[:-1], run_codes[1:]
+
+    # 2) Fine pass around the boundaries we can afford.
+    if bounds.size:
+        budget = int(max_refine_per_s * len(y) / sr)
+        jump = np.where((prev_c == REST_CODE) | (next_c == REST_CODE), 127, np.abs(next_c - prev_c))
+        chosen = np.sort(np.argsort(-jump, kind="stable")[:budget])
+
+        ratio = coarse_hop // fine_hop
+        n_fine = 1 + len(y) // fine_hop
+        lo = (starts[1:][chosen] - 1) * ratio
+        hi = np.minimum(starts[1:][chosen] * ratio + 1, n_fine)
+        active = np.zeros(n_fine, dtype=bool)
+        for a, b in zip(lo, hi):
+            active[a:b] = True
+
+        rms_f = compute_rms(y, frame_length=frame_length, hop_length=fine_hop)
+        f0_f, _, _ = estimate_f0_gated(
+            y, sr, active & (rms_f >= thr),
+            fmin=fmin, fmax=fmax, frame_length=frame_length, hop_length=fine_hop,
+            backend=backend, pad_frames=0,
+        )
+        midi_f = librosa.hz_to_midi(f0_f)
+        fine = np.full(n_fine, REST_CODE, dtype=np.int64)
+        ok = ~np.isnan(midi_f)
+        fine[ok] = np.round(midi_f[ok]).astype(np.int64)
+
+        for k, a, b in zip(chosen, lo, hi):
+            hit = np.flatnonzero(fine[a:b] == next_c[k])
+            if hit.size:
+                bounds[k] = (a + hit[0]) * fine_hop
+
+    # 3) Notes from the non-rest runs, with refined edges.
+    edges = np.r_[starts[0] * coarse_hop, bounds, stops[-1] * coarse_hop].astype(np.float64)
+    edges = np.minimum(edges, len(y))
+    is_note = run_codes != REST_CODE
+    notes = np.zeros(int(is_note.sum()), dtype=NOTE_DTYPE)
+    for i, k in enumerate(np.flatnonzero(is_note)):
+        seg = midi_c[starts[k]:stops[k]]
+        seg = seg[~np.isnan(seg)]
+        notes[i] = (int(np.round(np.median(seg))) if seg.size else run_codes[k], edges[k] / sr, (edges[k + 1] - edges[k]) / sr)
+    return notes
+
+
+def notes_to_jianpu(notes: np.ndarray, min_rest_s: float = 0.25, tonic_midi_user: Optional[int] = None) -> str:
+    # One Jianpu token per note, "0" for gaps of at least min_rest_s; key from duration-weighted pitches.
+    if notes.size == 0:
+        return ""
+    pitches = notes["pitch"].astype(np.int64)
+    if tonic_midi_user is not None:
+        tonic_midi, mode = int(tonic_midi_user), "major"
+    else:
+        weights = np.maximum(1, np.round(notes["duration"] * 100).astype(int))
+        tonic_pc, mode, _ = estimate_key_ks(np.repeat(pitches, weights))
+        tonic_midi = pick_tonic_midi(tonic_pc, np.repeat(pitches, weights))
+
+    symbols = midi_to_jianpu_symbols(pitches, tonic_midi, mode)
+    gaps = notes["onset"][1:] - (notes["onset"][:-1] + notes["duration"][:-1])
+    tokens: List[str] = [str(symbols[0])]
+    for gap, sym in zip(gaps, symbols[1:]):
+        if gap >= min_rest_s:
+            tokens.append("0")
+        tokens.append(str(sym))
+    return " ".join(limit_rests(tokens, max_rest_ratio=0.2))
+
+
+class StreamingTranscriber:
+    """
+    Incremental hum -> Jianpu transcription over a stream of audio chunks.
+    - Frames are cut exactly like estimate_f0 on the full signal (center=True with
+      zero padding), carrying the frame overlap between chunks.
+    - Only frames completed by the newest chunk are pitch-tracked, so the cost of
+      each feed() is bounded by the chunk size, not by the recording length.
+    - The key/tonic is locked once enough voiced frames were seen; after that every
+      closed stable run is final. The open run is provisional.
+    - finish() re-estimates the key over all frames with the batch RMS gate (f0_to_jianpu),
+      so a key that drifts after the lock only affects the provisional output.
+    """
+
+    def __init__(
+        self,
+        sr: int,
+        fmin: str = "C2",
+        fmax: str = "C6",
+        frame_length: int = 2048,
+        hop_length: int = 256,
+        min_run_frames: int = 3,
+        lock_seconds: float = 3.0,
+        rms_floor: float = 0.02,
+        rms_ratio: float = 0.2,
+    ):
+        self.sr = int(sr)
+        self.fmin = fmin
+        self.fmax = fmax
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.min_run_frames = min_run_frames
+        self.lock_frames = max(1, int(lock_seconds * self.sr / hop_length))
+        self.rms_floor = rms_floor
+        self.rms_ratio = rms_ratio
+
+        # Left zero pad mirrors librosa's center=True framing of the full signal.
+        self._buf = np.zeros(frame_length // 2, dtype=np.float32)
+        self._rms_ref = 0.0
+        self._finished = False
+
+        # Frames waiting for a tonic (midi as float, nan for rests).
+        self._pending_midi: List[np.ndarray] = []
+        self._voiced_count = 0
+        self.tonic_midi: Optional[int] = None
+        self.mode = "major"
+
+        self._tokens: List[str] = []
+        self._run_sym: Optional[str] = None
+        self._run_len = 0
+        self.frames_done = 0
+
+        # Ungated F0 and RMS of every frame, for the whole-recording pass in finish().
+        self._f0: List[np.ndarray] = []
+        self._rms: List[np.ndarray] = []
+        self._result = ""
+
+    @property
+    def locked(self) -> bool:
+        return self.tonic_midi is not None
+
+    def feed(self, y: np.ndarray) -> List[str]:
+        # Append a chunk of mono samples and return tokens finalized by it.
+        if self._finished:
+            raise RuntimeError("StreamingTranscriber already finished")
+        if y is not None and len(y):
+            self._buf = np.concatenate([self._buf, np.asarray(y, dtype=np.float32)])
+        return self._consume()
+
+    def finish(self) -> str:
+        # Flush the tail (right zero pad) and return the final Jianpu of the whole recording.
+        if not self._finished:
+            self._buf = np.concatenate([self._buf, np.zeros(self.frame_length // 2, dtype=np.float32)])
+            self._consume()
+            if not self.locked:
+                self._lock_tonic(force=True)
+            self._close_run()
+            self._finished = True
+
+            f0 = np.concatenate(self._f0) if self._f0 else np.empty(0)
+            rms = np.concatenate(self._rms) if self._rms else np.empty(0)
+            f0[rms < adaptive_rms_threshold(rms, floor=self.rms_floor, ratio=self.rms_ratio)] = np.nan
+            self._result = f0_to_jianpu(f0, min_run_frames=self.min_run_frames)
+        return self._result
+
+    def snapshot(self) -> tuple[List[str], List[str]]:
+        # (final tokens, provisional tokens) as they stand right now.
+        final = list(self._tokens)
+        if self.locked:
+            provisional = [self._run_sym] if self._run_sym is not None and self._run_len >= self.min_run_frames else []
+            return final, provisional
+
+        # Before the tonic is locked, everything is a guess based on what we have so far.
+        if not self._pending_midi:
+            return final, []
+        midi = np.concatenate(self._pending_midi)
+        voiced = midi[~np.isnan(midi)]
+        if voiced.size == 0:
+            return final, []
+        tonic_pc, mode, _ = estimate_key_ks(voiced)
+        tonic = pick_tonic_midi(tonic_pc, np.round(voiced).astype(int))
+        symbols = np.full(len(midi), "0", dtype=object)
+        is_voiced = ~np.isnan(midi)
+        symbols[is_voiced] = midi_to_jianpu_symbols(np.round(midi[is_voiced]).astype(int), tonic, mode)
+        return final, compress_symbols(symbols.tolist(), min_len=self.min_run_frames)
+
+    def _consume(self) -> List[str]:
+        # Pitch-track every full frame currently in the buffer, keep the overlap.
+        fl, hop = self.frame_length, self.hop_length
+        if len(self._buf) < fl:
+            return []
+        n_frames = 1 + (len(self._buf) - fl) // hop
+        seg = self._buf[: (n_frames - 1) * hop + fl]
+
+        f0, _, _ = librosa.pyin(
+            seg,
+            fmin=librosa.note_to_hz(self.fmin),
+            fmax=librosa.note_to_hz(self.fmax),
+            frame_length=fl,
+            hop_length=hop,
+            center=False,
+        )
+        rms = librosa.feature.rms(y=seg, frame_length=fl, hop_length=hop, center=False)[0]
+        self._buf = self._buf[n_frames * hop:]
+        self.frames_done += n_frames
+
+        # Running version of adaptive_rms_threshold: the reference only grows.
+        if rms.size:
+            self._rms_ref = max(self._rms_ref, float(np.percentile(rms, 95)))
+        thr = max(self.rms_floor, self._rms_ref * self.rms_ratio)
+        f0 = f0[:n_frames]
+        self._f0.append(f0)
+        self._rms.append(rms[:n_frames])
+        f0 = f0.copy()
+        f0[rms[:n_frames] < thr] = np.nan
+
+        midi = np.full(f0.shape, np.nan)
+        voiced = ~np.isnan(f0)
+        midi[voiced] = librosa.hz_to_midi(f0[voiced])
+
+        before = len(self._tokens)
+        if self.locked:
+            self._push_frames(midi)
+        else:
+            self._pending_midi.append(midi)
+            self._voiced_count += int(voiced.sum())
+            self._lock_tonic()
+        return self._tokens[before:]
+
+    def _lock_tonic(self, force: bool = False):
+        # Estimate key from the buffered frames and replay them through the run tracker.
+        if self.locked or (not force and self._voiced_count < self.lock_frames):
+            return
+        midi = np.concatenate(self._pending_midi) if self._pending_midi else np.empty(0)
+        voiced = midi[~np.isnan(midi)]
+        if voiced.size == 0:
+            self.tonic_midi, self.mode = 60, "major"
+        else:
+            tonic_pc, mode, _ = estimate_key_ks(voiced)
+            self.tonic_midi = pick_tonic_midi(tonic_pc, np.round(voiced).astype(int))
+            self.mode = mode if mode in ("major", "minor") else "major"
+        self._pending_midi = []
+        self._push_frames(midi)
+
+    def _push_frames(self, midi: np.ndarray):
+        # Frame symbols -> run-length tracker; a run is final once it closes.
+        symbols = np.full(len(midi), "0", dtype=object)
+        voiced = ~np.isnan(midi)
+        symbols[voiced] = midi_to_jianpu_symbols(np.round(midi[voiced]).astype(int), self.tonic_midi, self.mode)
+        for s in symbols:
+            if s == self._run_sym:
+                self._run_len += 1
+            else:
+                self._close_run()
+                self._run_sym, self._run_len = s, 1
+
+    def _close_run(self):
+        if self._run_sym is not None and self._run_len >= self.min_run_frames:
+            self._tokens.append(self._run_sym)
+        self._run_sym, self._run_len = None, 0
+
+
 def jianpu_token_to_midi(token: str, tonic_midi: int):
-    # Parse a single Jianpu token into an absolute MIDI pitch.
-    token = token.strip()
-    if token == "0":
-        return None
+    # Parse a single Jianpu token into an absolute MIDI pitch (None for a rest).
+    return score.token_to_midi(token, tonic_midi)
 
-    m = TOKEN_RE.match(token)
-    if not m:
-        raise ValueError(f"Bad jianpu token: {token}")
 
-    acc_str = m.group("acc") or ""
-    deg = int(m.group("deg"))
-    oct_str = m.group("oct") or ""
+def jianpu_to_midi(
+    jianpu_str: str,
+    tonic_midi: int,
+    bpm: int = 100,
+    note_len_beats: float = 0.5,
+    velocity: int = 80,
+    program: int = 0,
+) -> MidiFile:
+    # Build a simple monophonic MIDI file from a Jianpu token sequence.
+    notes = score.parse_jianpu(jianpu_str, tonic_midi, note_len_beats=note_len_beats, velocity=velocity)
+    return score.to_midi_file(notes, bpm=bpm, program=program)
 
-    base = int(MAJOR_INTERVALS[deg - 1])
-    acc = acc_str.count("#") - acc_str.count("b")
-    octv = oct_str.count("'") - oct_str.count(",")
 
-    return int(tonic_midi + base + acc + 12 * octv)
+def jianpu_to_midi_bytes(jianpu_str: str, tonic_midi: int, **kwargs) -> bytes:
+    # Same as jianpu_to_midi_file, but returns the .mid bytes instead of touching disk.
+    out = io.BytesIO()
+    jianpu_to_midi(jianpu_str, tonic_midi, **kwargs).save(file=out)
+    return out.getvalue()
 
 
 def jianpu_to_midi_file(
@@ -371,25 +1025,65 @@ def jianpu_to_midi_file(
     program: int = 0,
 ):
     # Render a simple monophonic MIDI file from a Jianpu token sequence.
-    tokens = [t for t in jianpu_str.split() if t.strip()]
-
-    mid = MidiFile()
-    track = MidiTrack()
-    mid.tracks.append(track)
-
-    track.append(MetaMessage("set_tempo", tempo=bpm2tempo(bpm), time=0))
-    track.append(Message("program_change", program=program, time=0))
-
-    dur = int(note_len_beats * mid.ticks_per_beat)
-
-    for tok in tokens:
-        pitch = jianpu_token_to_midi(tok, tonic_midi)
-
-        if pitch is None:
+    mid = jianpu_to_midi(
+        jianpu_str,
+        tonic_midi,
+        bpm=bpm,
+        note_len_beats=note_len_beats,
+        velocity=velocity,
+        program=program,
+    )
+    mid.save(out_mid_path)
 
-            track.append(Message("note_off", note=0, velocity=0, time=dur))
-        else:
-            track.append(Message("note_on", note=pitch, velocity=velocity, time=0))
-            track.append(Message("note_off", note=pitch, velocity=0, time=dur))
 
-    mid.save(out_mid_path)
+def transcribe(
+    y: np.ndarray,
+    sr: int,
+    bpm: int = 90,
+    fmin: str = "C2",
+    fmax: str = "C6",
+    frame_length: int = 2048,
+    hop_length: int = 256,
+    rms_floor: float = 0.02,
+    rms_ratio: float = 0.2,
+    min_run_frames: int = 3,
+    f0_backend: str = "pyin",
+    gate: bool = True,
+    analysis: str = "frames",
+) -> tuple[str, bytes]:
+    # Full analysis of decoded mono audio: energy gate -> F0 on the gated regions -> Jianpu -> MIDI bytes.
+    if analysis == "notes":
+        # Coarse-to-fine note segmentation (analyze_notes); hop_length is the fine resolution.
+        notes = analyze_notes(
+            y, sr,
+            fmin=fmin,
+            fmax=fmax,
+            frame_length=frame_length,
+            fine_hop=hop_length,
+            rms_floor=rms_floor,
+            rms_ratio=rms_ratio,
+            backend=f0_backend,
+        )
+        jianpu = notes_to_jianpu(notes)
+        return jianpu, jianpu_to_midi_bytes(jianpu, tonic_midi=60, bpm=bpm, note_len_beats=0.5)
+    if analysis != "frames":
+        raise ValueError(f"Unknown analysis mode: {analysis}")
+
+    rms = compute_rms(y, frame_length=frame_length, hop_length=hop_length)
+    thr = adaptive_rms_threshold(rms, floor=rms_floor, ratio=rms_ratio)
+    f0_params = dict(fmin=fmin, fmax=fmax, frame_length=frame_length, hop_length=hop_length, backend=f0_backend)
+    if gate:
+        # Frames under the threshold are masked below anyway; skip pitch tracking on them.
+        f0, voiced_flag, times = estimate_f0_gated(y, sr, rms >= thr, **f0_params)
+    else:
+        f0, voiced_flag, times = estimate_f0(y, sr, **f0_params)
+    f0[rms < thr] = float("nan")
+
+    jianpu = f0_to_jianpu(
+        f0,
+        tonic_midi_user=None,
+        use_smoothing=False,
+        min_run_frames=min_run_frames,
+    )
+    midi_bytes = jianpu_to_midi_bytes(jianpu, tonic_midi=60, bpm=bpm, note_len_beats=0.5)
+    return jianpu, midi_bytes
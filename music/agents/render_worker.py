@@ -0,0 +1,208 @@
+# Long-lived audio render worker for SoundRenderAgent: PrettyMIDI -> WAV/OGG bytes.
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pretty_midi
+import soundfile as sf
+
+import synth
+
+try:
+    import fluidsynth  # pyfluidsynth: keeps the SoundFont resident in-process
+except ImportError:  # optional; the NumPy synth is the fallback
+    fluidsynth = None
+
+SYNTH_BACKENDS = ("auto", "fluidsynth", "midi2audio", "numpy")
+
+AUDIO_FORMATS = {
+    "wav": ("WAV", "PCM_16", "audio/wav"),
+    "ogg": ("OGG", "VORBIS", "audio/ogg"),
+}
+
+
+def render_key(jianpu: str, params: dict) -> str:
+    # Cache key for a rendered clip: notation + every parameter that changes the audio.
+    h = hashlib.sha256()
+    h.update(json.dumps({"jianpu": " ".join(jianpu.split()), **params}, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def encode_audio(audio: np.ndarray, sr: int, fmt: str = "ogg") -> bytes:
+    # float mono -> encoded bytes, in memory.
+    container, subtype, _ = AUDIO_FORMATS[fmt]
+    buf = io.BytesIO()
+    sf.write(buf, np.clip(audio, -1.0, 1.0).astype(np.float32), sr, format=container, subtype=subtype)
+    return buf.getvalue()
+
+
+class RenderCache:
+    """
+    LRU of rendered clips: key -> {"audio", "mime_type", "filename", "cache_id"}.
+    - cache_id is the shared_cache file id of the uploaded clip, so a repeated play
+      re-posts the existing file instead of uploading it again
+    - bounded by entry count and total audio bytes
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 128 * 1024 * 1024):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: dict):
+        size = len(entry["audio"])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old["audio"])
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted["audio"])
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+class RenderWorker:
+    """
+    Renders PrettyMIDI to audio on one dedicated thread.
+    - "fluidsynth": pyfluidsynth with the SoundFont loaded once on first use and kept
+      resident; every render reuses the same synth
+    - "numpy": the built-in wavetable synth (synth.py), no SoundFont or binary needed
+    - "midi2audio": one fluidsynth process per render (slow, kept for hosts that only
+      have the fluidsynth binary)
+    - "auto": fluidsynth when pyfluidsynth and the SoundFont are both present, else numpy
+    - one thread, because a fluidsynth synth instance must not be driven concurrently
+    """
+
+    def __init__(
+        self,
+        soundfont_path: str,
+        sample_rate: int = 44100,
+        tail_seconds: float = 1.0,
+        backend: str = "auto",
+    ):
+        if backend not in SYNTH_BACKENDS:
+            raise ValueError(f"Unknown synth backend: {backend}")
+        self.soundfont_path = soundfont_path
+        self.sample_rate = int(sample_rate)
+        self.tail_seconds = tail_seconds
+        self._backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        self._synth = None
+        self._sfid = None
+
+    @property
+    def backend(self) -> str:
+        if self._backend != "auto":
+            return self._backend
+        if fluidsynth is not None and os.path.exists(self.soundfont_path):
+            return "fluidsynth"
+        return "numpy"
+
+    async def render(self, pm: pretty_midi.PrettyMIDI, fmt: str = "ogg", style: str = "straight") -> bytes:
+        # Await the encoded clip without blocking the agent's event loop.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.render_sync, pm, fmt, style)
+
+    def render_sync(self, pm: pretty_midi.PrettyMIDI, fmt: str = "ogg", style: str = "straight") -> bytes:
+        if style == "swing":
+            synth.apply_swing(pm)
+        backend = self.backend
+        if backend == "numpy":
+            audio = synth.render(pm, sr=self.sample_rate)
+        else:
+            if not os.path.exists(self.soundfont_path):
+                raise FileNotFoundError(f"SoundFont not found: {self.soundfont_path}")
+            if backend == "fluidsynth":
+                if fluidsynth is None:
+                    raise RuntimeError("pyfluidsynth is not installed")
+                audio = self._render_resident(pm)
+            else:
+                audio = self._render_midi2audio(pm)
+        return encode_audio(audio, self.sample_rate, fmt)
+
+    def _ensure_synth(self):
+        if self._synth is None:
+            self._synth = fluidsynth.Synth(samplerate=float(self.sample_rate))
+            self._sfid = self._synth.sfload(self.soundfont_path)
+            if self._sfid == -1:
+                self._synth.delete()
+                self._synth = None
+                raise RuntimeError(f"fluidsynth could not load {self.soundfont_path}")
+        return self._synth
+
+    def _render_resident(self, pm: pretty_midi.PrettyMIDI) -> np.ndarray:
+        # Drive the resident synth event by event, pulling samples between events.
+        synth = self._ensure_synth()
+        sr = self.sample_rate
+        events = []
+        melodic = [ch for ch in range(16) if ch != 9]
+        for i, inst in enumerate(pm.instruments):
+            chan = 9 if inst.is_drum else melodic[i % len(melodic)]
+            synth.program_select(chan, self._sfid, 128 if inst.is_drum else 0, inst.program)
+            for n in inst.notes:
+                events.append((n.start, 1, chan, n.pitch, n.velocity))
+                events.append((n.end, 0, chan, n.pitch, 0))
+        events.sort(key=lambda e: (e[0], e[1]))  # note-offs before note-ons at the same time
+
+        chunks, pos = [], 0
+        for t, on, chan, p, vel in events:
+            n = int(round(t * sr)) - pos
+            if n > 0:
+                chunks.append(synth.get_samples(n))
+                pos += n
+            if on:
+                synth.noteon(chan, p, vel)
+            else:
+                synth.noteoff(chan, p)
+        chunks.append(synth.get_samples(int(self.tail_seconds * sr)))
+        for chan in range(16):
+            synth.cc(chan, 123, 0)  # all notes off, so the next render starts clean
+
+        stereo = np.concatenate(chunks).astype(np.float32).reshape(-1, 2)
+        return stereo.mean(axis=1) / 32768.0
+
+    def _render_midi2audio(self, pm: pretty_midi.PrettyMIDI) -> np.ndarray:
+        from midi2audio import FluidSynth
+
+        with tempfile.TemporaryDirectory(prefix="soundrender_") as tmp:
+            mid_path = os.path.join(tmp, "in.mid")
+            wav_path = os.path.join(tmp, "out.wav")
+            pm.write(mid_path)
+            FluidSynth(self.soundfont_path, sample_rate=self.sample_rate).midi_to_audio(mid_path, wav_path)
+            audio, _ = sf.read(wav_path, dtype="float32", always_2d=True)
+        return audio.mean(axis=1)
+
+    def close(self):
+        # Drop queued renders, let a running one finish, then free the synth.
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._synth is not None:
+            self._synth.delete()
+            self._synth = None
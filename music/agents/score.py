@@ -0,0 +1,150 @@
+# Compact score model shared by pitch.py, sound_agent.py and arrangement.py.
+#
+# A score is a NumPy structured array with one row per jianpu token:
+#   pitch     MIDI note number, REST (-1) for rests
+#   onset     start, in beats
+#   duration  length, in beats
+#   velocity  MIDI velocity (0 for rests)
+# Times are in beats, so tempo and instrument are render-time arguments and
+# transposition / note-length changes are single array operations.
+import re
+from typing import List, Optional
+
+import mido
+import numpy as np
+import pretty_midi
+
+SCORE_DTYPE = np.dtype([("pitch", np.int16), ("onset", np.float64), ("duration", np.float64), ("velocity", np.uint8)])
+REST = -1
+
+MAJOR_INTERVALS = np.array([0, 2, 4, 5, 7, 9, 11])
+
+# Notation splits on whitespace and on a comma right before another note ("1,2,3");
+# any other comma lowers the octave ("7, 1").
+SEPARATOR_RE = re.compile(r"\s+|,(?=[#b]*[0-7])")
+# One token: accidentals, degree (0 = rest), octave marks; or "-" / "rest".
+TOKEN_RE = re.compile(r"(?P<acc>[#b]*)(?P<deg>[0-7])(?P<oct>[',]*)|(?P<rest>-|rest)")
+
+# Pitch class relative to the tonic -> (degree, sharps), the inverse of the major-scale reading.
+_PC_DEGREE = np.array([1, 1, 2, 2, 3, 4, 4, 5, 5, 6, 6, 7])
+_PC_SHARP = np.array([0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 0])
+
+
+def _token_pitch(m: Optional["re.Match"], tonic_midi: int) -> int:
+    if m is None or m.group("rest") or m.group("deg") == "0":
+        return REST
+    acc, octs = m.group("acc") or "", m.group("oct") or ""
+    return int(
+        tonic_midi
+        + MAJOR_INTERVALS[int(m.group("deg")) - 1]
+        + acc.count("#") - acc.count("b")
+        + 12 * (octs.count("'") - octs.count(","))
+    )
+
+
+def token_to_midi(token: str, tonic_midi: int = 60) -> Optional[int]:
+    # One token -> MIDI pitch (None for a rest); ValueError if it is not a jianpu token.
+    m = TOKEN_RE.fullmatch(token.strip())
+    if not m:
+        raise ValueError(f"Bad jianpu token: {token}")
+    p = _token_pitch(m, tonic_midi)
+    return None if p == REST else p
+
+
+def tokenize(text: str) -> List[str]:
+    # Notation text -> pieces, one per time slot; pieces that are not jianpu tokens are kept.
+    return [t for t in SEPARATOR_RE.split(text or "") if t]
+
+
+def is_token(piece: str) -> bool:
+    return TOKEN_RE.fullmatch(piece) is not None
+
+
+def parse_jianpu(text: str, tonic_midi: int = 60, note_len_beats: float = 1.0, velocity: int = 80) -> np.ndarray:
+    # Notation text -> score, one note_len_beats slot per piece; pieces that are not tokens ("12", "x") are rests.
+    pitches = [_token_pitch(TOKEN_RE.fullmatch(t), tonic_midi) for t in tokenize(text)]
+    score = np.zeros(len(pitches), dtype=SCORE_DTYPE)
+    score["pitch"] = pitches
+    score["onset"] = np.arange(len(pitches)) * note_len_beats
+    score["duration"] = note_len_beats
+    score["velocity"] = np.where(score["pitch"] == REST, 0, velocity)
+    return score
+
+
+def to_jianpu(score: np.ndarray, tonic_midi: int = 60) -> str:
+    # Score -> notation text (major-scale reading with sharps), the inverse of parse_jianpu.
+    rel = score["pitch"].astype(np.int64) - tonic_midi
+    octv, pc = np.divmod(rel, 12)
+    tokens = []
+    for p, o, c in zip(score["pitch"].tolist(), octv.tolist(), pc.tolist()):
+        if p == REST:
+            tokens.append("0")
+        else:
+            tokens.append("#" * _PC_SHARP[c] + str(_PC_DEGREE[c]) + ("'" * o if o > 0 else "," * -o))
+    return " ".join(tokens)
+
+
+def transpose(score: np.ndarray, semitones: int) -> np.ndarray:
+    out = score.copy()
+    notes = out["pitch"] != REST
+    out["pitch"][notes] = np.clip(out["pitch"][notes] + semitones, 0, 127)
+    return out
+
+
+def stretch(score: np.ndarray, factor: float) -> np.ndarray:
+    # Scale onsets and durations (e.g. a new note length for every token).
+    out = score.copy()
+    out["onset"] *= factor
+    out["duration"] *= factor
+    return out
+
+
+def notes_only(score: np.ndarray) -> np.ndarray:
+    return score[score["pitch"] != REST]
+
+
+def to_midi_file(score: np.ndarray, bpm: float = 100, program: int = 0, ticks_per_beat: int = 480) -> mido.MidiFile:
+    # Score -> single-track mido MidiFile (tempo and program at tick 0).
+    mid = mido.MidiFile(ticks_per_beat=ticks_per_beat)
+    track = mido.MidiTrack()
+    mid.tracks.append(track)
+    track.append(mido.MetaMessage("set_tempo", tempo=mido.bpm2tempo(bpm), time=0))
+    track.append(mido.Message("program_change", program=program, time=0))
+
+    notes = notes_only(score)
+    on = np.round(notes["onset"] * ticks_per_beat).astype(np.int64)
+    off = on + np.round(notes["duration"] * ticks_per_beat).astype(np.int64)
+    ticks = np.r_[off, on]
+    is_on = np.r_[np.zeros(off.size, dtype=bool), np.ones(on.size, dtype=bool)]
+    order = np.lexsort((is_on, ticks))  # note-offs before note-ons on the same tick
+    pitches = np.r_[notes["pitch"], notes["pitch"]][order].tolist()
+    vels = np.r_[np.zeros(off.size, dtype=np.int64), notes["velocity"]][order].tolist()
+    deltas = np.diff(np.r_[0, ticks[order]]).tolist()
+    for p, v, dt, kind in zip(pitches, vels, deltas, is_on[order].tolist()):
+        track.append(mido.Message("note_on" if kind else "note_off", note=p, velocity=v, time=dt))
+
+    # Trailing rests still take time, as they did with the per-token writer.
+    end = int(round(float((score["onset"] + score["duration"]).max()) * ticks_per_beat)) if score.size else 0
+    last = int(ticks.max()) if ticks.size else 0
+    track.append(mido.MetaMessage("end_of_track", time=max(0, end - last)))
+    return mid
+
+
+def to_instrument(score: np.ndarray, bpm: float = 100, program: int = 0, name: str = "") -> pretty_midi.Instrument:
+    # Score -> pretty_midi Instrument, times in seconds at bpm.
+    beat = 60.0 / float(bpm)
+    inst = pretty_midi.Instrument(program=program, name=name)
+    notes = notes_only(score)
+    starts = (notes["onset"] * beat).tolist()
+    ends = ((notes["onset"] + notes["duration"]) * beat).tolist()
+    inst.notes.extend(
+        pretty_midi.Note(velocity=int(v), pitch=int(p), start=s, end=e)
+        for p, v, s, e in zip(notes["pitch"].tolist(), notes["velocity"].tolist(), starts, ends)
+    )
+    return inst
+
+
+def to_pretty_midi(score: np.ndarray, bpm: float = 100, program: int = 0) -> pretty_midi.PrettyMIDI:
+    pm = pretty_midi.PrettyMIDI(initial_tempo=bpm)
+    pm.instruments.append(to_instrument(score, bpm, program))
+    return pm
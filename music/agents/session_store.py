@@ -0,0 +1,147 @@
+# Per-channel session state for SoundRenderAgent: bounded, TTL-evicting, snapshot-able.
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+
+class SessionStore:
+    """
+    channel -> state dict, least recently used first.
+    - Bounded by max_sessions; a session idle for ttl_seconds is dropped on the next
+      access (lazy, no timer thread)
+    - transient_keys (e.g. the parsed score) live only in memory: snapshot() leaves them
+      out, so the snapshot is plain JSON and the owner rebuilds them after load()
+    - `dirty` is set by every change and cleared by snapshot(), so a persisting owner
+      only writes when something changed
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 6 * 3600,
+        max_sessions: int = 1024,
+        transient_keys: Iterable[str] = ("score",),
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_sessions = max(1, int(max_sessions))
+        self.transient_keys = frozenset(transient_keys)
+        self._clock = clock
+        self._sessions: "OrderedDict[str, dict]" = OrderedDict()
+        self._touched: dict = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, channel: str) -> bool:
+        # Live-session check that does not count as a use (no LRU move, no TTL refresh).
+        with self._lock:
+            return channel in self._sessions and self._is_live(channel, self._clock())
+
+    def _is_live(self, channel: str, now: float) -> bool:
+        if now - self._touched[channel] <= self.ttl_seconds:
+            return True
+        del self._sessions[channel]
+        del self._touched[channel]
+        self.expired += 1
+        self.dirty = True
+        return False
+
+    def get(self, channel: str) -> Optional[dict]:
+        with self._lock:
+            if channel not in self._sessions or not self._is_live(channel, self._clock()):
+                return None
+            self._sessions.move_to_end(channel)
+            return self._sessions[channel]
+
+    def put(self, channel: str, state: dict):
+        with self._lock:
+            self._put(channel, state, self._clock())
+
+    def _put(self, channel: str, state: dict, touched: float):
+        self._sessions[channel] = state
+        self._sessions.move_to_end(channel)
+        self._touched[channel] = touched
+        self.dirty = True
+        while len(self._sessions) > self.max_sessions:
+            old, _ = self._sessions.popitem(last=False)
+            del self._touched[old]
+            self.evicted += 1
+
+    def update(self, channel: str, **changes) -> Optional[dict]:
+        # Merge changes into a live session and refresh its TTL; None if there is none.
+        with self._lock:
+            now = self._clock()
+            if channel not in self._sessions or not self._is_live(channel, now):
+                return None
+            state = self._sessions[channel]
+            state.update(changes)
+            self._sessions.move_to_end(channel)
+            self._touched[channel] = now
+            self.dirty = True
+            return state
+
+    def pop(self, channel: str) -> Optional[dict]:
+        with self._lock:
+            self._touched.pop(channel, None)
+            state = self._sessions.pop(channel, None)
+            if state is not None:
+                self.dirty = True
+            return state
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            now = self._clock()
+            before = self.expired
+            for channel in list(self._sessions):
+                self._is_live(channel, now)
+            return self.expired - before
+
+    def snapshot(self) -> str:
+        # Live sessions as JSON (oldest first, transient keys dropped); clears `dirty`.
+        self.purge_expired()
+        with self._lock:
+            data = [
+                {
+                    "channel": channel,
+                    "touched": self._touched[channel],
+                    "state": {k: v for k, v in state.items() if k not in self.transient_keys},
+                }
+                for channel, state in self._sessions.items()
+            ]
+            self.dirty = False
+        return json.dumps({"sessions": data})
+
+    def load(self, snapshot: str) -> int:
+        # Restore sessions from snapshot(); expired ones are skipped. Returns how many were loaded.
+        try:
+            data = json.loads(snapshot).get("sessions", [])
+        except (ValueError, AttributeError):
+            return 0
+        loaded = 0
+        with self._lock:
+            now = self._clock()
+            for item in data:
+                try:
+                    channel, touched, state = item["channel"], float(item["touched"]), dict(item["state"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if now - touched > self.ttl_seconds:
+                    continue
+                self._put(channel, state, touched)
+                loaded += 1
+            self.dirty = False
+        return loaded
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
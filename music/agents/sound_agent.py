@@ -1,14 +1,14 @@
-import os
 import re
 import base64
-import tempfile
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import NamedTuple, Optional, List
 import numpy as np
-import pretty_midi
 from openagents.models.event import Event, EventVisibility
 from openagents.agents.worker_agent import WorkerAgent, EventContext
-from midi2audio import FluidSynth
+import arrangement
+import score
+from render_worker import AUDIO_FORMATS, SYNTH_BACKENDS, RenderCache, RenderWorker, render_key
+from session_store import SessionStore
 
 
 
@@ -22,6 +22,67 @@ INSTRUMENT_PROGRAMS = {
     "trumpet": 56,     # Trumpet
 }
 
+# "Numbered notation: <jianpu>" up to the end of the message; see notation_from_text.
+NOTATION_RE = re.compile(r"numbered notation\s*:\s*([\s\S]+)$", re.IGNORECASE)
+
+# Control key (any alias) -> field of ControlUpdate. "beat" is accepted as an alias of style.
+CONTROL_KEYS = {
+    "instrument": "instrument", "instr": "instrument",
+    "bpm": "bpm", "tempo": "bpm", "temple": "bpm",
+    "notelen": "note_len", "note_len": "note_len", "note_len_beats": "note_len", "notelenbeats": "note_len", "len": "note_len",
+    "style": "style", "beat": "style",
+    "accompaniment": "accompaniment", "accomp": "accompaniment", "backing": "accompaniment",
+}
+# "key: value" for any control key; longer aliases first so "note_len_beats" is not read as "note_len".
+CONTROL_RE = re.compile(
+    r"\b(" + "|".join(sorted(CONTROL_KEYS, key=len, reverse=True)) + r")\s*[:：][ \t]*([^\s,]*)",
+    re.IGNORECASE,
+)
+OFF_WORDS = frozenset(("off", "no", "false", "0", "none"))
+
+# Events that can carry a user's notation or control reply; anything else is dropped on arrival.
+MESSAGE_EVENTS = frozenset((
+    "thread.channel_message.notification",
+    "thread.reply.notification",
+    "thread.direct_message.notification",
+    "agent.message",
+))
+
+
+class ControlUpdate(NamedTuple):
+    # Render parameters from a control reply; None = not given.
+    instrument: Optional[str] = None
+    bpm: Optional[int] = None
+    note_len: Optional[float] = None
+    style: Optional[str] = None
+    accompaniment: Optional[bool] = None
+
+
+def parse_controls(text: str) -> Optional[ControlUpdate]:
+    """
+    Parse "key: value" controls (one or several per line, comma separated) in one regex pass.
+    - None when the text has no control key at all
+    - later keys win; values that do not parse (e.g. "bpm: fast") are ignored
+    """
+    fields = {}
+    for m in CONTROL_RE.finditer(text or ""):
+        field, v = CONTROL_KEYS[m.group(1).lower()], m.group(2).lower()
+        fields.setdefault(field, None)
+        if not v:
+            continue
+        if field == "bpm" or field == "note_len":
+            try:
+                fields[field] = int(float(v)) if field == "bpm" else float(v)
+            except ValueError:
+                pass
+        elif field == "accompaniment":
+            fields[field] = v not in OFF_WORDS
+        else:
+            fields[field] = v
+    if not fields:
+        return None
+    return ControlUpdate(**{k: v for k, v in fields.items() if v is not None})
+
 
 def _extract_text(msg: dict) -> str:
     # Try common OpenAgents message shapes
@@ -43,81 +104,29 @@ def _extract_text(msg: dict) -> str:
     return t if isinstance(t, str) else ""
 
 
-def _find_latest_notation_from_messages(messages: List[dict]) -> Optional[str]:
+def notation_from_text(text: str) -> Optional[str]:
     """
-    Find the newest message containing "Numbered notation:" and return the notation part.
+    The notation after "Numbered notation:", or None.
+    Trailing pieces that are not jianpu tokens ("1 2 3 (bpm 120)", "1 2 3\nthanks!") are chat, not notation.
     """
-    for m in reversed(messages):
-        text = _extract_text(m)
-        if re.search(r"numbered notation\s*:", text, re.IGNORECASE):
-            mm = re.search(r"numbered notation\s*:\s*([\s\S]+)$", text, re.IGNORECASE)
-            if mm:
-                return mm.group(1).strip()
-    return None
-
-
-def _parse_jianpu_tokens(jianpu: str) -> List[str]:
-    """
-    Accept tokens like: 1 2 3 #5 6 7, with commas/newlines.
-    """
-    s = jianpu.replace("\n", " ").replace(",", " ")
-    tokens = [t.strip() for t in s.split() if t.strip()]
-    return tokens
+    mm = NOTATION_RE.search(text)
+    if not mm:
+        return None
+    pieces = score.tokenize(mm.group(1))
+    while pieces and not score.is_token(pieces[-1]):
+        pieces.pop()
+    return " ".join(pieces) or None
 
 
-def _jianpu_token_to_midi(token: str, base_midi: int = 60) -> Optional[int]:
+def _find_latest_notation_from_messages(messages: List[dict]) -> Optional[str]:
     """
-    Very simple mapping:
-    - base_midi=60 => C4 corresponds to '1' in C major.
-    - '1'->C, '2'->D, '3'->E, '4'->F, '5'->G, '6'->A, '7'->B
-    - '#5' means sharp.
-    - '0' or '-' can be treated as rest.
+    Find the newest message containing "Numbered notation:" and return the notation part.
     """
-    token = token.strip()
-    if token in ("0", "-", "rest"):
-        return None
-
-    sharp = False
-    if token.startswith("#"):
-        sharp = True
-        token = token[1:]
-
-    if not token.isdigit():
-        return None
-
-    degree = int(token)
-    if degree < 1 or degree > 7:
-        return None
-
-
-    offsets = [0, 2, 4, 5, 7, 9, 11]
-    midi_note = base_midi + offsets[degree - 1]
-    if sharp:
-        midi_note += 1
-    return midi_note
-
-
-def jianpu_to_pretty_midi(jianpu: str, bpm: int = 90, note_len_beats: float = 0.5, program: int = 0) -> pretty_midi.PrettyMIDI:
-    pm = pretty_midi.PrettyMIDI(initial_tempo=bpm)
-    inst = pretty_midi.Instrument(program=program)
-
-    tokens = _parse_jianpu_tokens(jianpu)
-
-    beat_sec = 60.0 / float(bpm)
-    dur = note_len_beats * beat_sec
-
-    t = 0.0
-    for tok in tokens:
-        midi_note = _jianpu_token_to_midi(tok, base_midi=60)  # C4
-        if midi_note is None:
-            t += dur
-            continue
-        note = pretty_midi.Note(velocity=90, pitch=int(midi_note), start=t, end=t + dur)
-        inst.notes.append(note)
-        t += dur
-
-    pm.instruments.append(inst)
-    return pm
+    for m in reversed(messages):
+        jianpu = notation_from_text(_extract_text(m))
+        if jianpu:
+            return jianpu
+    return None
 
 
 class SoundRenderAgent(WorkerAgent):
@@ -125,15 +134,33 @@ class SoundRenderAgent(WorkerAgent):
 
     default_agent_id = "SoundRender"
 
-    def __init__(self, *args, soundfont_path: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        *args,
+        soundfont_path: Optional[str] = None,
+        render_format: str = "ogg",
+        sample_rate: int = 44100,
+        render_cache_entries: int = 128,
+        synth_backend: str = "auto",
+        session_ttl: float = 6 * 3600,
+        max_sessions: int = 1024,
+        persist_sessions: bool = False,
+        session_cache_id: Optional[str] = None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.soundfont_path = soundfont_path or str(Path("FluidR3_GM.sf2"))
-        self._pending = {
-    "jianpu":None,
-    "bpm": 90,
-    "noteLen": 0.5,
-    "instrument": "piano",
-    "style": "swing"}
+        if render_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unknown render format: {render_format}")
+        self.render_format = render_format
+        # Synth (and SoundFont) live for the agent's lifetime; renders queue on its thread.
+        self._renderer = RenderWorker(self.soundfont_path, sample_rate=sample_rate, backend=synth_backend)
+        self._render_cache = RenderCache(max_entries=render_cache_entries)
+        # channel -> {"jianpu", "score", "bpm", "noteLen", "instrument", "style", "accompaniment"}
+        self._sessions = SessionStore(ttl_seconds=session_ttl, max_sessions=max_sessions)
+        # With persistence, the sessions snapshot lives in one shared_cache entry (created on first save).
+        self.persist_sessions = persist_sessions or bool(session_cache_id)
+        self._session_cache_id = session_cache_id
 
     async def _upload_bytes_to_shared_cache(self, file_bytes: bytes, filename: str, mime_type: str):
         file_data_b64 = base64.b64encode(file_bytes).decode("utf-8")
@@ -150,45 +177,151 @@ class SoundRenderAgent(WorkerAgent):
         data = getattr(resp, "data", {}) or {}
         return data.get("cache_id")
 
-    async def _parse_soundrender_controls(self, text: str):
-        updates = {}
-        if not text:
-            return updates
-
-        parts = re.split(r"[\n,]+", text.strip())
-        for p in parts:
-
-            for m in re.finditer(r"([a-zA-Z_]+)\s*[:：]\s*([^\s,]+)", p):
-                k = m.group(1).strip().lower()
-                v = m.group(2).strip()
-
-                if k in ("instrument", "instr"):
-                    updates["instrument"] = v.lower()
-                elif k in ("bpm", "tempo", "temple"):
-                    try:
-                        updates["bpm"] = int(float(v))
-                    except:
-                        pass
-                elif k in ("notelen", "note_len", "note_len_beats", "notelenbeats", "len"):
-                    try:
-                        updates["noteLen"] = float(v)
-                    except:
-                        pass
-                elif k in ("style", "beat"):  # 你希望 beat 表示 swing 位置，这里兼容
-                    updates["style"] = v.lower()
-
-        print("[SoundRender][parse] updates =", updates)
-        return updates
+    async def _shared_cache_request(self, event_name: str, payload: dict) -> Optional[dict]:
+        # One shared_cache request/response; the response data, or None on failure.
+        resp = await self.client.send_event(
+            Event(
+                event_name=event_name,
+                source_id=self.agent_id,
+                payload=payload,
+                relevant_mod="openagents.mods.core.shared_cache",
+                visibility=EventVisibility.MOD_ONLY,
+            )
+        )
+        if not resp or not getattr(resp, "success", False):
+            return None
+        return getattr(resp, "data", {}) or {}
+
+    async def _load_sessions(self):
+        if not self._session_cache_id:
+            return
+        data = await self._shared_cache_request("shared_cache.get", {"cache_id": self._session_cache_id})
+        if data is None:
+            print(f"[SoundRender][sessions] could not load {self._session_cache_id}; starting empty")
+            return
+        print(f"[SoundRender][sessions] restored {self._sessions.load(data.get('value') or '')} sessions")
+        if not data.get("pinned"):
+            # Snapshots saved before sessions were pinned
+            await self._shared_cache_request("shared_cache.pin", {"cache_id": self._session_cache_id})
+
+    async def _save_sessions(self):
+        # Write the snapshot back to shared_cache if anything changed since the last save.
+        if not self.persist_sessions or not self._sessions.dirty:
+            return
+        value = self._sessions.snapshot()
+        if self._session_cache_id:
+            data = await self._shared_cache_request(
+                "shared_cache.update", {"cache_id": self._session_cache_id, "value": value}
+            )
+            if data is not None:
+                return
+        data = await self._shared_cache_request(
+            # Pinned, so cache eviction (max_entries / TTL) never drops saved sessions
+            "shared_cache.create", {"value": value, "mime_type": "application/json", "pinned": True}
+        )
+        if data and data.get("cache_id"):
+            self._session_cache_id = data["cache_id"]
+            print(f"[SoundRender][sessions] saved to cache {self._session_cache_id} (pass --session-cache-id to restore)")
+
+    async def on_startup(self):
+        if self.persist_sessions:
+            await self._load_sessions()
+
+    async def on_shutdown(self):
+        await self._save_sessions()
+        self._renderer.close()
+
+    async def _render_and_post(
+        self,
+        channel: str,
+        human: str,
+        jianpu: str,
+        notes: np.ndarray,
+        instrument: str,
+        bpm: int,
+        note_len: float,
+        style: str,
+        accompaniment: bool = True,
+    ) -> bool:
+        # Render (or reuse) the clip, upload it once, and post it; False if rendering is unavailable.
+        params = {
+            "instrument": instrument,
+            "bpm": bpm,
+            "noteLen": note_len,
+            "style": style,
+            "accompaniment": accompaniment,
+            "format": self.render_format,
+            "sr": self._renderer.sample_rate,
+            "synth": self._renderer.backend,
+        }
+        key = render_key(jianpu, params)
+        entry = self._render_cache.get(key)
+        if entry is None:
+            # Swing is written into the arrangement's MIDI, so the renderer plays it straight.
+            pm = arrangement.arrange(
+                notes,
+                bpm=bpm,
+                note_len_beats=note_len,
+                style=style,
+                program=INSTRUMENT_PROGRAMS[instrument],
+                accompaniment=accompaniment,
+            )
+            try:
+                audio = await self._renderer.render(pm, self.render_format)
+            except Exception as e:
+                print(f"[SoundRender][render] {self._renderer.backend} failed: {e}")
+                return False
+            entry = {
+                "audio": audio,
+                "mime_type": AUDIO_FORMATS[self.render_format][2],
+                "filename": f"{instrument}_{bpm}bpm.{self.render_format}",
+                "cache_id": None,
+            }
+            self._render_cache.put(key, entry)
+
+        if entry["cache_id"] is None:
+            entry["cache_id"] = await self._upload_bytes_to_shared_cache(
+                entry["audio"], entry["filename"], entry["mime_type"]
+            )
+            if entry["cache_id"] is None:
+                return False
+
+        await self.workspace().channel(channel).post(
+            {
+                "message": human,
+                "files": [
+                    {
+                        "file_id": entry["cache_id"],
+                        "filename": entry["filename"],
+                        "size": len(entry["audio"]),
+                        "mime_type": entry["mime_type"],
+                    }
+                ],
+            }
+        )
+        return True
 
     async def react(self, context: EventContext):
         event = context.incoming_event
         if event.source_id == self.agent_id:
             return
 
+        # O(1) routing: only message events can matter, and only if they mention SoundRender
+        # or land in a channel that has a pending notation.
+        if getattr(event, "event_name", None) not in MESSAGE_EVENTS:
+            return
+
         payload = event.payload or {}
-        print("payload", payload)
+        text = _extract_text(payload) or _extract_text(getattr(event, "__dict__", {}) or {})
+        if not text:
+            return
 
         channel = payload.get("channel") or "general"
+        lower = text.strip().lower()
+        mentioned = "soundrender" in lower
+        if not mentioned and channel not in self._sessions:
+            return
+
         source = (
                 payload.get("source_id")
                 or payload.get("sender_id")
@@ -199,60 +332,43 @@ class SoundRenderAgent(WorkerAgent):
         if source == self.agent_id or source == "soundrenderagent":
             return
 
-        text = _extract_text(payload) or _extract_text(getattr(event, "__dict__", {}) or {})
-        if not text:
-            text = _extract_text({"payload": payload})
-        if not text:
-            return
-
-        lower = (text or "").strip().lower()
-
         async def post_text(msg: str):
             await self.workspace().channel(channel).post(msg)
 
+        played = "click to play" in lower
+        controls = None if played else parse_controls(text)
 
-        played = re.search(r"click to play", lower)
-        has_control = re.search(
-            r"\b(instrument|bpm|tempo|temple|notelen|note_len|note_len_beats|notelenbeats|style|beat)\s*[:：]",
-            lower,
-        )
+        if controls is not None:
+            session = self._sessions.get(channel)
 
-        if has_control and not played:
-            pending = self._pending.get(channel)
-            print("[SoundRender][pending-before] ", pending, "type=", type(pending))
-
-            if not pending:
+            if not session:
                 await post_text(
                     "No pending notation in this channel. Mention @SoundRender with a numbered notation first.\n"
                     "Example:\n@SoundRender Numbered notation: 1 2 3 4 5"
                 )
                 return
 
-
-            if isinstance(pending, tuple):
-                jianpu, bpm, note_len = pending
-                instrument_pending = "piano"
-                style_pending = "swing"
-            else:
-                jianpu = pending.get("jianpu")
-                bpm = pending.get("bpm", 90)
-                note_len = pending.get("noteLen", 0.5)
-                instrument_pending = pending.get("instrument", "piano")
-                style_pending = pending.get("style", "swing")
-
-
-            updates = await self._parse_soundrender_controls(text or "")
-            print("[SoundRender][react] updates =", updates)
-
-
-            if "instrument" in updates:
-                instrument_pending = updates["instrument"]
-            if "style" in updates:
-                style_pending = updates["style"]
-            if "bpm" in updates:
-                bpm = updates["bpm"]
-            if "noteLen" in updates:
-                note_len = updates["noteLen"]
+            jianpu = session["jianpu"]
+            notes = session.get("score")
+            if notes is None:
+                # Restored from a snapshot: scores are not persisted, parse once and keep it.
+                notes = session["score"] = score.parse_jianpu(jianpu)
+            bpm = session.get("bpm", 90)
+            note_len = session.get("noteLen", 0.5)
+            instrument_pending = session.get("instrument", "piano")
+            style_pending = session.get("style", "swing")
+            accompaniment = session.get("accompaniment", True)
+
+            if controls.instrument is not None:
+                instrument_pending = controls.instrument
+            if controls.style is not None:
+                style_pending = controls.style
+            if controls.bpm is not None:
+                bpm = controls.bpm
+            if controls.note_len is not None:
+                note_len = controls.note_len
+            if controls.accompaniment is not None:
+                accompaniment = controls.accompaniment
 
 
             instrument = (instrument_pending or "piano").lower()
@@ -280,12 +396,15 @@ class SoundRenderAgent(WorkerAgent):
                 style = "swing"
 
 
-            if isinstance(pending, dict):
-                pending["instrument"] = instrument
-                pending["style"] = style
-                pending["bpm"] = bpm
-                pending["noteLen"] = note_len
-                self._pending[channel] = pending
+            self._sessions.update(
+                channel,
+                instrument=instrument,
+                style=style,
+                bpm=bpm,
+                noteLen=note_len,
+                accompaniment=accompaniment,
+            )
+            await self._save_sessions()
 
             payload_out = {
                 "type": "play_request",
@@ -298,10 +417,17 @@ class SoundRenderAgent(WorkerAgent):
 
             human = (
                 f"▶ Click to play | instrument: {instrument} | "
-                f"BPM: {bpm}, noteLen: {note_len}, style: {style}\n"
+                f"BPM: {bpm}, noteLen: {note_len}, style: {style}, "
+                f"accompaniment: {'on' if accompaniment else 'off'}\n"
                 f"numbered notation: {jianpu}"
             )
 
+            if await self._render_and_post(
+                channel, human, jianpu, notes, instrument, bpm, note_len, style, accompaniment
+            ):
+                return
+
+            # No server-side render (missing SoundFont/fluidsynth): leave playback to the client.
             await self.workspace().channel(channel).post(
                 human + "\n",
                 visibility=EventVisibility.MOD_ONLY,
@@ -309,9 +435,8 @@ class SoundRenderAgent(WorkerAgent):
             return
 
 
-        if "@soundrender" in lower or "soundrender" in lower:
-            mm = re.search(r"numbered notation\s*:\s*([\s\S]+)$", text, re.IGNORECASE)
-            jianpu = mm.group(1).strip() if mm else None
+        if mentioned:
+            jianpu = notation_from_text(text)
 
             if not jianpu:
                 await post_text(
@@ -320,20 +445,25 @@ class SoundRenderAgent(WorkerAgent):
                 )
                 return
 
-            self._pending[channel] = {
+            self._sessions.put(channel, {
                 "jianpu": jianpu,
+                # Parsed once here; parameter replies render from it without touching the text again.
+                "score": score.parse_jianpu(jianpu),
                 "bpm": 90,
                 "noteLen": 0.5,
                 "instrument": "piano",
                 "style": "swing",
-            }
+                "accompaniment": True,
+            })
+            await self._save_sessions()
 
             await post_text(
                 "SoundRender received. Reply with any of the following (one or multiple lines):\n"
                 + "\n".join([f"- instrument: {k}" for k in INSTRUMENT_PROGRAMS.keys()])
                 + "\n- bpm: 90   (or tempo: 90)\n"
                   "- noteLen: 0.5\n"
-                  "- style: swing | straight\n\n"
+                  "- style: swing | straight\n"
+                  "- accompaniment: on | off\n\n"
                   "Example:\n"
                   "instrument: flute\n"
                   "bpm: 110\n"
@@ -368,10 +498,32 @@ async def main():
         help="Path to a GM SoundFont (.sf2), e.g. assets/soundfonts/FluidR3_GM.sf2"
     )
 
+    parser.add_argument("--format", choices=["ogg", "wav"], default="ogg", help="Rendered audio format")
+    parser.add_argument("--sample-rate", type=int, default=44100, help="Render sample rate")
+    parser.add_argument("--synth", choices=SYNTH_BACKENDS, default="auto",
+                        help="auto: fluidsynth if pyfluidsynth and the SoundFont are available, else the NumPy synth")
+    parser.add_argument("--render-cache-entries", type=int, default=128, help="Max cached rendered clips")
+    parser.add_argument("--session-ttl", type=float, default=6 * 3600, help="Seconds a channel's pending notation is kept")
+    parser.add_argument("--max-sessions", type=int, default=1024, help="Max channels with pending notation")
+    parser.add_argument("--persist-sessions", action="store_true",
+                        help="Keep pending notation in the network's shared_cache across restarts")
+    parser.add_argument("--session-cache-id", default=None,
+                        help="shared_cache entry with saved sessions (printed on first save; implies --persist-sessions)")
+
     args = parser.parse_args()
 
 
-    agent = SoundRenderAgent(soundfont_path=args.soundfont) if args.soundfont else SoundRenderAgent()
+    agent = SoundRenderAgent(
+        soundfont_path=args.soundfont,
+        render_format=args.format,
+        sample_rate=args.sample_rate,
+        render_cache_entries=args.render_cache_entries,
+        synth_backend=args.synth,
+        session_ttl=args.session_ttl,
+        max_sessions=args.max_sessions,
+        persist_sessions=args.persist_sessions,
+        session_cache_id=args.session_cache_id,
+    )
 
     try:
         if args.url:
@@ -0,0 +1,167 @@
+# Pure-NumPy wavetable synth for jianpu playback, no FluidSynth needed.
+import numpy as np
+import pretty_midi
+
+TABLE_SIZE = 2048  # samples per wavetable cycle (power of two, indexed with a mask)
+
+
+def _wavetable(harmonics) -> np.ndarray:
+    # One cycle of an additive tone from harmonic amplitudes, normalized to peak 1.
+    phase = np.arange(TABLE_SIZE) / TABLE_SIZE
+    k = np.arange(1, len(harmonics) + 1)[:, None]
+    cycle = (np.asarray(harmonics, dtype=np.float64)[:, None] * np.sin(2 * np.pi * k * phase)).sum(axis=0)
+    return (cycle / np.abs(cycle).max()).astype(np.float32)
+
+
+# GM program -> timbre; the keys cover sound_agent.INSTRUMENT_PROGRAMS and the arrangement tracks.
+# attack/decay/release in seconds, sustain as a level; "pluck" notes decay exponentially instead of sustaining.
+TIMBRES = {
+    0: dict(harmonics=[1.0, 0.5, 0.3, 0.2, 0.12, 0.08, 0.05], attack=0.005, decay=0.3, sustain=0.4, release=0.25, pluck=1.2),  # piano
+    24: dict(harmonics=[1.0, 0.7, 0.45, 0.25, 0.15, 0.1], attack=0.003, decay=0.2, sustain=0.3, release=0.2, pluck=2.0),  # guitar
+    40: dict(harmonics=[1.0, 0.8, 0.6, 0.5, 0.4, 0.3, 0.25, 0.2], attack=0.08, decay=0.1, sustain=0.9, release=0.15),  # violin
+    16: dict(harmonics=[1.0, 0.9, 0.0, 0.6, 0.0, 0.4, 0.0, 0.3], attack=0.01, decay=0.0, sustain=1.0, release=0.05),  # organ
+    73: dict(harmonics=[1.0, 0.25, 0.08, 0.03], attack=0.05, decay=0.1, sustain=0.85, release=0.12),  # flute
+    56: dict(harmonics=[1.0, 0.9, 0.8, 0.7, 0.55, 0.4, 0.3, 0.2], attack=0.03, decay=0.1, sustain=0.8, release=0.1),  # trumpet
+    109: dict(harmonics=[1.0, 0.6, 0.8, 0.5, 0.6, 0.4, 0.4, 0.3], attack=0.02, decay=0.0, sustain=1.0, release=0.08),  # bagpipe
+    # Accompaniment programs used by arrangement.py.
+    48: dict(harmonics=[1.0, 0.5, 0.35, 0.25, 0.15, 0.1], attack=0.25, decay=0.2, sustain=0.8, release=0.4),  # string pad
+    32: dict(harmonics=[1.0, 0.6, 0.25, 0.1], attack=0.005, decay=0.15, sustain=0.5, release=0.1, pluck=2.5),  # bass
+}
+DEFAULT_PROGRAM = 0
+
+_PROGRAMS = sorted(TIMBRES)
+_TABLES = np.stack([_wavetable(TIMBRES[p]["harmonics"]) for p in _PROGRAMS])  # (n_timbres, TABLE_SIZE)
+_ENV = np.array(
+    [[TIMBRES[p][k] for k in ("attack", "decay", "sustain", "release")] + [TIMBRES[p].get("pluck", 0.0)] for p in _PROGRAMS]
+)  # (n_timbres, 5)
+
+
+def swing_times(times: np.ndarray, bpm: float, ratio: float = 2 / 3) -> np.ndarray:
+    """
+    Swing time warp: inside every beat, the first half is stretched to `ratio` of the
+    beat and the second half compressed into the rest, so off-beat eighths land on
+    the triplet position (ratio=2/3). Beat boundaries do not move.
+    """
+    beat = 60.0 / float(bpm)
+    b = np.asarray(times, dtype=np.float64) / beat
+    whole = np.floor(b)
+    frac = b - whole
+    warped = np.where(frac < 0.5, frac * 2 * ratio, ratio + (frac - 0.5) * 2 * (1 - ratio))
+    return (whole + warped) * beat
+
+
+def apply_swing(pm: pretty_midi.PrettyMIDI, bpm: float = None, ratio: float = 2 / 3) -> pretty_midi.PrettyMIDI:
+    # Swing every note of pm in place (for renderers that play the MIDI as written); returns pm.
+    if bpm is None:
+        tempi = pm.get_tempo_changes()[1]
+        bpm = float(tempi[0]) if len(tempi) else 120.0
+    for inst in pm.instruments:
+        if not inst.notes:
+            continue
+        times = np.array([(n.start, n.end) for n in inst.notes])
+        warped = swing_times(times, bpm, ratio)
+        for n, (s, e) in zip(inst.notes, warped.tolist()):
+            n.start, n.end = s, e
+    return pm
+
+
+def _note_arrays(pm: pretty_midi.PrettyMIDI):
+    # All notes of all non-drum instruments as flat arrays.
+    pitch, start, end, vel, timbre = [], [], [], [], []
+    for inst in pm.instruments:
+        if inst.is_drum or not inst.notes:
+            continue
+        prog = inst.program if inst.program in TIMBRES else DEFAULT_PROGRAM
+        arr = np.array([(n.pitch, n.start, n.end, n.velocity) for n in inst.notes], dtype=np.float64)
+        pitch.append(arr[:, 0])
+        start.append(arr[:, 1])
+        end.append(arr[:, 2])
+        vel.append(arr[:, 3])
+        timbre.append(np.full(len(arr), _PROGRAMS.index(prog)))
+    if not pitch:
+        empty = np.zeros(0)
+        return empty, empty, empty, empty, np.zeros(0, dtype=int)
+    return (np.concatenate(pitch), np.concatenate(start), np.concatenate(end),
+            np.concatenate(vel), np.concatenate(timbre).astype(int))
+
+
+def _held_envelope(t, attack, decay, sustain, pluck) -> np.ndarray:
+    # Envelope level t seconds after note-on, while the key is held.
+    rise = np.minimum(t / np.maximum(attack, 1e-6), 1.0)
+    adsr = 1.0 - (1.0 - sustain) * np.clip((t - attack) / np.maximum(decay, 1e-6), 0.0, 1.0)
+    held = np.where(pluck > 0, np.exp(-pluck * np.maximum(t - attack, 0.0)), adsr)
+    return np.where(t < attack, rise, held)
+
+
+def render(
+    pm: pretty_midi.PrettyMIDI,
+    sr: int = 44100,
+    style: str = "straight",
+    bpm: float = None,
+    swing_ratio: float = 2 / 3,
+    gain: float = 0.3,
+    block: int = 1 << 16,
+) -> np.ndarray:
+    """
+    Render every note of `pm` to float32 mono in one batched pass.
+    - each note becomes a segment of (duration + release) samples; all segments are laid
+      end to end in one buffer, so phase, envelope and wavetable lookup are single array ops
+    - segments are overlap-added into the output with np.bincount
+    - style="swing" warps note times with swing_times (bpm from the file's first tempo)
+    """
+    pitch, start, end, vel, timbre = _note_arrays(pm)
+    if pitch.size == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    if style == "swing":
+        if bpm is None:
+            tempi = pm.get_tempo_changes()[1]
+            bpm = float(tempi[0]) if len(tempi) else 120.0
+        start, end = swing_times(start, bpm, swing_ratio), swing_times(end, bpm, swing_ratio)
+
+    attack, decay, sustain, release, pluck = _ENV[timbre].T.astype(np.float32)
+    hold = np.maximum(end - start, 1.0 / sr).astype(np.float32)
+    n_samples = np.ceil((hold + release) * sr).astype(np.int64)
+    onset = np.round(start * sr).astype(np.int64)
+    inc = 440.0 * 2 ** ((pitch - 69) / 12) * TABLE_SIZE / sr  # table steps per sample
+    level_off = _held_envelope(hold, attack, decay, sustain, pluck)
+    out = np.zeros(int((onset + n_samples).max()), dtype=np.float32)
+    flat = _TABLES.ravel()
+
+    # Notes are rendered in groups of about `block` samples so the temporaries stay in cache.
+    ends = np.cumsum(n_samples)
+    lo = 0
+    while lo < pitch.size:
+        hi = max(lo + 1, int(np.searchsorted(ends, ends[lo] - n_samples[lo] + block, side="right")))
+        sel = slice(lo, hi)
+        lo = hi
+        n = n_samples[sel]
+        idx = np.repeat(np.arange(n.size), n)
+        local = np.arange(int(n.sum())) - np.repeat(np.r_[0, np.cumsum(n)[:-1]], n)
+        t = local.astype(np.float32) / sr
+
+        # Wavetable lookup with linear interpolation.
+        pos = (local * inc[sel][idx]) % TABLE_SIZE
+        i0 = pos.astype(np.int64)
+        frac = (pos - i0).astype(np.float32)
+        base = timbre[sel][idx] * TABLE_SIZE
+        s0 = flat[base + i0]
+        wave = s0 + frac * (flat[base + ((i0 + 1) & (TABLE_SIZE - 1))] - s0)
+
+        # ADSR (or exponential pluck decay) while held, then a linear release from the level at note-off.
+        env = _held_envelope(t, attack[sel][idx], decay[sel][idx], sustain[sel][idx], pluck[sel][idx])
+        h = hold[sel][idx]
+        after = t > h
+        rel = np.maximum(release[sel][idx][after], 1e-6)
+        env[after] = level_off[sel][idx][after] * np.maximum(0.0, 1.0 - (t[after] - h[after]) / rel)
+
+        samples = wave * env * (vel[sel] * (gain / 127.0)).astype(np.float32)[idx]
+        positions = onset[sel][idx] + local
+        first = int(positions.min())
+        seg = np.bincount(positions - first, weights=samples)
+        out[first:first + seg.size] += seg
+
+    peak = float(np.abs(out).max())
+    if peak > 0.99:
+        out *= 0.99 / peak
+    return out
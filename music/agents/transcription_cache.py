@@ -0,0 +1,187 @@
+# Content-addressed cache of transcription results (Jianpu + MIDI bytes).
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+import pitch
+
+
+def make_key(y: np.ndarray, sr: int, params: dict) -> str:
+    # sha256 over the decoded samples, the sample rate and the analysis parameters.
+    h = hashlib.sha256()
+    h.update(json.dumps({"sr": int(sr), **params}, sort_keys=True).encode("utf-8"))
+    h.update(np.ascontiguousarray(y, dtype=np.float32).tobytes())
+    return h.hexdigest()
+
+
+def raw_alias(file_bytes: bytes, params: dict) -> str:
+    # Cheaper alias over the encoded upload, so byte-identical re-uploads skip decoding too.
+    h = hashlib.sha256()
+    h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    h.update(file_bytes)
+    return "raw:" + h.hexdigest()
+
+
+def transcribe_upload(
+    file_bytes: bytes,
+    mime_type: str,
+    params: dict,
+    fast_f0_seconds: float = 0.0,
+    known_keys: frozenset = frozenset(),
+) -> tuple[str, Optional[tuple[str, bytes]]]:
+    """
+    Worker job: decode, key and (on a miss) analyse in one go, so decoded audio never crosses the pool.
+    - recordings longer than fast_f0_seconds use the fast YIN backend (pyin costs about realtime/2)
+    - returns (key, (jianpu, midi_bytes)), or (key, None) if key is in known_keys
+    """
+    y, sr = pitch.load_audio_bytes(file_bytes, mime_type)
+    if fast_f0_seconds and sr and len(y) / sr > fast_f0_seconds:
+        params = {**params, "f0_backend": "fast"}
+    key = make_key(y, sr, params)
+    if key in known_keys:
+        return key, None
+    return key, pitch.transcribe(y, sr, **params)
+
+
+class TranscriptionCache:
+    """
+    LRU cache: key -> (jianpu, midi_bytes).
+    - Bounded by entry count and by total stored bytes; least recently used goes first.
+    - Aliases (shared_cache file_id, hash of the encoded upload) point at keys so a
+      repeated recording can be answered before it is even decoded.
+    - With cache_dir, entries are written as <key>.json and reloaded on start-up;
+      evicting an entry also removes its file, so the directory obeys the same bounds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        max_aliases: int = 4096,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_aliases = max(1, int(max_aliases))
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        self._entries: "OrderedDict[str, tuple[str, bytes]]" = OrderedDict()
+        self._aliases: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_from_disk()
+
+    @staticmethod
+    def _size(jianpu: str, midi_bytes: bytes) -> int:
+        return len(jianpu.encode("utf-8")) + len(midi_bytes)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> frozenset:
+        # Snapshot of the cached keys, for transcribe_upload to skip analysis on a hit.
+        with self._lock:
+            return frozenset(self._entries)
+
+    def get(self, key: str) -> Optional[tuple[str, bytes]]:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return hit
+
+    def put(self, key: str, jianpu: str, midi_bytes: bytes):
+        size = self._size(jianpu, midi_bytes)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._size(*old)
+            self._entries[key] = (jianpu, midi_bytes)
+            self._bytes += size
+            self._evict()
+        if self.cache_dir is not None and key in self._entries:
+            self._write_entry(key, jianpu, midi_bytes)
+
+    def alias(self, name: str, key: str):
+        with self._lock:
+            self._aliases[name] = key
+            self._aliases.move_to_end(name)
+            while len(self._aliases) > self.max_aliases:
+                self._aliases.popitem(last=False)
+
+    def resolve(self, name: str) -> Optional[str]:
+        # Key an alias points at, if that entry is still cached; dangling aliases are dropped.
+        with self._lock:
+            key = self._aliases.get(name)
+            if key is None:
+                return None
+            if key not in self._entries:
+                self._aliases.pop(name, None)
+                return None
+            return key
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "aliases": len(self._aliases),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self):
+        # Caller holds the lock.
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, value = self._entries.popitem(last=False)
+            self._bytes -= self._size(*value)
+            self.evictions += 1
+            if self.cache_dir is not None:
+                try:
+                    (self.cache_dir / f"{key}.json").unlink()
+                except OSError:
+                    pass
+
+    def _write_entry(self, key: str, jianpu: str, midi_bytes: bytes):
+        path = self.cache_dir / f"{key}.json"
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(
+                json.dumps({"jianpu": jianpu, "midi": base64.b64encode(midi_bytes).decode("ascii")}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[TranscriptionCache] failed to persist {key[:12]}: {e}")
+
+    def _load_from_disk(self):
+        # Oldest first, so the most recently written entries end up most recently used.
+        files = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                jianpu, midi_bytes = data["jianpu"], base64.b64decode(data["midi"])
+            except Exception:
+                continue
+            self._entries[path.stem] = (jianpu, midi_bytes)
+            self._bytes += self._size(jianpu, midi_bytes)
+        with self._lock:
+            self._evict()
@@ -0,0 +1,6 @@
+# The agent modules import each other by bare name (import pitch, import score, ...),
+# the same way they do when run from music/agents.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents"))
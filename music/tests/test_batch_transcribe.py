@@ -0,0 +1,32 @@
+import pytest
+
+import batch_transcribe
+import synth_corpus
+
+
+@pytest.mark.parametrize("analysis", ["frames", "notes"])
+def test_process_recording(tmp_path, analysis):
+    (wav,) = synth_corpus.generate_corpus(str(tmp_path / "in"), count=1, min_notes=8, max_notes=8)
+    out = tmp_path / "out"
+    out.mkdir()
+    params = {**batch_transcribe.DEFAULT_PARAMS, "f0_backend": "yin", "analysis": analysis}
+
+    result = batch_transcribe.process_recording(str(wav), str(out), params)
+
+    assert set(result["timings"]) == set(batch_transcribe.STAGES)
+    assert result["frames"] > 0
+    assert 0.0 <= result["accuracy"] <= 1.0
+    assert (out / "hum_000.jianpu.txt").read_text(encoding="utf-8").split()
+    assert (out / "hum_000.mid").stat().st_size > 0
+
+
+def test_process_recording_rejects_unknown_analysis(tmp_path):
+    (wav,) = synth_corpus.generate_corpus(str(tmp_path), count=1, min_notes=8, max_notes=8)
+    params = {**batch_transcribe.DEFAULT_PARAMS, "analysis": "chords"}
+    with pytest.raises(ValueError):
+        batch_transcribe.process_recording(str(wav), str(tmp_path), params)
+
+
+def test_peak_rss_without_resource_module(monkeypatch):
+    monkeypatch.setattr(batch_transcribe, "resource", None)
+    assert batch_transcribe._peak_rss_mb() is None
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from music_news.tools.card_render import CardRenderer
+
+ARTICLE = {"title": "Headline", "image_url": "", "caption": "Caption", "paragraphs": ["Body"]}
+
+
+class StubRenderer(CardRenderer):
+    # Skips the browser / wkhtmltoimage: each render waits on `gate` and returns fixed bytes.
+
+    def __init__(self, **kwargs):
+        super().__init__(backend="wkhtmltoimage", **kwargs)
+        self.calls = 0
+        self.gate = None
+        self.error = None
+
+    async def _render_html(self, html: str) -> bytes:
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return b"jpeg:" + str(self.calls).encode()
+
+
+def test_concurrent_renders_share_one_job_and_then_hit_the_cache():
+    renderer = StubRenderer()
+
+    async def run():
+        renderer.gate = asyncio.Event()
+        tasks = [asyncio.ensure_future(renderer.render(ARTICLE)) for _ in range(3)]
+        await asyncio.sleep(0)
+        renderer.gate.set()
+        first = await asyncio.gather(*tasks)
+        again = await renderer.render(ARTICLE)
+        other = await renderer.render({**ARTICLE, "title": "Other"})
+        return first, again, other
+
+    try:
+        first, again, other = asyncio.run(run())
+    finally:
+        renderer._executor.shutdown()
+    assert first == [b"jpeg:1"] * 3
+    assert again == b"jpeg:1"
+    assert other == b"jpeg:2"
+    assert renderer.calls == 2
+    assert renderer.stats() == {"backend": "wkhtmltoimage", "renders": 2, "hits": 3, "cached": 2}
+
+
+def test_cache_evicts_the_least_recently_used_card():
+    renderer = StubRenderer(cache_entries=1)
+
+    async def run():
+        await renderer.render(ARTICLE)
+        await renderer.render({**ARTICLE, "title": "Other"})
+        await renderer.render(ARTICLE)
+
+    try:
+        asyncio.run(run())
+    finally:
+        renderer._executor.shutdown()
+    assert renderer.calls == 3
+    assert renderer.stats()["cached"] == 1
+
+
+def test_failed_render_reaches_every_waiter_and_is_not_cached():
+    renderer = StubRenderer()
+
+    async def run():
+        renderer.gate = asyncio.Event()
+        renderer.error = RuntimeError("render failed")
+        tasks = [asyncio.ensure_future(renderer.render(ARTICLE)) for _ in range(2)]
+        await asyncio.sleep(0)
+        renderer.gate.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert not renderer._inflight
+
+        renderer.error = None
+        return results, await renderer.render(ARTICLE)
+
+    try:
+        results, retried = asyncio.run(run())
+    finally:
+        renderer._executor.shutdown()
+    assert [str(r) for r in results] == ["render failed"] * 2
+    assert retried == b"jpeg:2"
+    assert renderer.renders == 1
+
+
+def test_cancelled_render_releases_waiters():
+    renderer = StubRenderer()
+
+    async def run():
+        renderer.gate = asyncio.Event()
+        owner = asyncio.ensure_future(renderer.render(ARTICLE))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(renderer.render(ARTICLE))
+        await asyncio.sleep(0)
+        owner.cancel()
+        # The waiter must not hang on the abandoned render
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, 1.0)
+        assert not renderer._inflight
+        renderer.gate.set()
+        return await renderer.render(ARTICLE)
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        renderer._executor.shutdown()
+    assert result == b"jpeg:2"
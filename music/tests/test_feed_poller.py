@@ -0,0 +1,105 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from music_news.tools.async_fetcher import AsyncFetcher
+from music_news.tools.feed_poller import FeedPoller
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>One</title><link>https://example.com/1</link></item>
+<item><title>Two</title><link>https://example.com/2</link></item>
+</channel></rss>"""
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.add_routes([web.get("/feed", handler)])
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def test_unchanged_feed_is_a_304_with_conditional_headers():
+    seen_headers = []
+
+    async def feed(request):
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(body=RSS, headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+    async def run():
+        server = await _serve(feed)
+        try:
+            async with AsyncFetcher(retries=0) as fetcher:
+                poller = FeedPoller(fetcher, str(server.make_url("/feed")), min_interval=10, max_interval=100)
+                first = await poller.poll()
+                second = await poller.poll()
+                return poller, first, second
+        finally:
+            await server.close()
+
+    poller, first, second = asyncio.run(run())
+    assert [e.title for e in first] == ["One", "Two"]
+    assert second is None
+    assert "If-None-Match" not in seen_headers[0]
+    assert seen_headers[1]["If-None-Match"] == '"v1"'
+    assert seen_headers[1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert poller.stats() == {"polls": 2, "not_modified": 1, "interval": 20}
+
+
+def test_identical_body_without_validators_is_unchanged():
+    bodies = [RSS, RSS, RSS.replace(b"Two", b"Three")]
+
+    async def feed(request):
+        return web.Response(body=bodies.pop(0))
+
+    async def run():
+        server = await _serve(feed)
+        try:
+            async with AsyncFetcher(retries=0) as fetcher:
+                poller = FeedPoller(fetcher, str(server.make_url("/feed")))
+                return [await poller.poll() for _ in range(3)], poller
+        finally:
+            await server.close()
+
+    results, poller = asyncio.run(run())
+    assert results[0] is not None
+    assert results[1] is None
+    assert [e.title for e in results[2]] == ["One", "Three"]
+    assert poller.not_modified == 0
+
+
+def test_failed_fetch_backs_off():
+    async def feed(request):
+        return web.Response(status=500)
+
+    async def run():
+        server = await _serve(feed)
+        try:
+            async with AsyncFetcher(retries=0) as fetcher:
+                poller = FeedPoller(fetcher, str(server.make_url("/feed")), min_interval=10)
+                return await poller.poll(), poller.interval
+        finally:
+            await server.close()
+
+    assert asyncio.run(run()) == (None, 20)
+
+
+def test_interval_backs_off_to_the_cap_and_resets_on_news():
+    poller = FeedPoller(fetcher=None, url="http://unused", min_interval=10, max_interval=35, backoff=2)
+    intervals = []
+    for _ in range(4):
+        poller.mark(False)
+        intervals.append(poller.interval)
+    assert intervals == [20, 35, 35, 35]
+    poller.mark(True)
+    assert poller.interval == 10
+
+
+def test_max_interval_is_never_below_min_interval():
+    poller = FeedPoller(fetcher=None, url="http://unused", min_interval=60, max_interval=30)
+    poller.mark(False)
+    assert poller.interval == 60
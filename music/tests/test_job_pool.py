@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from job_pool import JobPool, PoolSaturated
+
+
+def test_timed_out_job_keeps_its_worker_slot():
+    pool = JobPool(kind="thread", max_workers=1, max_pending=3, job_timeout=0.1)
+    release = threading.Event()
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.submit(release.wait, 5)
+        m = pool.metrics()
+        assert m["timed_out_running"] == 1
+        assert m["running"] == 1
+
+        # The next job waits for the slot in the pool (visible as queue depth), not in the executor.
+        nxt = asyncio.ensure_future(pool.submit(time.sleep, 0))
+        await asyncio.sleep(0.05)
+        assert pool.queue_depth == 1
+        release.set()
+        await nxt
+        await asyncio.sleep(0)
+        m = pool.metrics()
+        assert m["timed_out_running"] == 0
+        assert m["running"] == 0
+        assert m["timeouts"] == 1
+        assert m["completed"] == 1
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+
+def test_timed_out_jobs_count_against_max_pending():
+    pool = JobPool(kind="thread", max_workers=2, max_pending=2, job_timeout=0.05)
+    release = threading.Event()
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.submit(release.wait, 5)
+        assert pool.saturated
+        with pytest.raises(PoolSaturated):
+            await pool.submit(time.sleep, 0)
+        release.set()
+        await asyncio.sleep(0.05)
+        assert not pool.saturated
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
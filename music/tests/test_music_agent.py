@@ -0,0 +1,119 @@
+import asyncio
+import io
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+import pitch
+import synth_corpus
+from music_agent import MusicAgent
+
+
+def _encode(pcm, sr, fmt):
+    buf = io.BytesIO()
+    sf.write(buf, pcm, sr, format=fmt, subtype="PCM_16")
+    return buf.getvalue()
+
+
+def test_transcribe_cached_runs_one_job_per_new_recording():
+    rng = np.random.default_rng(0)
+    sr = pitch.TARGET_SR
+    y = synth_corpus.render_hum(synth_corpus.random_melody(8, rng), sr=sr, rng=rng)
+    pcm = (np.clip(y, -1.0, 1.0) * 32767).astype(np.int16)
+    wav, flac = _encode(pcm, sr, "WAV"), _encode(pcm, sr, "FLAC")
+    # Every take is "long", so the fast backend keeps the test quick.
+    agent = MusicAgent(executor="thread", max_workers=1, fast_f0_seconds=0.5)
+
+    async def run():
+        first = await agent._transcribe_cached("a", wav, "audio/wav")
+        assert agent._pool.metrics()["completed"] == 1
+        assert len(agent._cache) == 1
+
+        # Same samples in another container: one job to decode and key it, no second analysis.
+        assert await agent._transcribe_cached("b", flac, "audio/flac") == first
+        assert agent._pool.metrics()["completed"] == 2
+        assert len(agent._cache) == 1
+
+        # Same bytes again: answered from the upload alias without a job.
+        assert await agent._transcribe_cached("c", wav, "audio/wav") == first
+        assert agent._pool.metrics()["completed"] == 2
+        return first
+
+    try:
+        jianpu, midi_bytes = asyncio.run(run())
+    finally:
+        agent._pool.shutdown()
+    assert jianpu.split()
+    assert midi_bytes.startswith(b"MThd")
+
+
+def test_idle_streams_expire():
+    agent = MusicAgent(executor="thread", max_workers=1)
+
+    async def run():
+        busy = asyncio.Lock()
+        await busy.acquire()
+        agent._streams = {
+            "idle": {"decoder": None, "transcriber": None, "lock": asyncio.Lock(), "posted": "", "active": 0.0},
+            "busy": {"decoder": None, "transcriber": None, "lock": busy, "posted": "", "active": 0.0},
+            "fresh": {"decoder": None, "transcriber": None, "lock": asyncio.Lock(), "posted": "", "active": 100.0},
+        }
+        return agent._expire_streams(now=agent.stream_idle_seconds + 50.0)
+
+    assert asyncio.run(run()) == ["idle"]
+    assert set(agent._streams) == {"busy", "fresh"}
+
+
+class _Channel:
+    def __init__(self, posts):
+        self.posts = posts
+
+    async def post(self, text):
+        self.posts.append(text)
+
+
+class _Workspace:
+    # Records channel posts instead of sending them to a network.
+    def __init__(self):
+        self.posts = []
+
+    def channel(self, name):
+        return _Channel(self.posts)
+
+
+def test_stream_jobs_run_on_the_bounded_stream_pool():
+    agent = MusicAgent(executor="thread", max_workers=1, max_pending=1, job_timeout=0.1)
+    workspace = _Workspace()
+    agent.workspace = lambda: workspace
+    release = threading.Event()
+
+    async def run():
+        agent._streams = {
+            s: {"decoder": None, "transcriber": None, "lock": asyncio.Lock(), "posted": "", "active": 0.0}
+            for s in ("slow", "next")
+        }
+        assert await agent._run_stream_job("slow", "general", time.sleep, 0) == (True, None)
+
+        # A stuck step times out: the stream is dropped and its worker still counts as load.
+        assert await agent._run_stream_job("slow", "general", release.wait, 5) == (False, None)
+        assert "slow" not in agent._streams
+        streams = agent.get_metrics()["streams"]
+        assert streams["timeouts"] == 1
+        assert streams["timed_out_running"] == 1
+        assert streams["open"] == 1
+
+        # With max_pending reached the next stream is turned away instead of queued.
+        assert await agent._run_stream_job("next", "general", time.sleep, 0) == (False, None)
+        assert agent._streams == {}
+        assert agent.get_metrics()["streams"]["rejected"] == 1
+        release.set()
+
+    try:
+        asyncio.run(run())
+    finally:
+        agent._stream_pool.shutdown()
+        agent._pool.shutdown()
+    assert workspace.posts[0] == "Streaming analysis timed out after 0s."
+    assert workspace.posts[1].startswith("MusicWorker is busy")
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from music_news.tools.async_fetcher import AsyncFetcher, FetchError
+from music_news.tools.news_fetcher import fetch_hackernews_stories
+
+
+def _story(sid):
+    return {"title": f"Story {sid}", "url": f"https://example.com/{sid}", "score": sid, "descendants": 1, "by": "dev"}
+
+
+async def _serve(routes):
+    # Local HN-like API; the caller closes the returned server.
+    app = web.Application()
+    app.add_routes(routes)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def test_hackernews_items_are_fetched_concurrently():
+    in_flight = {"now": 0, "max": 0}
+
+    async def top(request):
+        return web.json_response([1, 2, 3, 4, 5])
+
+    async def item(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.1)
+        in_flight["now"] -= 1
+        return web.json_response(_story(int(request.match_info["sid"])))
+
+    async def run():
+        server = await _serve([web.get("/topstories.json", top), web.get("/item/{sid}.json", item)])
+        try:
+            async with AsyncFetcher() as fetcher:
+                start = time.monotonic()
+                stories = await fetch_hackernews_stories(fetcher, "top", 5, base_url=str(server.make_url("/")))
+                return stories, time.monotonic() - start
+        finally:
+            await server.close()
+
+    stories, elapsed = asyncio.run(run())
+    assert [s["title"] for s in stories] == [f"Story {i}" for i in range(1, 6)]
+    assert in_flight["max"] == 5
+    # Five 0.1 s items one after another would take at least 0.5 s
+    assert elapsed < 0.4
+
+
+def test_hackernews_skips_failed_and_untitled_items():
+    async def top(request):
+        return web.json_response([1, 2, 3])
+
+    async def item(request):
+        sid = int(request.match_info["sid"])
+        if sid == 2:
+            return web.Response(status=404)
+        if sid == 3:
+            return web.json_response({"id": 3, "type": "comment"})
+        return web.json_response(_story(sid))
+
+    async def run():
+        server = await _serve([web.get("/topstories.json", top), web.get("/item/{sid}.json", item)])
+        try:
+            async with AsyncFetcher(retries=0) as fetcher:
+                return await fetch_hackernews_stories(fetcher, "top", 3, base_url=str(server.make_url("/")))
+        finally:
+            await server.close()
+
+    stories = asyncio.run(run())
+    assert [s["title"] for s in stories] == ["Story 1"]
+
+
+def test_retries_a_503_then_succeeds():
+    hits = []
+
+    async def flaky(request):
+        hits.append(time.monotonic())
+        if len(hits) == 1:
+            return web.Response(status=503)
+        return web.json_response({"ok": True})
+
+    async def run():
+        server = await _serve([web.get("/flaky", flaky)])
+        try:
+            async with AsyncFetcher(retries=2, backoff=0.01) as fetcher:
+                data = await fetcher.get_json(str(server.make_url("/flaky")))
+                return data, fetcher.stats()
+        finally:
+            await server.close()
+
+    data, stats = asyncio.run(run())
+    assert data == {"ok": True}
+    assert len(hits) == 2
+    assert stats == {"requests": 2, "retried": 1, "failed": 0}
+
+
+def test_does_not_retry_a_404():
+    hits = []
+
+    async def missing(request):
+        hits.append(request.path)
+        return web.Response(status=404)
+
+    async def run():
+        server = await _serve([web.get("/missing", missing)])
+        try:
+            async with AsyncFetcher(retries=3, backoff=0.01) as fetcher:
+                with pytest.raises(FetchError) as excinfo:
+                    await fetcher.get(str(server.make_url("/missing")))
+                return excinfo.value, fetcher.stats()
+        finally:
+            await server.close()
+
+    error, stats = asyncio.run(run())
+    assert error.status == 404
+    assert hits == ["/missing"]
+    assert stats == {"requests": 1, "retried": 0, "failed": 1}
+
+
+def test_requests_to_one_host_are_spaced_by_rate():
+    starts = []
+
+    async def item(request):
+        starts.append(time.monotonic())
+        return web.json_response({})
+
+    async def run():
+        server = await _serve([web.get("/item/{sid}.json", item)])
+        try:
+            # 20 requests/s: starts at least 50 ms apart even when issued together
+            async with AsyncFetcher(rate_per_host=20) as fetcher:
+                urls = [str(server.make_url(f"/item/{i}.json")) for i in range(4)]
+                return await fetcher.get_many(urls)
+        finally:
+            await server.close()
+
+    responses = asyncio.run(run())
+    assert all(r.ok for r in responses)
+    starts.sort()
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert len(gaps) == 3
+    assert min(gaps) >= 0.04
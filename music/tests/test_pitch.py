@@ -0,0 +1,138 @@
+# Pitch pipeline tests. Equivalence checks compare against the reference
+# implementations in benchmarks.py (the original per-frame loops).
+import io
+import shutil
+
+import numpy as np
+import librosa
+import pytest
+import soundfile as sf
+
+import pitch
+import synth_corpus
+from benchmarks import (
+    reference_estimate_key_ks,
+    reference_f0_to_jianpu,
+    reference_smooth_midi,
+    synthetic_f0,
+)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_estimate_key_ks_matches_reference(seed):
+    midi = librosa.hz_to_midi(synthetic_f0(2000, seed=seed))
+    midi = midi[~np.isnan(midi)]
+    assert pitch.estimate_key_ks(midi)[:2] == reference_estimate_key_ks(midi)[:2]
+
+
+def test_estimate_key_ks_without_notes():
+    assert pitch.estimate_key_ks(np.array([]))[:2] == reference_estimate_key_ks(np.array([]))[:2]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_f0_to_jianpu_matches_reference(seed):
+    f0 = synthetic_f0(20_000, seed=seed)
+    assert pitch.f0_to_jianpu(f0) == reference_f0_to_jianpu(f0)
+
+
+@pytest.mark.parametrize("n", [0, 1, 6, 7, 8, 17, 1000])
+@pytest.mark.parametrize("win", [1, 2, 3, 4, 7, 8])
+def test_smooth_midi_matches_reference(n, win):
+    rng = np.random.default_rng(n * 10 + win)
+    x = 60 + rng.normal(0, 2, size=n)
+    assert np.array_equal(pitch.smooth_midi(x, win), reference_smooth_midi(x, win))
+    xi = np.round(x).astype(int)
+    assert np.array_equal(pitch.smooth_midi(xi, win), reference_smooth_midi(xi, win))
+
+
+def test_smooth_midi_matches_reference_with_nan():
+    x = 60 + np.random.default_rng(1).normal(0, 2, size=500)
+    x[::37] = np.nan
+    assert np.array_equal(pitch.smooth_midi(x, 7), reference_smooth_midi(x, 7), equal_nan=True)
+
+
+def test_smooth_midi_matches_reference_on_pitch_track():
+    midi = librosa.hz_to_midi(synthetic_f0(20_000, rest_ratio=0.0))
+    assert np.array_equal(pitch.smooth_midi(midi, 7), reference_smooth_midi(midi, 7))
+
+
+def _hums(count, seed, **kwargs):
+    rng = np.random.default_rng(seed)
+    return [
+        synth_corpus.render_hum(synth_corpus.random_melody(8, rng), sr=pitch.TARGET_SR, rng=rng, **kwargs)
+        for _ in range(count)
+    ]
+
+
+def test_estimate_f0_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        pitch.estimate_f0(np.zeros(pitch.TARGET_SR), pitch.TARGET_SR, backend="crepe")
+
+
+def test_yin_tracks_the_same_pitch_as_pyin():
+    sr = pitch.TARGET_SR
+    for y in _hums(2, seed=0):
+        f0_pyin, _, _ = pitch.estimate_f0(y, sr, backend="pyin")
+        f0_yin, _, _ = pitch.estimate_f0(y, sr, backend="fast")
+        assert f0_yin.shape == f0_pyin.shape
+        both = ~np.isnan(f0_pyin) & ~np.isnan(f0_yin)
+        assert both.mean() > 0.7
+        diff = np.abs(librosa.hz_to_midi(f0_pyin[both]) - librosa.hz_to_midi(f0_yin[both]))
+        assert (diff < 0.5).mean() > 0.95
+
+
+@pytest.mark.parametrize("backend, count", [("yin", 3), ("pyin", 1)])
+def test_gating_does_not_change_the_transcription(backend, count):
+    sr = pitch.TARGET_SR
+    for y in _hums(count, seed=1, gap_sec=(0.2, 1.5), lead_silence=1.0):
+        full = pitch.transcribe(y, sr, f0_backend=backend, gate=False)
+        gated = pitch.transcribe(y, sr, f0_backend=backend, gate=True)
+        assert gated == full
+
+
+def test_note_analysis_matches_frame_analysis_on_clean_hums():
+    sr = pitch.TARGET_SR
+    for y in _hums(3, seed=2):
+        notes, midi = pitch.transcribe(y, sr, f0_backend="yin", analysis="notes")
+        frames, _ = pitch.transcribe(y, sr, f0_backend="yin", analysis="frames")
+        assert midi
+        assert [t for t in notes.split() if t != "0"][:4] == [t for t in frames.split() if t != "0"][:4]
+
+
+def test_transcribe_rejects_unknown_analysis():
+    with pytest.raises(ValueError):
+        pitch.transcribe(np.zeros(pitch.TARGET_SR), pitch.TARGET_SR, analysis="chords")
+
+
+def test_streaming_finish_matches_batch_after_a_key_change():
+    # The key locks after a second; the melody then moves up a fourth.
+    rng = np.random.default_rng(4)
+    sr = pitch.TARGET_SR
+    melody = synth_corpus.random_melody(5, rng) + [m + 5 for m in synth_corpus.random_melody(7, rng)]
+    y = synth_corpus.render_hum(melody, sr=sr, rng=rng)
+
+    transcriber = pitch.StreamingTranscriber(sr, lock_seconds=1.0)
+    for i in range(0, len(y), sr):
+        transcriber.feed(y[i:i + sr])
+    locked_tokens, _ = transcriber.snapshot()
+    final = transcriber.finish()
+
+    # Read in the early key the melody needs accidentals; the final notation re-estimates the key.
+    assert any("#" in t for t in locked_tokens)
+    assert final == pitch.transcribe(y, sr, gate=False)[0]
+    assert "#" not in final
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_stream_decoder_matches_whole_file_decode():
+    sr = pitch.TARGET_SR
+    y = (0.3 * np.sin(2 * np.pi * 220 * np.arange(3 * sr) / sr)).astype(np.float32)
+    buf = io.BytesIO()
+    sf.write(buf, y, sr, format="WAV", subtype="PCM_16")
+    data = buf.getvalue()
+
+    decoder = pitch.StreamDecoder(sr)
+    parts = [decoder.write(data[i:i + 10_000]) for i in range(0, len(data), 10_000)]
+    parts.append(decoder.close())
+    expected, _ = pitch.load_audio_bytes(data, "audio/x-matroska")  # forces the ffmpeg path
+    np.testing.assert_array_equal(np.concatenate(parts), expected)
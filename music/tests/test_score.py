@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import score
+
+
+def _pitches(text):
+    return score.parse_jianpu(text)["pitch"].tolist()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 2 3", [60, 62, 64]),
+    ("1,2,3", [60, 62, 64]),
+    ("1\n2,3", [60, 62, 64]),
+    ("7, 1 1' b3 #4", [59, 60, 72, 63, 66]),
+    ("7,,1", [59, 60]),
+    ("7,, 1", [47, 60]),
+    ("1 0 - rest 5", [60, score.REST, score.REST, score.REST, 67]),
+    # Pieces that are not tokens hold their slot as a rest, as the old SoundRender parser did.
+    ("1 12 3", [60, score.REST, 64]),
+    ("1 x 3", [60, score.REST, 64]),
+    ("", []),
+])
+def test_parse_jianpu(text, expected):
+    assert _pitches(text) == expected
+
+
+def test_parse_jianpu_slots():
+    notes = score.parse_jianpu("1 2 0 3", note_len_beats=0.5, velocity=90)
+    assert notes["onset"].tolist() == [0.0, 0.5, 1.0, 1.5]
+    assert np.all(notes["duration"] == 0.5)
+    assert notes["velocity"].tolist() == [90, 90, 0, 90]
+
+
+def test_to_jianpu_round_trip():
+    text = "5, 6, 1 #2 3 0 1' 2''"
+    assert score.to_jianpu(score.parse_jianpu(text)) == text
+
+
+def test_token_to_midi():
+    assert score.token_to_midi("b7,") == 58
+    assert score.token_to_midi("rest") is None
+    with pytest.raises(ValueError):
+        score.token_to_midi("12")
@@ -0,0 +1,90 @@
+import time
+
+from music_news.tools.seen_index import SeenIndex, _MAGIC, _RECORD, url_key
+
+DAY = 86400
+
+
+def test_urls_are_normalised():
+    index = SeenIndex()
+    index.add("https://example.com/story/ ")
+    assert "https://example.com/story" in index
+    assert index.unseen(["https://example.com/story/", "https://example.com/other", ""]) == ["https://example.com/other"]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = tmp_path / "seen.bin"
+    index = SeenIndex(str(path))
+    index.add_many([f"https://example.com/{i}" for i in range(5)])
+    index.save()
+    assert path.read_bytes().startswith(_MAGIC)
+    assert not path.with_name("seen.bin.tmp").exists()
+
+    loaded = SeenIndex(str(path))
+    assert len(loaded) == 5
+    assert all(f"https://example.com/{i}" in loaded for i in range(5))
+    assert loaded._seen == index._seen
+
+
+def test_save_only_writes_when_dirty(tmp_path):
+    path = tmp_path / "seen.bin"
+    index = SeenIndex(str(path))
+    index.save()
+    assert not path.exists()
+
+    index.add("https://example.com/1")
+    index.save()
+    path.write_bytes(b"changed")
+    index.add("https://example.com/1")  # already seen, not a change
+    index.save()
+    assert path.read_bytes() == b"changed"
+
+
+def test_prune_by_age():
+    now = 1_700_000_000
+    index = SeenIndex(max_age_days=7)
+    index.add("https://example.com/old", now=now - 8 * DAY)
+    index.add("https://example.com/new", now=now - 6 * DAY)
+    assert index.prune(now) == 1
+    assert "https://example.com/old" not in index
+    assert "https://example.com/new" in index
+
+
+def test_prune_by_count_keeps_the_newest():
+    now = 1_700_000_000
+    index = SeenIndex(max_items=3)
+    for i in range(5):
+        index.add(f"https://example.com/{i}", now=now + i)
+    assert index.prune(now + 10) == 2
+    assert len(index) == 3
+    assert index.unseen([f"https://example.com/{i}" for i in range(5)]) == ["https://example.com/0", "https://example.com/1"]
+
+
+def test_load_prunes_expired_records(tmp_path):
+    path = tmp_path / "seen.bin"
+    now = int(time.time())
+    path.write_bytes(_MAGIC + _RECORD.pack(url_key("https://example.com/old"), now - 40 * DAY)
+                     + _RECORD.pack(url_key("https://example.com/new"), now))
+    index = SeenIndex(str(path), max_age_days=30)
+    assert len(index) == 1
+    assert "https://example.com/new" in index
+
+
+def test_truncated_index_keeps_whole_records(tmp_path):
+    path = tmp_path / "seen.bin"
+    index = SeenIndex(str(path))
+    index.add_many(["https://example.com/a", "https://example.com/b"])
+    index.save()
+    path.write_bytes(path.read_bytes()[:-5])  # torn last record
+
+    loaded = SeenIndex(str(path))
+    assert len(loaded) == 1
+    assert ("https://example.com/a" in loaded) != ("https://example.com/b" in loaded)
+
+
+def test_foreign_file_is_ignored(tmp_path):
+    path = tmp_path / "seen.bin"
+    path.write_bytes(b'{"not": "an index"}')
+    index = SeenIndex(str(path))
+    assert len(index) == 0
+    assert path.read_bytes() == b'{"not": "an index"}'
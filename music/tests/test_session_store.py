@@ -0,0 +1,112 @@
+import json
+
+from session_store import SessionStore
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_sessions_expire_lazily_after_ttl():
+    clock = FakeClock()
+    store = SessionStore(ttl_seconds=60, clock=clock)
+    store.put("a", {"tempo": 90})
+    store.put("b", {"tempo": 120})
+
+    clock.now += 50
+    assert store.update("a", tempo=100) == {"tempo": 100}  # refreshes a's TTL
+    clock.now += 20
+    # Nothing is dropped until the store is touched again.
+    assert len(store) == 2
+    assert "b" not in store
+    assert len(store) == 1
+    assert store.get("a") == {"tempo": 100}
+    assert store.update("b", tempo=60) is None
+
+    clock.now += 61
+    assert store.get("a") is None
+    assert store.stats() == {"sessions": 0, "max_sessions": 1024, "expired": 2, "evicted": 0}
+
+
+def test_contains_does_not_refresh_ttl_or_order():
+    clock = FakeClock()
+    store = SessionStore(ttl_seconds=60, max_sessions=2, clock=clock)
+    store.put("a", {})
+    store.put("b", {})
+    clock.now += 30
+    assert "a" in store
+    store.put("c", {})  # evicts the least recently used, still "a"
+    assert "a" not in store
+    assert store.evicted == 1
+    clock.now += 31
+    assert "b" not in store
+    assert "c" in store
+
+
+def test_snapshot_and_load_round_trip():
+    clock = FakeClock()
+    store = SessionStore(ttl_seconds=60, clock=clock)
+    store.put("old", {"tempo": 80, "score": object()})
+    clock.now += 10
+    store.put("new", {"tempo": 100, "notation": "1 2 3", "score": object()})
+
+    snapshot = store.snapshot()
+    data = json.loads(snapshot)
+    assert [s["channel"] for s in data["sessions"]] == ["old", "new"]
+    assert all("score" not in s["state"] for s in data["sessions"])
+
+    clock.now += 55  # "old" is now 65 s idle, past the TTL
+    restored = SessionStore(ttl_seconds=60, clock=clock)
+    assert restored.load(snapshot) == 1
+    assert restored.get("new") == {"tempo": 100, "notation": "1 2 3"}
+    assert "old" not in restored
+
+    # Loaded sessions keep their original touch time.
+    clock.now += 6
+    assert restored.get("new") is None
+
+
+def test_load_skips_malformed_snapshots():
+    store = SessionStore()
+    assert store.load("not json") == 0
+    assert store.load("[]") == 0
+    bad = json.dumps({"sessions": [{"channel": "a"}, {"channel": "b", "touched": "x", "state": {}}]})
+    assert store.load(bad) == 0
+    assert len(store) == 0
+
+
+def test_dirty_is_set_by_changes_and_cleared_by_snapshot():
+    clock = FakeClock()
+    store = SessionStore(ttl_seconds=60, clock=clock)
+    assert not store.dirty
+    store.put("a", {})
+    assert store.dirty
+    store.snapshot()
+    assert not store.dirty
+
+    store.get("a")
+    assert "a" in store
+    assert not store.dirty  # reads are not changes
+    store.update("a", tempo=90)
+    assert store.dirty
+    store.snapshot()
+
+    assert store.pop("missing") is None
+    assert not store.dirty
+    assert store.pop("a") == {"tempo": 90}
+    assert store.dirty
+    store.snapshot()
+
+    store.put("b", {})
+    store.snapshot()
+    clock.now += 61
+    assert store.get("b") is None
+    assert store.dirty  # expiry removes a session, so the snapshot is stale
+
+    restored = SessionStore(clock=clock)
+    restored.load(store.snapshot())
+    assert not restored.dirty
@@ -0,0 +1,75 @@
+import asyncio
+import types
+
+import pytest
+
+import sound_agent
+from benchmarks import reference_parse_controls
+
+
+def _as_dict(c: sound_agent.ControlUpdate) -> dict:
+    fields = (
+        ("instrument", c.instrument), ("bpm", c.bpm), ("noteLen", c.note_len),
+        ("style", c.style), ("accompaniment", c.accompaniment),
+    )
+    return {k: v for k, v in fields if v is not None}
+
+
+@pytest.mark.parametrize("text", [
+    "bpm: 120\ninstrument: Flute",
+    "noteLen: 0.25, style: straight, accomp: off",
+    "tempo: 88.6 beat: swing",
+    "instrument: violin, bpm: fast",
+    "backing: on\nlen: 1",
+])
+def test_parse_controls_matches_reference(text):
+    assert _as_dict(sound_agent.parse_controls(text)) == reference_parse_controls(text)
+
+
+def test_react_ignores_unrelated_traffic():
+    agent = sound_agent.SoundRenderAgent(agent_id="SoundRender", synth_backend="numpy")
+    posts = []
+
+    class _Channel:
+        async def post(self, msg, **kwargs):
+            posts.append(msg)
+
+    agent.workspace = lambda: types.SimpleNamespace(channel=lambda name: _Channel())
+    agent._sessions.put("ch0", {"jianpu": "1 2 3", "bpm": 90})
+    events = [
+        types.SimpleNamespace(
+            event_name="thread.channel_message.notification", source_id="user1",
+            payload={"channel": "ch1", "content": {"text": "lunch at noon\nbpm: 120"}},
+        ),
+        types.SimpleNamespace(
+            event_name="thread.channel_message.notification", source_id="user2",
+            payload={"channel": "ch0", "content": {"text": "the melody sounds great"}},
+        ),
+        types.SimpleNamespace(
+            event_name="shared_cache.notification.created", source_id="MusicWorker",
+            payload={"cache_id": "1", "mime_type": "audio/webm"},
+        ),
+    ]
+
+    async def feed():
+        for event in events:
+            await agent.react(types.SimpleNamespace(incoming_event=event))
+
+    try:
+        asyncio.run(feed())
+    finally:
+        agent._renderer.close()
+    assert posts == []
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("@SoundRender Numbered notation: 1 2 3", "1 2 3"),
+    ("@SoundRender numbered notation: 1,2,3 5,", "1 2 3 5,"),
+    ("@SoundRender Numbered notation: 1 2 3 (bpm 120)", "1 2 3"),
+    ("Numbered notation: 1 2\n3 4\nthanks!", "1 2 3 4"),
+    ("Numbered notation: 1 12 3", "1 12 3"),
+    ("Numbered notation: see above", None),
+    ("@SoundRender play something", None),
+])
+def test_notation_from_text(text, expected):
+    assert sound_agent.notation_from_text(text) == expected
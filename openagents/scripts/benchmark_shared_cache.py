@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark shared cache metadata persistence.
+
+Pre-fills the shared cache mod with N entries, then measures file uploads per
+second (journal append per upload, compaction amortized), startup replay time,
+and, for comparison, the cost of rewriting the whole cache_data.json per
+operation as the mod did before the journal.
+
+Usage:
+    python scripts/benchmark_shared_cache.py --entries 100000 --uploads 2000
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from openagents.models.event import Event, EventVisibility
+from openagents.mods.core.shared_cache.mod import CacheEntry, SharedCacheMod
+
+
+def make_mod(storage_root: Path = None) -> SharedCacheMod:
+    """Create a shared cache mod with storage but no network (notifications are skipped)."""
+    mod = SharedCacheMod()
+    if storage_root is not None:
+        mod.get_storage_path = lambda: storage_root
+
+    async def no_notification(*args, **kwargs):
+        return None
+
+    mod._send_notification = no_notification
+    mod._setup_cache_storage()
+    return mod
+
+
+def prefill(mod: SharedCacheMod, count: int):
+    now = int(time.time())
+    for i in range(count):
+        cache_id = f"prefill-{i:08d}"
+        mod.cache_entries[cache_id] = CacheEntry(
+            cache_id=cache_id,
+            value=f"files/{cache_id}_render.mid",
+            mime_type="audio/midi",
+            allowed_agent_groups=[],
+            created_by="benchmark",
+            created_at=now,
+            updated_at=now,
+            is_file=True,
+            filename="render.mid",
+            file_size=2048,
+        )
+    mod._save_cache_entries()
+
+
+async def bench_uploads(mod: SharedCacheMod, uploads: int) -> float:
+    file_data = base64.b64encode(b"MThd" + bytes(60)).decode("utf-8")
+    start = time.perf_counter()
+    for i in range(uploads):
+        response = await mod._handle_file_upload(
+            Event(
+                event_name="shared_cache.file.upload",
+                source_id="benchmark",
+                relevant_mod="openagents.mods.core.shared_cache",
+                visibility=EventVisibility.MOD_ONLY,
+                payload={"file_data": file_data, "filename": f"take_{i}.mid", "mime_type": "audio/midi"},
+            )
+        )
+        assert response.success, response.message
+    return time.perf_counter() - start
+
+
+def bench_full_rewrite(mod: SharedCacheMod, ops: int) -> float:
+    """Per-operation cost of the previous persistence: rewrite every entry with indent=2."""
+    path = mod.storage_path / "cache_data_rewrite.json"
+    start = time.perf_counter()
+    for _ in range(ops):
+        data = {cache_id: entry.to_dict() for cache_id, entry in mod.cache_entries.items()}
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+    elapsed = time.perf_counter() - start
+    path.unlink(missing_ok=True)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared cache metadata persistence")
+    parser.add_argument("--entries", type=int, default=100000, help="Entries in the cache before measuring")
+    parser.add_argument("--uploads", type=int, default=2000, help="File uploads to time")
+    parser.add_argument("--rewrite-ops", type=int, default=5, help="Full-rewrite operations to time for comparison")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    mod = make_mod()
+    print(f"Storage: {mod.storage_path}")
+
+    t0 = time.perf_counter()
+    prefill(mod, args.entries)
+    print(f"Prefill {args.entries} entries + snapshot: {time.perf_counter() - t0:.2f}s")
+
+    elapsed = asyncio.run(bench_uploads(mod, args.uploads))
+    print(
+        f"Journal:      {args.uploads} uploads in {elapsed:.2f}s "
+        f"-> {args.uploads / elapsed:,.0f} uploads/s ({elapsed / args.uploads * 1000:.3f} ms/upload)"
+    )
+    print(f"              journal records pending: {mod._journal.records}")
+
+    # Restart: load snapshot and replay the journal
+    storage_root = mod.storage_path.parent
+    mod._journal.close()
+    t0 = time.perf_counter()
+    restarted = make_mod(storage_root)
+    load_s = time.perf_counter() - t0
+    assert len(restarted.cache_entries) == len(mod.cache_entries)
+    print(f"Startup:      {len(restarted.cache_entries)} entries loaded in {load_s:.2f}s")
+
+    if args.rewrite_ops > 0:
+        elapsed = bench_full_rewrite(mod, args.rewrite_ops)
+        per_op = elapsed / args.rewrite_ops
+        print(
+            f"Full rewrite: {per_op * 1000:.1f} ms/operation "
+            f"-> {1 / per_op:,.1f} uploads/s at {len(mod.cache_entries)} entries"
+        )
+
+    restarted._journal.close()
+    shutil.rmtree(storage_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
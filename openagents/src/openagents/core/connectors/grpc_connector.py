@@ -8,6 +8,7 @@ This is an alternative to the WebSocket-based NetworkConnector.
 import asyncio
 import json
 import logging
+import os
 import time
 from typing import Dict, Any, Optional, Callable, Awaitable, List
 
@@ -395,6 +396,132 @@ class GRPCNetworkConnector(NetworkConnector):
             logger.error(error_message)
             return self._create_error_response(error_message)
 
+    async def upload_file_stream(
+        self,
+        file_path: str,
+        filename: Optional[str] = None,
+        mime_type: str = "application/octet-stream",
+        allowed_agent_groups: Optional[List[str]] = None,
+        chunk_size: int = 1024 * 1024,
+        upload_id: Optional[str] = None,
+        offset: int = 0,
+        pinned: bool = False,
+    ) -> EventResponse:
+        """Upload a file to the shared cache as a stream of binary chunks.
+
+        The file is read and sent one chunk at a time, without base64, so memory
+        use does not depend on the file size.
+
+        Args:
+            file_path: Path of the file to upload
+            filename: Name to store the file under (default: basename of file_path)
+            mime_type: MIME type of the file
+            allowed_agent_groups: Agent groups that can access the file (empty = all)
+            chunk_size: Bytes per chunk
+            upload_id: Existing upload session to resume instead of starting a new one
+            offset: Byte offset to resume from (the session's ``received``)
+            pinned: Whether the file is exempt from eviction
+
+        Returns:
+            EventResponse: Response with cache_id, filename, file_size and mime_type
+        """
+        if not self.is_connected:
+            return self._create_error_response("Agent is not connected to gRPC network")
+
+        pb2 = self.agent_service_pb2
+
+        async def chunks():
+            header = pb2.FileChunk(source_id=self.agent_id, secret=self.secret or "", offset=offset)
+            if upload_id:
+                header.upload_id = upload_id
+            else:
+                header.filename = filename or os.path.basename(file_path)
+                header.mime_type = mime_type
+                header.allowed_agent_groups.extend(allowed_agent_groups or [])
+                header.total_size = os.path.getsize(file_path)
+                header.pinned = pinned
+            position = offset
+            with open(file_path, "rb") as f:
+                f.seek(offset)
+                data = f.read(chunk_size)
+                header.data = data
+                yield header
+                position += len(data)
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    yield pb2.FileChunk(offset=position, data=data)
+                    position += len(data)
+
+        try:
+            response = await self.stub.UploadFile(chunks())
+            response_data = json.loads(response.data.value.decode("utf-8")) if response.data and response.data.value else None
+            if response.success:
+                return self._create_success_response(response.message, response_data)
+            return EventResponse(success=False, message=response.message, data=response_data)
+        except Exception as e:
+            logger.error(f"Failed to stream file upload: {e}")
+            return self._create_error_response(f"Failed to stream file upload: {str(e)}")
+
+    async def download_file_stream(self, cache_id: str, save_path: str, offset: int = 0) -> EventResponse:
+        """Download a shared cache file as a stream of binary chunks, straight to disk.
+
+        A new download is written to a temporary file that is renamed to
+        save_path only on success, so a failed download leaves no partial file.
+        A resumed download (``offset`` > 0) is appended to save_path, which must
+        already hold exactly ``offset`` bytes; it is truncated back to that length
+        if the download fails.
+
+        Args:
+            cache_id: ID of the file cache entry
+            save_path: Where to write the file
+            offset: Byte offset to resume from; data is appended to save_path
+
+        Returns:
+            EventResponse: Response with cache_id, filename, mime_type, file_size and saved_to
+        """
+        if not self.is_connected:
+            return self._create_error_response("Agent is not connected to gRPC network")
+        if offset:
+            local_size = os.path.getsize(save_path) if os.path.exists(save_path) else None
+            if local_size != offset:
+                # Appending at any other position would silently corrupt the file
+                return self._create_error_response(
+                    f"Cannot resume at offset {offset}: {save_path} "
+                    + ("does not exist" if local_size is None else f"has {local_size} bytes")
+                )
+
+        request = self.agent_service_pb2.FileDownloadRequest(
+            cache_id=cache_id, source_id=self.agent_id, secret=self.secret or "", offset=offset
+        )
+        result = {"cache_id": cache_id, "saved_to": save_path}
+        target_path = save_path if offset else f"{save_path}.part"
+        completed = False
+        try:
+            with open(target_path, "ab" if offset else "wb") as f:
+                async for chunk in self.stub.DownloadFile(request):
+                    if chunk.filename:
+                        result["filename"] = chunk.filename
+                        result["mime_type"] = chunk.mime_type
+                    if chunk.HasField("total_size"):
+                        result["file_size"] = chunk.total_size
+                    f.write(chunk.data)
+            if not offset:
+                os.replace(target_path, save_path)
+            completed = True
+            return self._create_success_response("File downloaded successfully", result)
+        except Exception as e:
+            error_message = f"gRPC error {e.code().name}: {e.details()}" if hasattr(e, "code") else str(e)
+            logger.error(f"Failed to stream file download: {error_message}")
+            return self._create_error_response(error_message)
+        finally:
+            if not completed:
+                if offset:
+                    os.truncate(save_path, offset)
+                elif os.path.exists(target_path):
+                    os.remove(target_path)
+
     async def poll_messages(self) -> List[Event]:
         """Poll for queued messages from the gRPC network server.
 
@@ -21,7 +21,7 @@ from openagents.proto import agent_service_pb2_grpc, agent_service_pb2
 
 from .base import Transport
 from openagents.models.transport import TransportType, ConnectionState, ConnectionInfo
-from openagents.models.event import Event
+from openagents.models.event import Event, EventVisibility
 from openagents.models.event_response import EventResponse
 
 logger = logging.getLogger(__name__)
@@ -184,6 +184,166 @@ class OpenAgentsGRPCServicer(agent_service_pb2_grpc.AgentServiceServicer):
                 success=False, error_message=error_message
             )
 
+    async def UploadFile(self, request_iterator, context):
+        """Receive a shared cache file as a stream of binary chunks.
+
+        The first chunk carries the credentials and either the file metadata (a
+        new upload session is started, authenticated like any event) or the
+        upload_id of an existing session to resume. Each chunk's data is written
+        at its offset as it arrives, and the file is registered in the cache when
+        the client closes the stream.
+        """
+        upload_id = None
+        agent_id = None
+        secret = None
+        try:
+            cache_mod = self.transport._get_shared_cache_mod()
+            if cache_mod is None:
+                return agent_service_pb2.EventResponse(
+                    success=False,
+                    message="Shared cache mod not loaded",
+                    event_name="shared_cache.file.upload.complete",
+                )
+
+            # The first chunk opens or resumes the session
+            first_chunk = None
+            async for chunk in request_iterator:
+                first_chunk = chunk
+                break
+            if first_chunk is None:
+                return agent_service_pb2.EventResponse(
+                    success=False,
+                    message="No file chunks received",
+                    event_name="shared_cache.file.upload.complete",
+                )
+
+            agent_id = first_chunk.source_id
+            secret = first_chunk.secret or None
+            if first_chunk.upload_id:
+                event_name = "shared_cache.file.upload.status"
+                payload = {"upload_id": first_chunk.upload_id}
+            else:
+                event_name = "shared_cache.file.upload.start"
+                payload = {
+                    "filename": first_chunk.filename,
+                    "mime_type": first_chunk.mime_type or "application/octet-stream",
+                    "allowed_agent_groups": list(first_chunk.allowed_agent_groups),
+                    "total_size": first_chunk.total_size if first_chunk.HasField("total_size") else None,
+                    "pinned": first_chunk.pinned,
+                }
+            event_response = await self._shared_cache_event(event_name, agent_id, secret, payload)
+            if not event_response or not event_response.success:
+                return self._to_protobuf_response(event_response, event_name)
+            upload_id = event_response.data["upload_id"]
+
+            async def chunk_data():
+                """Data of the streamed chunks, which must follow each other without gaps."""
+                position = first_chunk.offset + len(first_chunk.data)
+                yield first_chunk.data
+                async for chunk in request_iterator:
+                    if chunk.offset != position:
+                        raise ValueError(
+                            f"Chunk offset {chunk.offset} does not follow the previous chunk (expected {position})"
+                        )
+                    position += len(chunk.data)
+                    yield chunk.data
+
+            # Written as one stream, so the session cannot be completed until the client closes it
+            await cache_mod.write_upload_stream(upload_id, agent_id, first_chunk.offset, chunk_data())
+
+            event_response = await self._shared_cache_event(
+                "shared_cache.file.upload.complete", agent_id, secret, {"upload_id": upload_id}
+            )
+            return self._to_protobuf_response(event_response, "shared_cache.file.upload.complete")
+
+        except Exception as e:
+            logger.error(f"Error handling gRPC file upload {upload_id}: {e}")
+            # The session is kept, so the client can resume from the upload status
+            return self._to_protobuf_response(
+                EventResponse(
+                    success=False,
+                    message=str(e),
+                    data={"success": False, "error": str(e), "upload_id": upload_id},
+                ),
+                "shared_cache.file.upload.complete",
+            )
+
+    async def DownloadFile(self, request, context):
+        """Stream a shared cache file to the client in binary chunks.
+
+        Access is checked through the shared_cache.get event (authentication and
+        agent groups). The first chunk also carries filename, mime_type and
+        total_size.
+        """
+        cache_mod = self.transport._get_shared_cache_mod()
+        if cache_mod is None:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "Shared cache mod not loaded")
+
+        event_response = await self._shared_cache_event(
+            "shared_cache.get",
+            request.source_id or "anonymous",
+            request.secret or None,
+            {"cache_id": request.cache_id},
+        )
+        if not event_response or not event_response.success or not event_response.data:
+            error_message = event_response.message if event_response else "No response from event handler"
+            status = grpc.StatusCode.NOT_FOUND if "not found" in error_message.lower() else grpc.StatusCode.PERMISSION_DENIED
+            await context.abort(status, error_message)
+
+        data = event_response.data
+        file_path = cache_mod.get_file_path(request.cache_id) if data.get("is_file") else None
+        if file_path is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "File not found")
+
+        offset = max(0, request.offset)
+        header = agent_service_pb2.FileChunk(
+            cache_id=request.cache_id,
+            filename=data.get("filename") or "",
+            mime_type=data.get("mime_type") or "",
+            total_size=file_path.stat().st_size,
+            offset=offset,
+        )
+        for data_chunk in cache_mod.iter_file_chunks(request.cache_id, offset):
+            if header is not None:
+                chunk, header = header, None
+                chunk.data = data_chunk
+            else:
+                chunk = agent_service_pb2.FileChunk(cache_id=request.cache_id, offset=offset, data=data_chunk)
+            offset += len(data_chunk)
+            yield chunk
+        if header is not None:
+            # Empty file (or offset at the end): still send the metadata
+            yield header
+
+    async def _shared_cache_event(self, event_name: str, agent_id: str, secret: Optional[str], payload: Dict[str, Any]):
+        """Route a shared cache control event through the network's event handler."""
+        event = Event(
+            event_name=event_name,
+            source_id=agent_id,
+            relevant_mod="openagents.mods.core.shared_cache",
+            visibility=EventVisibility.MOD_ONLY,
+            payload=payload,
+            secret=secret,
+        )
+        return await self._handle_sent_event(event)
+
+    def _to_protobuf_response(self, event_response: Optional[EventResponse], event_name: str):
+        """Convert an EventResponse to a protobuf EventResponse with JSON-encoded data."""
+        from google.protobuf.any_pb2 import Any
+
+        response_data = None
+        if event_response and isinstance(event_response.data, dict):
+            response_data = Any()
+            response_data.type_url = "type.googleapis.com/openagents.EventResponseData"
+            response_data.value = json.dumps(event_response.data, default=str).encode("utf-8")
+
+        return agent_service_pb2.EventResponse(
+            success=event_response.success if event_response else False,
+            message=event_response.message if event_response else "No response from event handler",
+            data=response_data,
+            event_name=event_name,
+        )
+
     def _extract_payload_from_protobuf(self, protobuf_payload):
         """Extract payload from protobuf Any field with various fallback strategies."""
         payload = {}
@@ -270,6 +430,13 @@ class GRPCTransport(Transport):
         self.servicer = None
         self.host = self.config.get("host", "localhost")
         self.port = self.config.get("port", 50051)
+        self.network_instance = None  # Set by the network; used for shared cache file streaming
+
+    def _get_shared_cache_mod(self):
+        """Get the loaded shared cache mod, or None if the network does not run it."""
+        if not self.network_instance or not hasattr(self.network_instance, "mods"):
+            return None
+        return self.network_instance.mods.get("openagents.mods.core.shared_cache")
 
     async def initialize(self) -> bool:
         """Initialize gRPC transport."""
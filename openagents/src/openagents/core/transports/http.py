@@ -108,6 +108,13 @@ class HttpTransport(Transport):
         self.app.router.add_post("/api/cache/upload", self.cache_upload)
         self.app.router.add_get("/api/cache/download/{cache_id}", self.cache_download)
         self.app.router.add_get("/api/cache/info/{cache_id}", self.cache_info)
+        # Chunked binary transfer (no base64, constant memory)
+        self.app.router.add_post("/api/cache/uploads", self.cache_upload_start)
+        self.app.router.add_get("/api/cache/uploads/{upload_id}", self.cache_upload_status)
+        self.app.router.add_put("/api/cache/uploads/{upload_id}", self.cache_upload_chunk)
+        self.app.router.add_post("/api/cache/uploads/{upload_id}/complete", self.cache_upload_complete)
+        self.app.router.add_delete("/api/cache/uploads/{upload_id}", self.cache_upload_abort)
+        self.app.router.add_get("/api/cache/stream/{cache_id}", self.cache_download_stream)
         # Agent management endpoints
         self.app.router.add_get("/api/agents/service", self.get_service_agents)
         self.app.router.add_post("/api/agents/service/{agent_id}/start", self.start_service_agent)
@@ -160,14 +167,17 @@ class HttpTransport(Transport):
             response = await handler(request)
 
         # Add MCP-specific headers if serve_mcp is enabled
+        expose_headers = "Content-Range, Accept-Ranges, ETag, Content-Disposition"
         if self._serve_mcp:
-            response.headers["Access-Control-Expose-Headers"] = "Mcp-Session-Id"
+            expose_headers += ", Mcp-Session-Id"
+        response.headers["Access-Control-Expose-Headers"] = expose_headers
 
         # Add CORS headers
         response.headers["Access-Control-Allow-Origin"] = "*"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, DELETE, OPTIONS"
+        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
         response.headers["Access-Control-Allow-Headers"] = (
-            "Content-Type, Authorization, Accept, Mcp-Session-Id"
+            "Content-Type, Authorization, Accept, Mcp-Session-Id, Upload-Offset, "
+            "Range, If-Range, If-None-Match"
         )
         response.headers["Access-Control-Max-Age"] = "86400"  # 24 hours
 
@@ -1168,7 +1178,15 @@ class HttpTransport(Transport):
             )
 
     async def cache_download(self, request):
-        """Handle file download from shared cache via HTTP."""
+        """Handle file download from shared cache via HTTP.
+
+        When the shared cache mod runs in this process the file is served
+        straight from disk (see _serve_cache_file), with Range and ETag support.
+        Otherwise the download goes through the shared_cache.file.download event.
+        """
+        if self._get_shared_cache_mod() is not None:
+            return await self._serve_cache_file(request)
+
         try:
             cache_id = request.match_info.get("cache_id")
             agent_id = request.query.get("agent_id")
@@ -1292,6 +1310,291 @@ class HttpTransport(Transport):
                 {"success": False, "error": str(e)},
                 status=500,
             )
+
+    def _get_shared_cache_mod(self):
+        """Get the loaded shared cache mod, or None if the network does not run it."""
+        if not self.network_instance or not hasattr(self.network_instance, "mods"):
+            return None
+        return self.network_instance.mods.get("openagents.mods.core.shared_cache")
+
+    @staticmethod
+    def _cache_error_status(error_message: str) -> int:
+        """Map a shared cache error message to an HTTP status code."""
+        message = error_message.lower()
+        if "not found" in message:
+            return 404
+        if "permission" in message or "does not own" in message or "authentication" in message:
+            return 403
+        if "exceeds maximum" in message or "past the declared" in message:
+            return 413
+        if "in progress" in message:
+            return 409
+        return 400
+
+    async def _cache_transfer_event(self, event_name: str, agent_id: str, secret: Optional[str], payload: Dict[str, Any]):
+        """Send a chunked transfer control event to the shared cache mod and build the HTTP response."""
+        event = Event(
+            event_name=event_name,
+            source_id=agent_id,
+            relevant_mod="openagents.mods.core.shared_cache",
+            visibility=EventVisibility.MOD_ONLY,
+            payload=payload,
+            secret=secret,
+        )
+        event_response = await self.call_event_handler(event)
+
+        if event_response and event_response.success:
+            data = dict(event_response.data or {})
+            data["success"] = True
+            return web.json_response(data)
+
+        error_message = event_response.message if event_response else "No response from event handler"
+        return web.json_response(
+            {"success": False, "error": error_message},
+            status=self._cache_error_status(error_message),
+        )
+
+    async def cache_upload_start(self, request):
+        """Start a chunked upload to the shared cache.
+
+        Expects a JSON body with agent_id, secret, filename and optionally
+        mime_type, allowed_agent_groups and total_size. Returns the upload_id
+        and the preferred chunk_size.
+        """
+        try:
+            data = await request.json()
+            agent_id = data.get("agent_id")
+            if not agent_id:
+                return web.json_response(
+                    {"success": False, "error": "agent_id is required"},
+                    status=400,
+                )
+
+            logger.info(f"HTTP cache upload start: {data.get('filename')} from {agent_id}")
+
+            return await self._cache_transfer_event(
+                "shared_cache.file.upload.start",
+                agent_id,
+                data.get("secret"),
+                {
+                    "filename": data.get("filename"),
+                    "mime_type": data.get("mime_type", "application/octet-stream"),
+                    "allowed_agent_groups": data.get("allowed_agent_groups", []),
+                    "total_size": data.get("total_size"),
+                    "pinned": bool(data.get("pinned", False)),
+                },
+            )
+
+        except json.JSONDecodeError:
+            return web.json_response(
+                {"success": False, "error": "Invalid JSON body"},
+                status=400,
+            )
+        except Exception as e:
+            logger.error(f"Error in HTTP cache_upload_start: {e}")
+            return web.json_response(
+                {"success": False, "error": str(e)},
+                status=500,
+            )
+
+    async def cache_upload_status(self, request):
+        """Get the progress of a chunked upload; ``received`` is the offset to resume from."""
+        try:
+            agent_id = request.query.get("agent_id")
+            if not agent_id:
+                return web.json_response(
+                    {"success": False, "error": "agent_id is required"},
+                    status=400,
+                )
+
+            return await self._cache_transfer_event(
+                "shared_cache.file.upload.status",
+                agent_id,
+                request.query.get("secret"),
+                {"upload_id": request.match_info.get("upload_id")},
+            )
+
+        except Exception as e:
+            logger.error(f"Error in HTTP cache_upload_status: {e}")
+            return web.json_response(
+                {"success": False, "error": str(e)},
+                status=500,
+            )
+
+    async def cache_upload_chunk(self, request):
+        """Write raw request body bytes to a chunked upload.
+
+        The body is streamed to disk as it arrives, so a chunk of any size is
+        never held in memory. The byte offset comes from the ``Upload-Offset``
+        header or the ``offset`` query parameter (default 0). The upload_id is an
+        unguessable token handed out by the authenticated start request and is
+        only accepted together with the agent_id that started it.
+        """
+        try:
+            upload_id = request.match_info.get("upload_id")
+            agent_id = request.query.get("agent_id")
+            if not agent_id:
+                return web.json_response(
+                    {"success": False, "error": "agent_id is required"},
+                    status=400,
+                )
+
+            cache_mod = self._get_shared_cache_mod()
+            if cache_mod is None:
+                return web.json_response(
+                    {"success": False, "error": "Shared cache mod not loaded"},
+                    status=503,
+                )
+
+            try:
+                offset = int(request.headers.get("Upload-Offset", request.query.get("offset", 0)))
+            except ValueError:
+                return web.json_response(
+                    {"success": False, "error": "offset must be an integer"},
+                    status=400,
+                )
+
+            try:
+                received = await cache_mod.write_upload_stream(
+                    upload_id,
+                    agent_id,
+                    offset,
+                    request.content.iter_chunked(cache_mod.stream_chunk_size),
+                )
+            except (LookupError, PermissionError, ValueError, RuntimeError) as e:
+                return web.json_response(
+                    {"success": False, "error": str(e)},
+                    status=self._cache_error_status(str(e)),
+                )
+
+            return web.json_response({"success": True, "upload_id": upload_id, "received": received})
+
+        except Exception as e:
+            logger.error(f"Error in HTTP cache_upload_chunk: {e}")
+            return web.json_response(
+                {"success": False, "error": str(e)},
+                status=500,
+            )
+
+    async def cache_upload_complete(self, request):
+        """Complete a chunked upload; returns the new cache_id as /api/cache/upload does."""
+        try:
+            data = await request.json() if request.can_read_body else {}
+            agent_id = data.get("agent_id") or request.query.get("agent_id")
+            if not agent_id:
+                return web.json_response(
+                    {"success": False, "error": "agent_id is required"},
+                    status=400,
+                )
+
+            return await self._cache_transfer_event(
+                "shared_cache.file.upload.complete",
+                agent_id,
+                data.get("secret") or request.query.get("secret"),
+                {"upload_id": request.match_info.get("upload_id")},
+            )
+
+        except json.JSONDecodeError:
+            return web.json_response(
+                {"success": False, "error": "Invalid JSON body"},
+                status=400,
+            )
+        except Exception as e:
+            logger.error(f"Error in HTTP cache_upload_complete: {e}")
+            return web.json_response(
+                {"success": False, "error": str(e)},
+                status=500,
+            )
+
+    async def cache_upload_abort(self, request):
+        """Cancel a chunked upload and discard the data received so far."""
+        try:
+            agent_id = request.query.get("agent_id")
+            if not agent_id:
+                return web.json_response(
+                    {"success": False, "error": "agent_id is required"},
+                    status=400,
+                )
+
+            return await self._cache_transfer_event(
+                "shared_cache.file.upload.abort",
+                agent_id,
+                request.query.get("secret"),
+                {"upload_id": request.match_info.get("upload_id")},
+            )
+
+        except Exception as e:
+            logger.error(f"Error in HTTP cache_upload_abort: {e}")
+            return web.json_response(
+                {"success": False, "error": str(e)},
+                status=500,
+            )
+
+    async def cache_download_stream(self, request):
+        """Stream a cached file to the client (same fast path as /api/cache/download)."""
+        return await self._serve_cache_file(request)
+
+    def _validate_agent_secret(self, agent_id: Optional[str], secret: Optional[str]) -> bool:
+        """Authenticate an agent the way the network authenticates external events."""
+        network = self.network_instance
+        if getattr(getattr(network, "config", None), "disable_agent_secret_verification", False):
+            return True
+        if not agent_id or not secret or not hasattr(network, "secret_manager"):
+            return False
+        return network.secret_manager.validate_secret(agent_id, secret)
+
+    async def _serve_cache_file(self, request):
+        """Serve a shared cache file directly from disk.
+
+        The agent is authenticated with its secret and checked against the
+        entry's agent groups by the mod; the file is then sent with
+        web.FileResponse, which uses sendfile where available and handles Range,
+        If-Range, If-None-Match and If-Modified-Since. Cached files never change
+        in place, so the ETag stays valid for the lifetime of the entry.
+        """
+        try:
+            cache_id = request.match_info.get("cache_id")
+            agent_id = request.query.get("agent_id")
+            secret = request.query.get("secret")
+
+            cache_mod = self._get_shared_cache_mod()
+            if cache_mod is None:
+                return web.json_response(
+                    {"success": False, "error": "Shared cache mod not loaded"},
+                    status=503,
+                )
+
+            if not self._validate_agent_secret(agent_id, secret):
+                logger.warning(f"Authentication failed for cache download by {agent_id}")
+                return web.json_response(
+                    {"success": False, "error": "Authentication failed: Invalid or missing secret"},
+                    status=403,
+                )
+
+            try:
+                cache_entry, file_path = cache_mod.get_file_for_download(cache_id, agent_id or "anonymous")
+            except (LookupError, PermissionError) as e:
+                return web.json_response(
+                    {"success": False, "error": str(e)},
+                    status=self._cache_error_status(str(e)),
+                )
+
+            response = web.FileResponse(file_path, chunk_size=cache_mod.stream_chunk_size)
+            response.content_type = cache_entry.mime_type or "application/octet-stream"
+            safe_filename = os.path.basename(cache_entry.filename or "download")
+            response.headers["Content-Disposition"] = f'attachment; filename="{safe_filename}"'
+            # Revalidate with If-None-Match instead of trusting a cached copy blindly
+            response.headers["Cache-Control"] = "private, no-cache"
+
+            logger.debug(f"Serving cached file {cache_id} to {agent_id}")
+            return response
+
+        except Exception as e:
+            logger.error(f"Error in HTTP cache download: {e}")
+            return web.json_response(
+                {"success": False, "error": str(e)},
+                status=500,
+            )
     
     # Agent Management API handlers
     
@@ -0,0 +1,150 @@
+"""
+Append-only persistence for shared cache metadata.
+
+Cache entries are stored as a JSON snapshot (``cache_data.json``) plus a journal
+(``cache_journal.jsonl``) with one line per change since the snapshot was written.
+A change costs one appended line instead of a rewrite of every entry; once the
+journal is longer than the number of live entries it is compacted into a new
+snapshot, which keeps startup replay and disk use proportional to the live set.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Compact only once the journal has at least this many records
+DEFAULT_COMPACT_MIN_RECORDS = 1000
+
+
+class CacheJournal:
+    """Snapshot + append-only journal of cache entry dictionaries.
+
+    Compaction writes the snapshot to a temporary file, renames it into place
+    and then truncates the journal. Replaying a journal over a newer snapshot
+    only re-applies the same puts and deletes, so a crash at any point leaves a
+    loadable state. A torn last line (crash mid-append) is cut off on load.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        compact_min_records: int = DEFAULT_COMPACT_MIN_RECORDS,
+        compact_ratio: float = 1.0,
+        fsync: bool = False,
+    ):
+        """Initialize the journal.
+
+        Args:
+            storage_path: Directory holding the snapshot and journal files
+            compact_min_records: Minimum journal length before compaction
+            compact_ratio: Compact when journal records exceed this many per live entry
+            fsync: Whether to fsync after every appended record
+        """
+        self.snapshot_path = Path(storage_path) / "cache_data.json"
+        self.journal_path = Path(storage_path) / "cache_journal.jsonl"
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+        self.records = 0  # Journal records since the last compaction
+        self._file = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Load the snapshot and replay the journal over it.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Entry dictionaries by cache_id
+        """
+        entries: Dict[str, Dict[str, Any]] = {}
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r") as f:
+                entries = json.load(f)
+
+        self.records = 0
+        if self.journal_path.exists():
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+            # Only newline-terminated records are complete; anything after the last
+            # newline is a torn append and is cut off below.
+            complete = data.rfind(b"\n") + 1
+            for line_number, line in enumerate(data[:complete].splitlines(), 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f"Ignoring unreadable cache journal record at line {line_number}"
+                    )
+                    continue
+                if record.get("op") == "put":
+                    entry = record["entry"]
+                    entries[entry["cache_id"]] = entry
+                elif record.get("op") == "delete":
+                    entries.pop(record["cache_id"], None)
+                self.records += 1
+
+            if complete < len(data):
+                logger.warning(
+                    f"Dropping torn cache journal record ({len(data) - complete} bytes)"
+                )
+                # Later appends must start on a fresh line, or they would be glued to it.
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(complete)
+
+        return entries
+
+    def _append(self, record: Dict[str, Any]):
+        if self._file is None:
+            self._file = open(self.journal_path, "a")
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.records += 1
+
+    def append_put(self, entry: Dict[str, Any]):
+        """Record that an entry was created or changed."""
+        self._append({"op": "put", "entry": entry})
+
+    def append_delete(self, cache_id: str):
+        """Record that an entry was deleted."""
+        self._append({"op": "delete", "cache_id": cache_id})
+
+    def needs_compaction(self, entry_count: int) -> bool:
+        """Whether the journal has grown enough to be folded into the snapshot."""
+        return self.records >= max(self.compact_min_records, self.compact_ratio * entry_count)
+
+    def compact(self, entries: Dict[str, Dict[str, Any]]):
+        """Write all entries as the new snapshot and start an empty journal.
+
+        Args:
+            entries: Entry dictionaries by cache_id
+        """
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f, separators=(",", ":"))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        self.close()
+        open(self.journal_path, "w").close()
+        self.records = 0
+
+    def close(self):
+        """Close the journal file handle."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        """Journal size information."""
+        return {
+            "journal_records": self.records,
+            "journal_bytes": self.journal_path.stat().st_size if self.journal_path.exists() else 0,
+        }
@@ -5,24 +5,69 @@ This mod provides a shared caching system with agent group-based access control.
 Supports both string values and binary file storage.
 """
 
+import asyncio
 import logging
-import json
 import uuid
 import time
 import base64
+import hashlib
 import os
-from typing import Dict, Any, List, Optional, Set
+import secrets
+from contextlib import contextmanager
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
 
 from openagents.core.base_mod import BaseMod, mod_event_handler
 from openagents.models.event import Event
 from openagents.models.event_response import EventResponse
+from .journal import CacheJournal, DEFAULT_COMPACT_MIN_RECORDS
 
 logger = logging.getLogger(__name__)
 
 # Maximum file size (50 MB)
 MAX_FILE_SIZE = 50 * 1024 * 1024
 
+# Maximum file size for chunked uploads (2 GB); only one chunk is held in memory at a time
+MAX_STREAM_FILE_SIZE = 2 * 1024 * 1024 * 1024
+
+# Chunk size for streamed uploads and downloads (1 MB)
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Unfinished upload sessions idle for longer than this are discarded (1 hour)
+UPLOAD_SESSION_TTL = 3600
+
+# Seconds between eviction sweeps
+DEFAULT_SWEEP_INTERVAL = 60
+
+
+class FileTooLargeError(ValueError):
+    """Raised when a chunked upload would exceed the maximum file size."""
+
+
+class UploadInProgressError(RuntimeError):
+    """Raised when an upload session is completed, aborted or written while a write is running."""
+
+
+def _sha256_bytes(data: bytes) -> str:
+    """sha256 hex digest of in-memory data."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_at(path: Path, offset: int, data: bytes):
+    """Write bytes into an existing file at the given offset."""
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def _sha256_file(path: Path, chunk_size: int) -> str:
+    """sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 class CacheEntry:
     """Represents a single cache entry (string value or file reference)."""
@@ -39,6 +84,9 @@ class CacheEntry:
         is_file: bool = False,
         filename: Optional[str] = None,
         file_size: Optional[int] = None,
+        pinned: bool = False,
+        last_accessed_at: Optional[int] = None,
+        content_hash: Optional[str] = None,
     ):
         self.cache_id = cache_id
         self.value = value  # For files, this is the relative path to the file
@@ -50,6 +98,16 @@ class CacheEntry:
         self.is_file = is_file
         self.filename = filename  # Original filename for file entries
         self.file_size = file_size  # File size in bytes
+        self.pinned = pinned  # Pinned entries are never evicted
+        self.last_accessed_at = last_accessed_at or updated_at  # For LRU eviction
+        self.content_hash = content_hash  # sha256 of the file body (content-addressed blob)
+
+    @property
+    def size(self) -> int:
+        """Bytes counted against the cache size limit."""
+        if self.is_file:
+            return self.file_size or 0
+        return len(self.value)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert cache entry to dictionary."""
@@ -61,11 +119,15 @@ class CacheEntry:
             "created_by": self.created_by,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
+            "last_accessed_at": self.last_accessed_at,
             "is_file": self.is_file,
+            "pinned": self.pinned,
         }
         if self.is_file:
             data["filename"] = self.filename
             data["file_size"] = self.file_size
+            if self.content_hash:
+                data["content_hash"] = self.content_hash
         return data
 
     @classmethod
@@ -82,9 +144,60 @@ class CacheEntry:
             is_file=data.get("is_file", False),
             filename=data.get("filename"),
             file_size=data.get("file_size"),
+            pinned=data.get("pinned", False),
+            last_accessed_at=data.get("last_accessed_at"),
+            content_hash=data.get("content_hash"),
         )
 
 
+class UploadSession:
+    """An in-progress chunked upload.
+
+    Chunks are written at their offset into a ``.part`` file. Writes must not
+    leave a gap, so ``received`` is always the length of the contiguous data
+    and is the offset to resume from after an interrupted transfer.
+    """
+
+    def __init__(
+        self,
+        upload_id: str,
+        created_by: str,
+        filename: str,
+        mime_type: str,
+        allowed_agent_groups: List[str],
+        part_path: Path,
+        total_size: Optional[int] = None,
+        pinned: bool = False,
+    ):
+        self.upload_id = upload_id
+        self.created_by = created_by
+        self.filename = filename
+        self.mime_type = mime_type
+        self.allowed_agent_groups = allowed_agent_groups or []
+        self.part_path = part_path
+        self.total_size = total_size  # Declared size, checked on completion if given
+        self.pinned = pinned
+        self.received = 0
+        self.writing = False  # Set while a chunk or stream is being written
+        self.created_at = int(time.time())
+        self.updated_at = self.created_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert upload session to dictionary."""
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "mime_type": self.mime_type,
+            "allowed_agent_groups": self.allowed_agent_groups,
+            "total_size": self.total_size,
+            "pinned": self.pinned,
+            "received": self.received,
+            "created_by": self.created_by,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
 class SharedCacheMod(BaseMod):
     """Network-level shared cache mod implementation.
 
@@ -100,6 +213,29 @@ class SharedCacheMod(BaseMod):
         self.cache_entries: Dict[str, CacheEntry] = {}
         self.storage_path: Optional[Path] = None
         self.files_path: Optional[Path] = None
+        self._journal: Optional[CacheJournal] = None
+
+        # Chunked uploads in progress
+        self.upload_sessions: Dict[str, UploadSession] = {}
+        self.uploads_path: Optional[Path] = None
+
+        # Content-addressed file bodies: references from cache entries per sha256
+        self.blobs_path: Optional[Path] = None
+        self._blob_refs: Dict[str, int] = {}
+        self._dedup_stats: Dict[str, int] = {"dedup_hits": 0, "dedup_bytes_saved": 0}
+
+        # Eviction
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self._notification_tasks: Set[asyncio.Task] = set()  # Pending eviction notifications
+        self._eviction_stats: Dict[str, Any] = {
+            "sweeps": 0,
+            "evicted_expired": 0,
+            "evicted_max_entries": 0,
+            "evicted_max_bytes": 0,
+            "evicted_bytes": 0,
+            "last_sweep_at": None,
+            "last_sweep_seconds": 0.0,
+        }
 
         logger.info("Initializing Shared Cache mod")
 
@@ -110,6 +246,9 @@ class SharedCacheMod(BaseMod):
         # Set up cache storage
         self._setup_cache_storage()
 
+        # Start the eviction sweeper
+        self._start_sweeper()
+
     def _setup_cache_storage(self):
         """Set up cache storage using workspace."""
         # Use storage path (workspace or fallback)
@@ -121,22 +260,42 @@ class SharedCacheMod(BaseMod):
         self.files_path = self.storage_path / "files"
         self.files_path.mkdir(exist_ok=True)
 
+        # Partial files of chunked uploads; sessions live in memory, so leftovers
+        # from a previous run can never be completed
+        self.uploads_path = self.storage_path / "uploads"
+        self.uploads_path.mkdir(exist_ok=True)
+        for pattern in ("*.part", "*.tmp"):
+            for stale_part in self.uploads_path.glob(pattern):
+                stale_part.unlink(missing_ok=True)
+
         logger.info(f"Using cache storage at {self.storage_path}")
         logger.info(f"Using files storage at {self.files_path}")
 
+        # Content-addressed file bodies, sharded by the first two hex digits of the sha256
+        self.blobs_path = self.files_path / "blobs"
+        self.blobs_path.mkdir(exist_ok=True)
+
         self._load_cache_entries()
+        self._rebuild_blob_refs()
 
     def _load_cache_entries(self):
-        """Load cache entries from storage."""
+        """Load cache entries from the snapshot and journal in storage."""
+        self._journal = CacheJournal(
+            self.storage_path,
+            compact_min_records=int(
+                self.config.get("journal_compact_min_records", DEFAULT_COMPACT_MIN_RECORDS)
+            ),
+            fsync=bool(self.config.get("journal_fsync", False)),
+        )
         try:
-            cache_file = self.storage_path / "cache_data.json"
-
-            if cache_file.exists():
-                with open(cache_file, "r") as f:
-                    data = json.load(f)
-                    for cache_id, entry_data in data.items():
-                        self.cache_entries[cache_id] = CacheEntry.from_dict(entry_data)
-                logger.info(f"Loaded {len(self.cache_entries)} cache entries from storage")
+            data = self._journal.load()
+            for cache_id, entry_data in data.items():
+                self.cache_entries[cache_id] = CacheEntry.from_dict(entry_data)
+            if data:
+                logger.info(
+                    f"Loaded {len(self.cache_entries)} cache entries from storage "
+                    f"({self._journal.records} journal records replayed)"
+                )
             else:
                 logger.debug("No existing cache data found in storage")
         except Exception as e:
@@ -144,21 +303,43 @@ class SharedCacheMod(BaseMod):
             self.cache_entries = {}
 
     def _save_cache_entries(self):
-        """Save cache entries to storage."""
+        """Save all cache entries as a new snapshot and reset the journal."""
+        if self._journal is None:
+            return
         try:
-            cache_file = self.storage_path / "cache_data.json"
-
-            data = {
-                cache_id: entry.to_dict()
-                for cache_id, entry in self.cache_entries.items()
-            }
-
-            with open(cache_file, "w") as f:
-                json.dump(data, f, indent=2)
+            self._journal.compact(
+                {cache_id: entry.to_dict() for cache_id, entry in self.cache_entries.items()}
+            )
             logger.info(f"Saved {len(self.cache_entries)} cache entries to storage")
         except Exception as e:
             logger.error(f"Failed to save cache entries: {e}")
 
+    def _persist_entry(self, cache_entry: CacheEntry):
+        """Append a created or changed entry to the journal."""
+        self._start_sweeper()
+        if self._journal is None:
+            return
+        try:
+            self._journal.append_put(cache_entry.to_dict())
+        except Exception as e:
+            logger.error(f"Failed to persist cache entry {cache_entry.cache_id}: {e}")
+        self._maybe_compact()
+
+    def _persist_delete(self, cache_id: str):
+        """Append an entry deletion to the journal."""
+        if self._journal is None:
+            return
+        try:
+            self._journal.append_delete(cache_id)
+        except Exception as e:
+            logger.error(f"Failed to persist deletion of cache entry {cache_id}: {e}")
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Fold the journal into a new snapshot once it outgrows the live entries."""
+        if self._journal.needs_compaction(len(self.cache_entries)):
+            self._save_cache_entries()
+
     def initialize(self) -> bool:
         """Initialize the mod.
 
@@ -173,8 +354,20 @@ class SharedCacheMod(BaseMod):
         Returns:
             bool: True if shutdown was successful, False otherwise
         """
+        # Stop the eviction sweeper
+        if self._sweeper_task and not self._sweeper_task.done():
+            self._sweeper_task.cancel()
+        self._sweeper_task = None
+
         # Save cache entries to storage
         self._save_cache_entries()
+        if self._journal is not None:
+            self._journal.close()
+
+        # Drop unfinished chunked uploads
+        for session in list(self.upload_sessions.values()):
+            session.part_path.unlink(missing_ok=True)
+        self.upload_sessions.clear()
 
         # Clear all state
         self.cache_entries.clear()
@@ -203,7 +396,11 @@ class SharedCacheMod(BaseMod):
         return False
 
     async def _send_notification(
-        self, event_name: str, cache_entry: CacheEntry, exclude_agent: Optional[str] = None
+        self,
+        event_name: str,
+        cache_entry: CacheEntry,
+        exclude_agent: Optional[str] = None,
+        reason: Optional[str] = None,
     ):
         """Send notification to agents with access to the cache entry.
 
@@ -211,6 +408,7 @@ class SharedCacheMod(BaseMod):
             event_name: Name of the notification event
             cache_entry: The cache entry that was modified
             exclude_agent: Optional agent ID to exclude from notifications
+            reason: Optional reason added to the payload (e.g. the eviction reason)
         """
         # Determine which agents should be notified
         notify_agents = set()
@@ -228,18 +426,22 @@ class SharedCacheMod(BaseMod):
         if exclude_agent:
             notify_agents.discard(exclude_agent)
 
+        payload = {
+            "cache_id": cache_entry.cache_id,
+            "mime_type": cache_entry.mime_type,
+            "created_by": cache_entry.created_by,
+            "allowed_agent_groups": cache_entry.allowed_agent_groups,
+        }
+        if reason:
+            payload["reason"] = reason
+
         # Send notifications
         for agent_id in notify_agents:
             notification = Event(
                 event_name=event_name,
                 source_id=self.network.network_id,
                 destination_id=agent_id,
-                payload={
-                    "cache_id": cache_entry.cache_id,
-                    "mime_type": cache_entry.mime_type,
-                    "created_by": cache_entry.created_by,
-                    "allowed_agent_groups": cache_entry.allowed_agent_groups,
-                },
+                payload=dict(payload),
             )
             try:
                 await self.network.process_event(notification)
@@ -285,10 +487,11 @@ class SharedCacheMod(BaseMod):
                     created_by=event.source_id,
                     created_at=current_time,
                     updated_at=current_time,
+                    pinned=bool(payload.get("pinned", False)),
                 )
 
                 self.cache_entries[cache_id] = cache_entry
-                self._save_cache_entries()
+                self._persist_entry(cache_entry)
 
                 logger.info(
                     f"Created cache entry {cache_id} by {event.source_id} "
@@ -349,6 +552,7 @@ class SharedCacheMod(BaseMod):
                     }
                 else:
                     logger.debug(f"Retrieved cache entry {cache_id} for {event.source_id}")
+                    self._touch(cache_entry)
                     response_data = cache_entry.to_dict()
                     response_data["success"] = True
 
@@ -409,7 +613,7 @@ class SharedCacheMod(BaseMod):
                     cache_entry.value = value
                     cache_entry.updated_at = int(time.time())
 
-                    self._save_cache_entries()
+                    self._persist_entry(cache_entry)
 
                     logger.info(f"Updated cache entry {cache_id} by {event.source_id}")
 
@@ -467,9 +671,8 @@ class SharedCacheMod(BaseMod):
                         "error": "Agent does not have permission to delete this cache entry",
                     }
                 else:
-                    # Delete cache entry
-                    del self.cache_entries[cache_id]
-                    self._save_cache_entries()
+                    # Delete cache entry and its file
+                    self._remove_entry(cache_id)
 
                     logger.info(f"Deleted cache entry {cache_id} by {event.source_id}")
 
@@ -494,6 +697,92 @@ class SharedCacheMod(BaseMod):
                 data={"error": str(e)},
             )
 
+    async def _add_file_entry(
+        self,
+        cache_id: str,
+        file_path: Path,
+        filename: str,
+        mime_type: str,
+        allowed_agent_groups: List[str],
+        created_by: str,
+        pinned: bool = False,
+        content_hash: Optional[str] = None,
+    ) -> CacheEntry:
+        """Register a file already written to storage as a cache entry and notify agents.
+
+        Args:
+            cache_id: ID for the new cache entry
+            file_path: Location of the stored file
+            filename: Sanitized original filename
+            mime_type: MIME type of the file
+            allowed_agent_groups: Agent groups that can access the file (empty = all)
+            created_by: ID of the uploading agent
+            pinned: Whether the entry is exempt from eviction
+            content_hash: sha256 of the file if it is stored as a blob
+
+        Returns:
+            CacheEntry: The new cache entry
+        """
+        file_size = file_path.stat().st_size
+        current_time = int(time.time())
+        cache_entry = CacheEntry(
+            cache_id=cache_id,
+            value=str(file_path.relative_to(self.storage_path)),  # Store relative path
+            mime_type=mime_type,
+            allowed_agent_groups=allowed_agent_groups,
+            created_by=created_by,
+            created_at=current_time,
+            updated_at=current_time,
+            is_file=True,
+            filename=filename,
+            file_size=file_size,
+            pinned=pinned,
+            content_hash=content_hash,
+        )
+
+        if content_hash:
+            references = self._blob_refs.get(content_hash, 0)
+            if references:
+                self._dedup_stats["dedup_hits"] += 1
+                self._dedup_stats["dedup_bytes_saved"] += file_size
+            self._blob_refs[content_hash] = references + 1
+
+        self.cache_entries[cache_id] = cache_entry
+        self._persist_entry(cache_entry)
+
+        logger.info(
+            f"Uploaded file {filename} ({file_size} bytes) as cache {cache_id} "
+            f"by {created_by} (groups: {allowed_agent_groups})"
+        )
+
+        # Send notification
+        await self._send_notification(
+            "shared_cache.notification.created", cache_entry, exclude_agent=created_by
+        )
+
+        return cache_entry
+
+    @staticmethod
+    def _file_upload_result(cache_entry: CacheEntry) -> Dict[str, Any]:
+        """Build the response data returned for a completed file upload."""
+        return {
+            "success": True,
+            "cache_id": cache_entry.cache_id,
+            "filename": cache_entry.filename,
+            "file_size": cache_entry.file_size,
+            "mime_type": cache_entry.mime_type,
+            "content_hash": cache_entry.content_hash,
+        }
+
+    @staticmethod
+    def _error_response(error: str) -> EventResponse:
+        """Build a failed EventResponse in the shape used by all handlers."""
+        return EventResponse(
+            success=False,
+            message=error,
+            data={"success": False, "error": error},
+        )
+
     @mod_event_handler("shared_cache.file.upload")
     async def _handle_file_upload(self, event: Event) -> Optional[EventResponse]:
         """Handle file upload request.
@@ -547,54 +836,31 @@ class SharedCacheMod(BaseMod):
                     data={"success": False, "error": f"File size exceeds maximum allowed ({MAX_FILE_SIZE} bytes)"},
                 )
 
-            # Generate cache ID and file path
+            # Generate cache ID
             cache_id = str(uuid.uuid4())
             # Sanitize filename to prevent path traversal
             safe_filename = os.path.basename(filename)
-            file_path = self.files_path / f"{cache_id}_{safe_filename}"
-
-            # Write file to storage
-            with open(file_path, "wb") as f:
-                f.write(file_bytes)
-
-            # Create cache entry
-            current_time = int(time.time())
-            cache_entry = CacheEntry(
-                cache_id=cache_id,
-                value=str(file_path.relative_to(self.storage_path)),  # Store relative path
-                mime_type=mime_type,
-                allowed_agent_groups=allowed_agent_groups,
-                created_by=event.source_id,
-                created_at=current_time,
-                updated_at=current_time,
-                is_file=True,
-                filename=safe_filename,
-                file_size=file_size,
-            )
-
-            self.cache_entries[cache_id] = cache_entry
-            self._save_cache_entries()
 
-            logger.info(
-                f"Uploaded file {safe_filename} ({file_size} bytes) as cache {cache_id} "
-                f"by {event.source_id} (groups: {allowed_agent_groups})"
-            )
-
-            # Send notification
-            await self._send_notification(
-                "shared_cache.notification.created", cache_entry, exclude_agent=event.source_id
+            # Store the body by content hash; known content is not written again.
+            # Hashing and writing run in a worker thread to keep the event loop responsive.
+            loop = asyncio.get_running_loop()
+            content_hash = await loop.run_in_executor(None, _sha256_bytes, file_bytes)
+            file_path = self._blob_path(content_hash)
+            if not file_path.exists():
+                tmp_path = self.uploads_path / f"{cache_id}.tmp"
+                await loop.run_in_executor(None, tmp_path.write_bytes, file_bytes)
+                self._store_blob(tmp_path, content_hash)
+
+            cache_entry = await self._add_file_entry(
+                cache_id, file_path, safe_filename, mime_type, allowed_agent_groups, event.source_id,
+                pinned=bool(payload.get("pinned", False)),
+                content_hash=content_hash,
             )
 
             return EventResponse(
                 success=True,
                 message="File uploaded successfully",
-                data={
-                    "success": True,
-                    "cache_id": cache_id,
-                    "filename": safe_filename,
-                    "file_size": file_size,
-                    "mime_type": mime_type,
-                },
+                data=self._file_upload_result(cache_entry),
             )
 
         except Exception as e:
@@ -656,6 +922,8 @@ class SharedCacheMod(BaseMod):
                     data={"success": False, "error": "Agent does not have permission to access this file"},
                 )
 
+            self._touch(cache_entry)
+
             # Read file
             file_path = self.storage_path / cache_entry.value
             if not file_path.exists():
@@ -695,6 +963,762 @@ class SharedCacheMod(BaseMod):
                 data={"success": False, "error": str(e)},
             )
 
+    @property
+    def stream_chunk_size(self) -> int:
+        """Chunk size for streamed transfers (config: ``stream_chunk_size``)."""
+        return int(self.config.get("stream_chunk_size", STREAM_CHUNK_SIZE))
+
+    @property
+    def max_stream_file_size(self) -> int:
+        """Size limit for chunked uploads (config: ``max_stream_file_size``)."""
+        return int(self.config.get("max_stream_file_size", MAX_STREAM_FILE_SIZE))
+
+    def _expire_upload_sessions(self):
+        """Discard upload sessions that have been idle for longer than the session TTL."""
+        cutoff = time.time() - float(self.config.get("upload_session_ttl", UPLOAD_SESSION_TTL))
+        for upload_id, session in list(self.upload_sessions.items()):
+            if session.updated_at < cutoff and not session.writing:
+                session.part_path.unlink(missing_ok=True)
+                del self.upload_sessions[upload_id]
+                logger.info(f"Discarded idle upload session {upload_id}")
+
+    def _get_upload_session(self, upload_id: str, agent_id: str) -> UploadSession:
+        """Look up an upload session owned by an agent.
+
+        Raises:
+            LookupError: If the session does not exist
+            PermissionError: If the session was started by another agent
+        """
+        session = self.upload_sessions.get(upload_id) if upload_id else None
+        if session is None:
+            raise LookupError("Upload session not found")
+        if session.created_by != agent_id:
+            raise PermissionError("Agent does not own this upload session")
+        return session
+
+    @contextmanager
+    def _writing(self, session: UploadSession):
+        """Mark a session as being written, so it cannot be completed or aborted meanwhile.
+
+        Raises:
+            UploadInProgressError: If another write to the session is in progress
+        """
+        if session.writing:
+            raise UploadInProgressError("Upload in progress: another write to this session is running")
+        session.writing = True
+        try:
+            yield
+        finally:
+            session.writing = False
+
+    def _check_not_writing(self, session: UploadSession):
+        """Raise UploadInProgressError if a write to the session has not finished."""
+        if session.writing:
+            raise UploadInProgressError("Upload in progress: wait for the current write to finish")
+
+    def _check_chunk(self, session: UploadSession, offset: int, length: int):
+        """Validate that a chunk continues the upload without a gap and within limits."""
+        if offset < 0 or offset > session.received:
+            raise ValueError(
+                f"Chunk offset {offset} is invalid; upload has {session.received} bytes"
+            )
+        end = offset + length
+        if end > self.max_stream_file_size:
+            raise FileTooLargeError(
+                f"File size exceeds maximum allowed ({self.max_stream_file_size} bytes)"
+            )
+        if session.total_size is not None and end > session.total_size:
+            raise FileTooLargeError(
+                f"Chunk ends at {end}, past the declared total_size ({session.total_size} bytes)"
+            )
+
+    @staticmethod
+    def _advance(session: UploadSession, end: int):
+        """Record that the upload now holds contiguous data up to ``end``."""
+        if end > session.received:
+            session.received = end
+        session.updated_at = int(time.time())
+
+    def begin_upload(
+        self,
+        agent_id: str,
+        filename: str,
+        mime_type: str = "application/octet-stream",
+        allowed_agent_groups: Optional[List[str]] = None,
+        total_size: Optional[int] = None,
+        pinned: bool = False,
+    ) -> UploadSession:
+        """Start a chunked upload.
+
+        The returned ``upload_id`` is unguessable and bound to ``agent_id``; chunks
+        for it are accepted only from that agent.
+
+        Args:
+            agent_id: ID of the uploading agent
+            filename: Original filename
+            mime_type: MIME type of the file
+            allowed_agent_groups: Agent groups that can access the file (empty = all)
+            total_size: Expected file size, if known
+            pinned: Whether the finished entry is exempt from eviction
+
+        Returns:
+            UploadSession: The new upload session
+
+        Raises:
+            ValueError: If the filename or size is invalid
+            FileTooLargeError: If total_size exceeds the chunked upload limit
+        """
+        safe_filename = os.path.basename(filename or "")
+        if not safe_filename:
+            raise ValueError("filename is required")
+        if total_size is not None:
+            total_size = int(total_size)
+            if total_size < 0:
+                raise ValueError("total_size must not be negative")
+            if total_size > self.max_stream_file_size:
+                raise FileTooLargeError(
+                    f"File size exceeds maximum allowed ({self.max_stream_file_size} bytes)"
+                )
+
+        self._expire_upload_sessions()
+
+        upload_id = secrets.token_urlsafe(24)
+        part_path = self.uploads_path / f"{upload_id}.part"
+        part_path.touch()
+        session = UploadSession(
+            upload_id=upload_id,
+            created_by=agent_id,
+            filename=safe_filename,
+            mime_type=mime_type or "application/octet-stream",
+            allowed_agent_groups=allowed_agent_groups or [],
+            part_path=part_path,
+            total_size=total_size,
+            pinned=pinned,
+        )
+        self.upload_sessions[upload_id] = session
+
+        logger.info(f"Started upload {upload_id} of {safe_filename} by {agent_id}")
+        return session
+
+    async def write_upload_chunk(self, upload_id: str, agent_id: str, offset: int, data: bytes) -> int:
+        """Write one chunk of a chunked upload at its offset.
+
+        A chunk may overlap data already received (a retried chunk) but may not
+        start past the end of it.
+
+        Args:
+            upload_id: ID of the upload session
+            agent_id: ID of the uploading agent
+            offset: Byte offset of the chunk in the file
+            data: Chunk bytes
+
+        Returns:
+            int: Number of contiguous bytes received so far
+        """
+        session = self._get_upload_session(upload_id, agent_id)
+        offset = int(offset)
+        self._check_chunk(session, offset, len(data))
+        with self._writing(session):
+            await asyncio.get_running_loop().run_in_executor(
+                None, _write_at, session.part_path, offset, data
+            )
+        self._advance(session, offset + len(data))
+        return session.received
+
+    async def write_upload_stream(
+        self,
+        upload_id: str,
+        agent_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+    ) -> int:
+        """Write a stream of chunks to a chunked upload, starting at ``offset``.
+
+        Used by transports that receive the file body as a stream, so only one
+        chunk is in memory at a time. Progress is recorded per chunk, so an
+        interrupted stream can be resumed from the returned ``received`` offset.
+        Until the stream ends the session cannot be completed or aborted.
+
+        Args:
+            upload_id: ID of the upload session
+            agent_id: ID of the uploading agent
+            offset: Byte offset of the first chunk in the file
+            chunks: Async iterator of chunk bytes
+
+        Returns:
+            int: Number of contiguous bytes received so far
+        """
+        session = self._get_upload_session(upload_id, agent_id)
+        position = int(offset)
+        self._check_chunk(session, position, 0)
+        # File I/O runs in a worker thread so a slow disk does not stall the loop
+        loop = asyncio.get_running_loop()
+        with self._writing(session):
+            f = await loop.run_in_executor(None, open, session.part_path, "r+b")
+            try:
+                await loop.run_in_executor(None, f.seek, position)
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    self._check_chunk(session, position, len(chunk))
+                    await loop.run_in_executor(None, f.write, chunk)
+                    position += len(chunk)
+                    self._advance(session, position)
+            finally:
+                await loop.run_in_executor(None, f.close)
+        return session.received
+
+    async def finish_upload(self, upload_id: str, agent_id: str) -> CacheEntry:
+        """Complete a chunked upload and register it as a file cache entry.
+
+        Args:
+            upload_id: ID of the upload session
+            agent_id: ID of the uploading agent
+
+        Returns:
+            CacheEntry: The new file cache entry
+
+        Raises:
+            ValueError: If fewer bytes than the declared total_size were received
+            UploadInProgressError: If a chunk or stream is still being written
+        """
+        session = self._get_upload_session(upload_id, agent_id)
+        self._check_not_writing(session)
+        if session.total_size is not None and session.received != session.total_size:
+            raise ValueError(
+                f"Upload incomplete: received {session.received} of {session.total_size} bytes"
+            )
+        del self.upload_sessions[upload_id]
+
+        # Hash the received file in a worker thread (it can be gigabytes), then keep
+        # it as a blob unless the content is known
+        # The session is gone, so nothing else would remove the part file on failure
+        try:
+            content_hash = await asyncio.get_running_loop().run_in_executor(
+                None, _sha256_file, session.part_path, self.stream_chunk_size
+            )
+            file_path = self._store_blob(session.part_path, content_hash)
+        except BaseException:
+            session.part_path.unlink(missing_ok=True)
+            raise
+
+        return await self._add_file_entry(
+            str(uuid.uuid4()), file_path, session.filename, session.mime_type,
+            session.allowed_agent_groups, agent_id, pinned=session.pinned,
+            content_hash=content_hash,
+        )
+
+    def abort_upload(self, upload_id: str, agent_id: str):
+        """Cancel a chunked upload and delete its partial file."""
+        session = self._get_upload_session(upload_id, agent_id)
+        self._check_not_writing(session)
+        del self.upload_sessions[upload_id]
+        session.part_path.unlink(missing_ok=True)
+        logger.info(f"Aborted upload {upload_id} by {agent_id}")
+
+    def iter_file_chunks(
+        self, cache_id: str, offset: int = 0, chunk_size: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Read a cached file in chunks, starting at ``offset``.
+
+        Access control is the caller's responsibility.
+
+        Args:
+            cache_id: ID of the file cache entry
+            offset: Byte offset to start reading at
+            chunk_size: Bytes per chunk (default: stream_chunk_size)
+
+        Yields:
+            bytes: Consecutive chunks of the file
+        """
+        file_path = self.get_file_path(cache_id)
+        if file_path is None:
+            raise LookupError("File not found")
+        chunk_size = chunk_size or self.stream_chunk_size
+        with open(file_path, "rb") as f:
+            f.seek(max(0, int(offset)))
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    @mod_event_handler("shared_cache.file.upload.start")
+    async def _handle_upload_start(self, event: Event) -> Optional[EventResponse]:
+        """Handle the start of a chunked file upload.
+
+        Args:
+            event: The upload start event with filename, mime_type,
+                allowed_agent_groups and optional total_size
+
+        Returns:
+            EventResponse: Response with upload_id and chunk_size if successful
+        """
+        try:
+            payload = event.payload or {}
+            session = self.begin_upload(
+                event.source_id,
+                payload.get("filename"),
+                mime_type=payload.get("mime_type", "application/octet-stream"),
+                allowed_agent_groups=payload.get("allowed_agent_groups", []),
+                total_size=payload.get("total_size"),
+                pinned=bool(payload.get("pinned", False)),
+            )
+            data = session.to_dict()
+            data.update(
+                {
+                    "success": True,
+                    "chunk_size": self.stream_chunk_size,
+                    "max_file_size": self.max_stream_file_size,
+                }
+            )
+            return EventResponse(success=True, message="Upload started", data=data)
+
+        except Exception as e:
+            logger.error(f"Error starting upload: {e}")
+            return self._error_response(str(e))
+
+    @mod_event_handler("shared_cache.file.upload.chunk")
+    async def _handle_upload_chunk(self, event: Event) -> Optional[EventResponse]:
+        """Handle one base64-encoded chunk of a chunked upload.
+
+        Transports with a binary path (HTTP, gRPC) write chunks directly; this
+        handler serves event-only clients and keeps each event small.
+
+        Args:
+            event: The chunk event with upload_id, offset and base64 data
+
+        Returns:
+            EventResponse: Response with the number of bytes received so far
+        """
+        try:
+            payload = event.payload or {}
+            upload_id = payload.get("upload_id")
+            try:
+                data = base64.b64decode(payload.get("data") or "", validate=True)
+            except Exception:
+                return self._error_response("Invalid base64 chunk data")
+
+            received = await self.write_upload_chunk(
+                upload_id, event.source_id, payload.get("offset", 0), data
+            )
+            return EventResponse(
+                success=True,
+                message="Chunk received",
+                data={"success": True, "upload_id": upload_id, "received": received},
+            )
+
+        except Exception as e:
+            logger.error(f"Error writing upload chunk: {e}")
+            return self._error_response(str(e))
+
+    @mod_event_handler("shared_cache.file.upload.status")
+    async def _handle_upload_status(self, event: Event) -> Optional[EventResponse]:
+        """Handle an upload status request, used to resume an interrupted upload.
+
+        Args:
+            event: The status event with upload_id
+
+        Returns:
+            EventResponse: Response with the session, including ``received``
+        """
+        try:
+            payload = event.payload or {}
+            session = self._get_upload_session(payload.get("upload_id"), event.source_id)
+            data = session.to_dict()
+            data["success"] = True
+            return EventResponse(success=True, message="Upload status", data=data)
+
+        except Exception as e:
+            logger.error(f"Error getting upload status: {e}")
+            return self._error_response(str(e))
+
+    @mod_event_handler("shared_cache.file.upload.complete")
+    async def _handle_upload_complete(self, event: Event) -> Optional[EventResponse]:
+        """Handle completion of a chunked upload.
+
+        Args:
+            event: The complete event with upload_id
+
+        Returns:
+            EventResponse: Response with cache_id, as for shared_cache.file.upload
+        """
+        try:
+            payload = event.payload or {}
+            cache_entry = await self.finish_upload(payload.get("upload_id"), event.source_id)
+            return EventResponse(
+                success=True,
+                message="File uploaded successfully",
+                data=self._file_upload_result(cache_entry),
+            )
+
+        except Exception as e:
+            logger.error(f"Error completing upload: {e}")
+            return self._error_response(str(e))
+
+    @mod_event_handler("shared_cache.file.upload.abort")
+    async def _handle_upload_abort(self, event: Event) -> Optional[EventResponse]:
+        """Handle cancellation of a chunked upload.
+
+        Args:
+            event: The abort event with upload_id
+
+        Returns:
+            EventResponse: Response indicating success or failure
+        """
+        try:
+            payload = event.payload or {}
+            upload_id = payload.get("upload_id")
+            self.abort_upload(upload_id, event.source_id)
+            return EventResponse(
+                success=True,
+                message="Upload aborted",
+                data={"success": True, "upload_id": upload_id},
+            )
+
+        except Exception as e:
+            logger.error(f"Error aborting upload: {e}")
+            return self._error_response(str(e))
+
+    @mod_event_handler("shared_cache.file.download.chunk")
+    async def _handle_download_chunk(self, event: Event) -> Optional[EventResponse]:
+        """Handle a request for one chunk of a cached file.
+
+        Args:
+            event: The chunk event with cache_id, offset and optional length
+                (capped at the stream chunk size)
+
+        Returns:
+            EventResponse: Response with base64 chunk data, file_size and eof
+        """
+        try:
+            payload = event.payload or {}
+            cache_id = payload.get("cache_id")
+            cache_entry = self.cache_entries.get(cache_id) if cache_id else None
+            if cache_entry is None:
+                return self._error_response("Cache entry not found")
+            if not cache_entry.is_file:
+                return self._error_response("Cache entry is not a file")
+            if not self._check_agent_access(event.source_id, cache_entry.allowed_agent_groups):
+                logger.warning(
+                    f"Agent {event.source_id} denied access to download file {cache_id}"
+                )
+                return self._error_response("Agent does not have permission to access this file")
+
+            self._touch(cache_entry)
+            offset = max(0, int(payload.get("offset", 0)))
+            length = int(payload.get("length") or self.stream_chunk_size)
+            length = max(0, min(length, self.stream_chunk_size))
+            chunk = next(self.iter_file_chunks(cache_id, offset, length), b"") if length else b""
+
+            return EventResponse(
+                success=True,
+                message="Chunk read",
+                data={
+                    "success": True,
+                    "cache_id": cache_id,
+                    "offset": offset,
+                    "length": len(chunk),
+                    "file_size": cache_entry.file_size,
+                    "eof": offset + len(chunk) >= (cache_entry.file_size or 0),
+                    "data": base64.b64encode(chunk).decode("utf-8"),
+                },
+            )
+
+        except Exception as e:
+            logger.error(f"Error reading download chunk: {e}")
+            return self._error_response(str(e))
+
+    def _blob_path(self, content_hash: str) -> Path:
+        """Location of the blob holding content with the given sha256."""
+        return self.blobs_path / content_hash[:2] / content_hash
+
+    def _store_blob(self, source_path: Path, content_hash: str) -> Path:
+        """Move a fully written file into the blob store.
+
+        If a blob with the same hash already exists the source file is discarded
+        instead, so known content costs no further disk space. This is only a
+        rename or unlink, and it runs on the event loop on purpose: the caller
+        references the blob before the next await, so a concurrent delete of
+        the last other reference cannot remove the blob in between.
+
+        Args:
+            source_path: Temporary file holding the content
+            content_hash: sha256 of the content
+
+        Returns:
+            Path: Location of the blob
+        """
+        blob_path = self._blob_path(content_hash)
+        if blob_path.exists():
+            source_path.unlink(missing_ok=True)
+        else:
+            blob_path.parent.mkdir(exist_ok=True)
+            os.replace(source_path, blob_path)
+        return blob_path
+
+    def _rebuild_blob_refs(self):
+        """Count blob references from the loaded entries and remove unreferenced blobs.
+
+        Unreferenced blobs are left behind when the process stops between storing
+        a blob and recording its cache entry.
+        """
+        self._blob_refs = {}
+        for cache_entry in self.cache_entries.values():
+            if cache_entry.content_hash:
+                self._blob_refs[cache_entry.content_hash] = (
+                    self._blob_refs.get(cache_entry.content_hash, 0) + 1
+                )
+        for blob_path in self.blobs_path.glob("*/*"):
+            if blob_path.name not in self._blob_refs:
+                blob_path.unlink(missing_ok=True)
+                logger.info(f"Removed unreferenced blob {blob_path.name}")
+
+    def _release_file(self, cache_entry: CacheEntry):
+        """Drop a file entry's reference to its body; delete the body once unreferenced."""
+        if cache_entry.content_hash:
+            references = self._blob_refs.get(cache_entry.content_hash, 0) - 1
+            if references > 0:
+                self._blob_refs[cache_entry.content_hash] = references
+                return
+            self._blob_refs.pop(cache_entry.content_hash, None)
+            self._blob_path(cache_entry.content_hash).unlink(missing_ok=True)
+        else:
+            (self.storage_path / cache_entry.value).unlink(missing_ok=True)
+
+    def _stored_bytes(self) -> int:
+        """Bytes used on disk and in memory: each blob once, plus legacy files and string values."""
+        blob_sizes: Dict[str, int] = {}
+        total = 0
+        for cache_entry in self.cache_entries.values():
+            if cache_entry.content_hash:
+                blob_sizes[cache_entry.content_hash] = cache_entry.size
+            else:
+                total += cache_entry.size
+        return total + sum(blob_sizes.values())
+
+    def _freed_bytes(self, cache_entry: CacheEntry) -> int:
+        """Stored bytes released by removing an entry (0 while its blob is shared)."""
+        if cache_entry.content_hash and self._blob_refs.get(cache_entry.content_hash, 0) > 1:
+            return 0
+        return cache_entry.size
+
+    def _touch(self, cache_entry: CacheEntry):
+        """Record an access for LRU eviction.
+
+        Access times are not journaled; they are persisted with the next compaction.
+        """
+        cache_entry.last_accessed_at = int(time.time())
+
+    def _remove_entry(self, cache_id: str) -> Optional[CacheEntry]:
+        """Remove a cache entry and its journal record, releasing its file on disk."""
+        cache_entry = self.cache_entries.pop(cache_id, None)
+        if cache_entry is None:
+            return None
+        self._persist_delete(cache_id)
+        if cache_entry.is_file and self.storage_path is not None:
+            self._release_file(cache_entry)
+        return cache_entry
+
+    def _ttl_for(self, mime_type: str) -> Optional[float]:
+        """Look up the TTL for a MIME type in ``ttl_by_mime_type`` (exact, then ``type/*``, then ``*``)."""
+        ttls = self.config.get("ttl_by_mime_type") or {}
+        mime_type = mime_type or ""
+        for key in (mime_type, mime_type.split("/")[0] + "/*", "*"):
+            if key in ttls:
+                return ttls[key]
+        return None
+
+    def evict(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Evict expired entries, then least recently used ones until within the limits.
+
+        Limits come from the mod config: ``ttl_by_mime_type`` (seconds since the
+        last update, by MIME type), ``max_entries`` and ``max_total_bytes``.
+        Pinned entries are never evicted and do not count as candidates, but do
+        count towards the limits. Byte limits and freed bytes refer to stored
+        bytes: a file body shared with other entries frees nothing until its
+        last entry is evicted.
+
+        Agents with access to an evicted entry receive the same
+        ``shared_cache.notification.deleted`` as for an explicit delete, with
+        ``reason`` set to the eviction reason.
+
+        Args:
+            now: Current time (default: time.time())
+
+        Returns:
+            Dict[str, int]: Number of entries evicted per reason, and bytes freed
+        """
+        now = time.time() if now is None else now
+        evicted = {"expired": 0, "max_entries": 0, "max_bytes": 0, "bytes": 0}
+        removed: List[Tuple[CacheEntry, str]] = []
+
+        def remove(cache_entry: CacheEntry, reason: str) -> int:
+            freed = self._freed_bytes(cache_entry)
+            self._remove_entry(cache_entry.cache_id)
+            removed.append((cache_entry, reason))
+            evicted[reason] += 1
+            evicted["bytes"] += freed
+            return freed
+
+        if self.config.get("ttl_by_mime_type"):
+            for cache_entry in list(self.cache_entries.values()):
+                if cache_entry.pinned:
+                    continue
+                ttl = self._ttl_for(cache_entry.mime_type)
+                if ttl is not None and now - cache_entry.updated_at > ttl:
+                    remove(cache_entry, "expired")
+
+        max_entries = self.config.get("max_entries")
+        max_total_bytes = self.config.get("max_total_bytes")
+        if max_entries or max_total_bytes:
+            total_bytes = self._stored_bytes()
+            over_entries = max_entries and len(self.cache_entries) > max_entries
+            over_bytes = max_total_bytes and total_bytes > max_total_bytes
+            if over_entries or over_bytes:
+                candidates = sorted(
+                    (entry for entry in self.cache_entries.values() if not entry.pinned),
+                    key=lambda entry: entry.last_accessed_at,
+                )
+                for cache_entry in candidates:
+                    if max_entries and len(self.cache_entries) > max_entries:
+                        reason = "max_entries"
+                    elif max_total_bytes and total_bytes > max_total_bytes:
+                        reason = "max_bytes"
+                    else:
+                        break
+                    total_bytes -= remove(cache_entry, reason)
+
+        if evicted["expired"] or evicted["max_entries"] or evicted["max_bytes"]:
+            logger.info(
+                f"Evicted {evicted['expired']} expired, {evicted['max_entries']} over max_entries, "
+                f"{evicted['max_bytes']} over max_total_bytes ({evicted['bytes']} bytes)"
+            )
+            self._notify_evicted(removed)
+        return evicted
+
+    def _notify_evicted(self, removed: List[Tuple[CacheEntry, str]]):
+        """Send deletion notifications for evicted entries in the background.
+
+        Notifications need a running event loop; without one they are skipped.
+        """
+        async def notify():
+            for cache_entry, reason in removed:
+                await self._send_notification(
+                    "shared_cache.notification.deleted", cache_entry, reason=reason
+                )
+
+        try:
+            task = asyncio.get_running_loop().create_task(notify())
+        except RuntimeError:
+            logger.debug(f"No running event loop, skipping notifications for {len(removed)} evicted entries")
+            return
+        self._notification_tasks.add(task)
+        task.add_done_callback(self._notification_tasks.discard)
+
+    def _sweep(self):
+        """Run one eviction sweep and update the eviction stats."""
+        started = time.perf_counter()
+        self._expire_upload_sessions()
+        evicted = self.evict()
+        stats = self._eviction_stats
+        stats["sweeps"] += 1
+        stats["evicted_expired"] += evicted["expired"]
+        stats["evicted_max_entries"] += evicted["max_entries"]
+        stats["evicted_max_bytes"] += evicted["max_bytes"]
+        stats["evicted_bytes"] += evicted["bytes"]
+        stats["last_sweep_at"] = int(time.time())
+        stats["last_sweep_seconds"] = time.perf_counter() - started
+
+    def _start_sweeper(self):
+        """Start the background task that periodically evicts entries.
+
+        The task only starts if there is a running event loop; otherwise it is
+        started by the first cache write. ``sweep_interval: 0`` disables it.
+        """
+        if self._sweeper_task is not None and not self._sweeper_task.done():
+            return
+        interval = float(self.config.get("sweep_interval", DEFAULT_SWEEP_INTERVAL))
+        if interval <= 0:
+            return
+
+        async def sweeper():
+            """Background task running eviction sweeps."""
+            logger.info(f"Shared cache eviction sweeper started (interval: {interval}s)")
+            while True:
+                try:
+                    await asyncio.sleep(interval)
+                    self._sweep()
+                except asyncio.CancelledError:
+                    logger.info("Shared cache eviction sweeper cancelled")
+                    break
+                except Exception as e:
+                    logger.error(f"Error in shared cache eviction sweep: {e}")
+
+        try:
+            loop = asyncio.get_running_loop()
+            self._sweeper_task = loop.create_task(sweeper())
+        except RuntimeError:
+            # No running event loop, the sweeper will be started by the first write
+            logger.debug("No running event loop, eviction sweeper will be started later")
+
+    def get_eviction_stats(self) -> Dict[str, Any]:
+        """Get cache usage, limits and eviction counters.
+
+        Returns:
+            Dict[str, Any]: Eviction statistics
+        """
+        entries = self.cache_entries.values()
+        return {
+            "total_bytes": self._stored_bytes(),
+            "logical_bytes": sum(entry.size for entry in entries),
+            "blob_count": len(self._blob_refs),
+            **self._dedup_stats,
+            "file_count": sum(1 for entry in entries if entry.is_file),
+            "pinned_count": sum(1 for entry in entries if entry.pinned),
+            "max_entries": self.config.get("max_entries"),
+            "max_total_bytes": self.config.get("max_total_bytes"),
+            "ttl_by_mime_type": self.config.get("ttl_by_mime_type") or {},
+            "sweeper_running": self._sweeper_task is not None and not self._sweeper_task.done(),
+            **self._eviction_stats,
+        }
+
+    @mod_event_handler("shared_cache.pin")
+    async def _handle_cache_pin(self, event: Event) -> Optional[EventResponse]:
+        """Handle a request to pin or unpin a cache entry.
+
+        Pinned entries are never evicted.
+
+        Args:
+            event: The pin event with cache_id and pinned (default: True)
+
+        Returns:
+            EventResponse: Response indicating success or failure
+        """
+        try:
+            payload = event.payload or {}
+            cache_id = payload.get("cache_id")
+            cache_entry = self.cache_entries.get(cache_id) if cache_id else None
+            if cache_entry is None:
+                return self._error_response("Cache entry not found")
+            if not self._check_agent_access(event.source_id, cache_entry.allowed_agent_groups):
+                logger.warning(f"Agent {event.source_id} denied access to pin cache entry {cache_id}")
+                return self._error_response("Agent does not have permission to pin this cache entry")
+
+            cache_entry.pinned = bool(payload.get("pinned", True))
+            self._persist_entry(cache_entry)
+            logger.info(f"{'Pinned' if cache_entry.pinned else 'Unpinned'} cache entry {cache_id} by {event.source_id}")
+
+            return EventResponse(
+                success=True,
+                message="Cache entry pinned" if cache_entry.pinned else "Cache entry unpinned",
+                data={"success": True, "cache_id": cache_id, "pinned": cache_entry.pinned},
+            )
+
+        except Exception as e:
+            logger.error(f"Error pinning cache entry: {e}")
+            return self._error_response(str(e))
+
     def get_file_path(self, cache_id: str) -> Optional[Path]:
         """Get the file path for a cache entry (for HTTP direct download).
 
@@ -728,6 +1752,35 @@ class SharedCacheMod(BaseMod):
         """
         return self.cache_entries.get(cache_id)
 
+    def get_file_for_download(self, cache_id: str, agent_id: str) -> Tuple[CacheEntry, Path]:
+        """Check that an agent may read a file entry and return it with its path on disk.
+
+        Lets transports serve the file directly (e.g. with sendfile) instead of
+        through the base64 ``shared_cache.file.download`` event. The caller is
+        responsible for authenticating the agent. Counts as an access for LRU eviction.
+
+        Args:
+            cache_id: ID of the cache entry
+            agent_id: ID of the requesting agent
+
+        Returns:
+            Tuple[CacheEntry, Path]: The cache entry and its file path
+
+        Raises:
+            LookupError: If the entry does not exist or is not a stored file
+            PermissionError: If the agent is not in the entry's allowed groups
+        """
+        cache_entry = self.get_cache_entry(cache_id)
+        if cache_entry is None:
+            raise LookupError("Cache entry not found")
+        if not self._check_agent_access(agent_id, cache_entry.allowed_agent_groups):
+            raise PermissionError("Agent does not have permission to access this cache entry")
+        file_path = self.get_file_path(cache_id)
+        if file_path is None:
+            raise LookupError("File not found")
+        self._touch(cache_entry)
+        return cache_entry, file_path
+
     def get_state(self) -> Dict[str, Any]:
         """Get the current state of the shared cache mod.
 
@@ -736,5 +1789,8 @@ class SharedCacheMod(BaseMod):
         """
         return {
             "cache_count": len(self.cache_entries),
+            "upload_sessions": len(self.upload_sessions),
             "storage_path": str(self.storage_path) if self.storage_path else None,
+            **(self._journal.stats() if self._journal else {}),
+            "eviction": self.get_eviction_stats(),
         }
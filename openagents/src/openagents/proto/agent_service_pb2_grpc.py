@@ -18,14 +18,14 @@ except ImportError:
 if _version_not_supported:
     raise RuntimeError(
         f'The grpc package installed is at version {GRPC_VERSION},'
-        + f' but the generated code in agent_service_pb2_grpc.py depends on'
+        + ' but the generated code in agent_service_pb2_grpc.py depends on'
         + f' grpcio>={GRPC_GENERATED_VERSION}.'
         + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
         + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
     )
 
 
-class AgentServiceStub(object):
+class AgentServiceStub:
     """Agent service for OpenAgents gRPC transport
     """
 
@@ -75,9 +75,19 @@ class AgentServiceStub(object):
                 request_serializer=agent__service__pb2.NetworkInfoRequest.SerializeToString,
                 response_deserializer=agent__service__pb2.NetworkInfoResponse.FromString,
                 _registered_method=True)
+        self.UploadFile = channel.stream_unary(
+                '/openagents.AgentService/UploadFile',
+                request_serializer=agent__service__pb2.FileChunk.SerializeToString,
+                response_deserializer=agent__service__pb2.EventResponse.FromString,
+                _registered_method=True)
+        self.DownloadFile = channel.unary_stream(
+                '/openagents.AgentService/DownloadFile',
+                request_serializer=agent__service__pb2.FileDownloadRequest.SerializeToString,
+                response_deserializer=agent__service__pb2.FileChunk.FromString,
+                _registered_method=True)
 
 
-class AgentServiceServicer(object):
+class AgentServiceServicer:
     """Agent service for OpenAgents gRPC transport
     """
 
@@ -134,6 +144,19 @@ class AgentServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def UploadFile(self, request_iterator, context):
+        """Chunked binary file transfer for the shared cache
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DownloadFile(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_AgentServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -177,6 +200,16 @@ def add_AgentServiceServicer_to_server(servicer, server):
                     request_deserializer=agent__service__pb2.NetworkInfoRequest.FromString,
                     response_serializer=agent__service__pb2.NetworkInfoResponse.SerializeToString,
             ),
+            'UploadFile': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadFile,
+                    request_deserializer=agent__service__pb2.FileChunk.FromString,
+                    response_serializer=agent__service__pb2.EventResponse.SerializeToString,
+            ),
+            'DownloadFile': grpc.unary_stream_rpc_method_handler(
+                    servicer.DownloadFile,
+                    request_deserializer=agent__service__pb2.FileDownloadRequest.FromString,
+                    response_serializer=agent__service__pb2.FileChunk.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'openagents.AgentService', rpc_method_handlers)
@@ -185,7 +218,7 @@ def add_AgentServiceServicer_to_server(servicer, server):
 
 
  # This class is part of an EXPERIMENTAL API.
-class AgentService(object):
+class AgentService:
     """Agent service for OpenAgents gRPC transport
     """
 
@@ -404,3 +437,57 @@ class AgentService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def UploadFile(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/openagents.AgentService/UploadFile',
+            agent__service__pb2.FileChunk.SerializeToString,
+            agent__service__pb2.EventResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DownloadFile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/openagents.AgentService/DownloadFile',
+            agent__service__pb2.FileDownloadRequest.SerializeToString,
+            agent__service__pb2.FileChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
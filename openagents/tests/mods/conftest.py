@@ -0,0 +1,84 @@
+"""
+Shared fixtures for mod tests.
+"""
+
+import base64
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from openagents.core.workspace_manager import WorkspaceManager
+from openagents.models.event import Event, EventVisibility
+from openagents.mods.core.shared_cache.mod import SharedCacheMod
+
+
+@pytest.fixture
+def make_shared_cache(tmp_path):
+    """Factory for shared cache mods bound to a network stand-in with a workspace in tmp_path.
+
+    Every mod created by the factory uses the same workspace, so creating a
+    second one simulates a restart. The stand-in network records notifications
+    in ``mod.network.process_event``. The eviction sweeper is disabled unless
+    the config sets ``sweep_interval``.
+    """
+    mods = []
+
+    def factory(config=None):
+        network = MagicMock()
+        network.network_id = "test_network"
+        network.workspace_manager = WorkspaceManager(tmp_path)
+        network.topology.agent_group_membership = {}
+        network.topology.agent_registry = {}
+        network.process_event = AsyncMock()
+
+        mod = SharedCacheMod()
+        mod.update_config({"sweep_interval": 0, **(config or {})})
+        mod.bind_network(network)
+        mods.append(mod)
+        return mod
+
+    yield factory
+
+    for mod in mods:
+        if mod._sweeper_task is not None:
+            mod._sweeper_task.cancel()
+        if mod._journal is not None:
+            mod._journal.close()
+
+
+@pytest.fixture
+def cache_event():
+    """Factory for shared cache events sent by ``source_id`` (default: test_agent)."""
+
+    def factory(event_name, payload, source_id="test_agent"):
+        return Event(
+            event_name=event_name,
+            source_id=source_id,
+            payload=payload,
+            relevant_mod="openagents.mods.core.shared_cache",
+            visibility=EventVisibility.MOD_ONLY,
+        )
+
+    return factory
+
+
+@pytest.fixture
+def upload_file(cache_event):
+    """Upload bytes to a shared cache mod with shared_cache.file.upload and return the response data."""
+
+    async def upload(mod, data, filename, mime_type="application/octet-stream", **payload):
+        response = await mod._handle_file_upload(
+            cache_event(
+                "shared_cache.file.upload",
+                {
+                    "file_data": base64.b64encode(data).decode("utf-8"),
+                    "filename": filename,
+                    "mime_type": mime_type,
+                    **payload,
+                },
+            )
+        )
+        assert response.success, response.message
+        return response.data
+
+    return upload
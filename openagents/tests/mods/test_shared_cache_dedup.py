@@ -0,0 +1,113 @@
+"""
+Tests for content-addressed file storage in the Shared Cache mod.
+
+This test suite verifies:
+1. Uploads of known content reuse the stored blob instead of writing it again
+2. A blob is deleted only when its last referencing entry is removed
+3. Chunked uploads are deduplicated against whole-file uploads
+4. Reference counts are rebuilt on restart and unreferenced blobs removed
+5. Eviction by max_total_bytes counts shared blobs once
+"""
+
+import base64
+import hashlib
+
+import pytest
+
+
+def _blobs(mod):
+    return sorted(path.name for path in mod.blobs_path.glob("*/*"))
+
+
+@pytest.mark.asyncio
+async def test_duplicate_upload_reuses_blob(make_shared_cache, upload_file, cache_event):
+    """Test that the same content uploaded twice is stored once and served to both entries."""
+    mod = make_shared_cache()
+    content = b"MThd" + bytes(2000)
+    digest = hashlib.sha256(content).hexdigest()
+
+    first = await upload_file(mod, content, "take_1.mid")
+    blob_path = mod.get_file_path(first["cache_id"])
+    mtime = blob_path.stat().st_mtime_ns
+    second = await upload_file(mod, content, "take_2.mid")
+
+    assert first["content_hash"] == second["content_hash"] == digest
+    assert mod.get_file_path(second["cache_id"]) == blob_path
+    assert blob_path.stat().st_mtime_ns == mtime
+    assert _blobs(mod) == [digest]
+
+    stats = mod.get_eviction_stats()
+    assert stats["dedup_hits"] == 1
+    assert stats["dedup_bytes_saved"] == len(content)
+    assert stats["total_bytes"] == len(content)
+    assert stats["logical_bytes"] == 2 * len(content)
+
+    download = await mod._handle_file_download(
+        cache_event("shared_cache.file.download", {"cache_id": second["cache_id"]})
+    )
+    assert base64.b64decode(download.data["file_data"]) == content
+    assert download.data["filename"] == "take_2.mid"
+
+
+@pytest.mark.asyncio
+async def test_blob_deleted_with_last_reference(make_shared_cache, upload_file, cache_event):
+    """Test that deleting one of two entries keeps the blob, deleting both removes it."""
+    mod = make_shared_cache()
+    first = await upload_file(mod, b"same bytes", "a.bin")
+    second = await upload_file(mod, b"same bytes", "b.bin")
+    blob_path = mod.get_file_path(first["cache_id"])
+
+    await mod._handle_cache_delete(cache_event("shared_cache.delete", {"cache_id": first["cache_id"]}))
+    assert blob_path.exists()
+
+    await mod._handle_cache_delete(cache_event("shared_cache.delete", {"cache_id": second["cache_id"]}))
+    assert not blob_path.exists()
+    assert mod._blob_refs == {}
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_deduplicates(make_shared_cache, upload_file):
+    """Test that a chunked upload of known content discards its part file."""
+    mod = make_shared_cache({"stream_chunk_size": 64})
+    content = bytes(range(256)) * 4
+    whole = await upload_file(mod, content, "whole.bin")
+
+    session = mod.begin_upload("dedup_agent", "chunked.bin", total_size=len(content))
+    await mod.write_upload_chunk(session.upload_id, "dedup_agent", 0, content)
+    cache_entry = await mod.finish_upload(session.upload_id, "dedup_agent")
+
+    assert cache_entry.content_hash == whole["content_hash"]
+    assert not session.part_path.exists()
+    assert _blobs(mod) == [whole["content_hash"]]
+    assert mod._blob_refs[whole["content_hash"]] == 2
+
+
+@pytest.mark.asyncio
+async def test_restart_rebuilds_refs_and_removes_orphans(make_shared_cache, upload_file):
+    """Test that reference counts survive a restart and unreferenced blobs are cleaned up."""
+    mod = make_shared_cache()
+    kept = await upload_file(mod, b"kept", "kept.bin")
+    await upload_file(mod, b"kept", "kept_copy.bin")
+    orphan = mod._blob_path("0" * 64)
+    orphan.parent.mkdir(exist_ok=True)
+    orphan.write_bytes(b"left behind by a crash")
+    mod.shutdown()
+
+    restarted = make_shared_cache()
+
+    assert restarted._blob_refs == {kept["content_hash"]: 2}
+    assert not orphan.exists()
+    assert restarted.get_file_path(kept["cache_id"]).read_bytes() == b"kept"
+
+
+@pytest.mark.asyncio
+async def test_eviction_counts_shared_blobs_once(make_shared_cache, upload_file):
+    """Test that duplicates do not push the cache over max_total_bytes."""
+    mod = make_shared_cache({"max_total_bytes": 1500})
+    for i in range(5):
+        await upload_file(mod, b"x" * 1000, f"copy_{i}.bin")
+
+    evicted = mod.evict()
+
+    assert evicted["max_bytes"] == 0
+    assert len(mod.cache_entries) == 5
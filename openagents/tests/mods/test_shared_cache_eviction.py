@@ -0,0 +1,160 @@
+"""
+Tests for the Shared Cache mod's eviction policy.
+
+This test suite verifies:
+1. TTL eviction by MIME type
+2. LRU eviction by max_entries and max_total_bytes, using access times
+3. Pinned entries are never evicted
+4. Evicted and deleted files are removed from disk, and agents are notified
+5. The background sweeper and the stats exported by get_state
+"""
+
+import asyncio
+import time
+
+import pytest
+
+
+@pytest.fixture
+def create(cache_event):
+    async def create(mod, value, **payload):
+        response = await mod._handle_cache_create(
+            cache_event("shared_cache.create", {"value": value, **payload})
+        )
+        return response.data["cache_id"]
+
+    return create
+
+
+@pytest.mark.asyncio
+async def test_ttl_eviction_by_mime_type(make_shared_cache, create, upload_file):
+    """Test that entries older than their MIME type's TTL are evicted, pinned ones kept."""
+    mod = make_shared_cache({"ttl_by_mime_type": {"audio/*": 60, "text/plain": 3600}})
+    recording = (await upload_file(mod, b"RIFF", "hum.wav", "audio/wav"))["cache_id"]
+    pinned = (await upload_file(mod, b"RIFF-keep", "keep.wav", "audio/wav", pinned=True))["cache_id"]
+    note = await create(mod, "note")
+    recording_path = mod.get_file_path(recording)
+
+    evicted = mod.evict(now=time.time() + 120)
+
+    assert evicted["expired"] == 1
+    assert recording not in mod.cache_entries
+    assert not recording_path.exists()
+    assert pinned in mod.cache_entries
+    assert note in mod.cache_entries
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_max_entries(make_shared_cache, create, cache_event):
+    """Test that the least recently accessed entries are evicted first."""
+    mod = make_shared_cache({"max_entries": 2})
+    first = await create(mod, "first")
+    second = await create(mod, "second")
+    third = await create(mod, "third")
+    for i, cache_id in enumerate((first, second, third)):
+        mod.cache_entries[cache_id].last_accessed_at = 1000 + i
+
+    # Reading the oldest entry makes it the most recently used
+    await mod._handle_cache_get(cache_event("shared_cache.get", {"cache_id": first}))
+
+    evicted = mod.evict()
+
+    assert evicted["max_entries"] == 1
+    assert set(mod.cache_entries) == {first, third}
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_max_total_bytes(make_shared_cache, upload_file):
+    """Test that files are evicted until the total size fits, skipping pinned files."""
+    mod = make_shared_cache({"max_total_bytes": 2500})
+    pinned = (await upload_file(mod, b"p" * 1000, "pinned.mid", pinned=True))["cache_id"]
+    old = (await upload_file(mod, b"o" * 1000, "old.mid"))["cache_id"]
+    new = (await upload_file(mod, b"n" * 1000, "new.mid"))["cache_id"]
+    mod.cache_entries[pinned].last_accessed_at = 1
+    mod.cache_entries[old].last_accessed_at = 2
+    mod.cache_entries[new].last_accessed_at = 3
+
+    evicted = mod.evict()
+
+    assert evicted["max_bytes"] == 1
+    assert evicted["bytes"] == 1000
+    assert set(mod.cache_entries) == {pinned, new}
+    assert len(list(mod.blobs_path.glob("*/*"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_eviction_notifies_agents(make_shared_cache, create):
+    """Test that agents are told about evicted entries like about deleted ones."""
+    mod = make_shared_cache({"max_entries": 1})
+    mod.network.topology.agent_registry = {"listener": object()}
+    older = await create(mod, "older")
+    await create(mod, "newer")
+    mod.cache_entries[older].last_accessed_at = 1
+
+    mod.evict()
+    await asyncio.sleep(0.05)
+
+    notifications = [call.args[0] for call in mod.network.process_event.await_args_list]
+    deleted = [n for n in notifications if n.event_name == "shared_cache.notification.deleted"]
+    assert len(deleted) == 1
+    assert deleted[0].destination_id == "listener"
+    assert deleted[0].payload["cache_id"] == older
+    assert deleted[0].payload["reason"] == "max_entries"
+
+
+@pytest.mark.asyncio
+async def test_pin_event_protects_entry(make_shared_cache, create, cache_event):
+    """Test pinning and unpinning through the shared_cache.pin event."""
+    mod = make_shared_cache({"max_entries": 1})
+    older = await create(mod, "older")
+    newer = await create(mod, "newer")
+    mod.cache_entries[older].last_accessed_at = 1
+
+    response = await mod._handle_cache_pin(cache_event("shared_cache.pin", {"cache_id": older}))
+    assert response.success
+    assert mod.cache_entries[older].pinned
+
+    mod.evict()
+    assert set(mod.cache_entries) == {older}
+
+    response = await mod._handle_cache_pin(cache_event("shared_cache.pin", {"cache_id": older, "pinned": False}))
+    assert response.success
+    assert not mod.cache_entries[older].pinned
+
+    missing = await mod._handle_cache_pin(cache_event("shared_cache.pin", {"cache_id": newer}))
+    assert not missing.success
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_file(make_shared_cache, upload_file, cache_event):
+    """Test that deleting a file entry removes its file from disk."""
+    mod = make_shared_cache()
+    cache_id = (await upload_file(mod, b"jpeg", "card.jpg", "image/jpeg"))["cache_id"]
+    file_path = mod.get_file_path(cache_id)
+
+    response = await mod._handle_cache_delete(cache_event("shared_cache.delete", {"cache_id": cache_id}))
+
+    assert response.success
+    assert not file_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_sweeper_evicts_and_reports_stats(make_shared_cache, create):
+    """Test that the background sweeper runs eviction and get_state exports the counters."""
+    mod = make_shared_cache({"max_entries": 1, "sweep_interval": 0.05})
+    await create(mod, "a")
+    await create(mod, "b")
+    mod._start_sweeper()
+
+    await asyncio.sleep(0.2)
+
+    state = mod.get_state()["eviction"]
+    assert len(mod.cache_entries) == 1
+    assert state["sweeper_running"]
+    assert state["sweeps"] >= 1
+    assert state["evicted_max_entries"] == 1
+    assert state["max_entries"] == 1
+
+    mod.shutdown()
+    await asyncio.sleep(0)
+    assert not mod.get_state()["eviction"]["sweeper_running"]
@@ -0,0 +1,128 @@
+"""
+Tests for the Shared Cache mod's append-only metadata journal.
+
+This test suite verifies:
+1. Changes are appended to the journal instead of rewriting the snapshot
+2. Snapshot + journal replay restores entries after a restart
+3. Compaction folds the journal into the snapshot
+4. A torn last journal record is dropped on load without losing later appends
+"""
+
+import json
+
+import pytest
+
+from openagents.mods.core.shared_cache.journal import CacheJournal
+
+
+def _entry(cache_id, value="v"):
+    return {
+        "cache_id": cache_id,
+        "value": value,
+        "mime_type": "text/plain",
+        "allowed_agent_groups": [],
+        "created_by": "agent",
+        "created_at": 1,
+        "updated_at": 1,
+        "is_file": False,
+    }
+
+
+def test_journal_replays_over_snapshot(tmp_path):
+    """Test that puts and deletes after the snapshot are replayed in order."""
+    journal = CacheJournal(tmp_path)
+    journal.compact({"a": _entry("a"), "b": _entry("b")})
+    journal.append_put(_entry("a", "changed"))
+    journal.append_delete("b")
+    journal.append_put(_entry("c"))
+    journal.close()
+
+    reloaded = CacheJournal(tmp_path)
+    entries = reloaded.load()
+    assert set(entries) == {"a", "c"}
+    assert entries["a"]["value"] == "changed"
+    assert reloaded.records == 3
+
+
+def test_journal_compaction_resets_journal(tmp_path):
+    """Test that compaction writes the snapshot and empties the journal."""
+    journal = CacheJournal(tmp_path, compact_min_records=3)
+    for cache_id in ("a", "b", "c"):
+        journal.append_put(_entry(cache_id))
+    assert journal.needs_compaction(entry_count=3)
+
+    journal.compact({"a": _entry("a"), "b": _entry("b"), "c": _entry("c")})
+    assert journal.records == 0
+    assert journal.journal_path.stat().st_size == 0
+    assert set(json.loads(journal.snapshot_path.read_text())) == {"a", "b", "c"}
+    journal.close()
+
+
+def test_journal_skips_torn_record(tmp_path):
+    """Test that a partially written last record does not prevent loading."""
+    journal = CacheJournal(tmp_path)
+    journal.append_put(_entry("a"))
+    journal.close()
+    with open(journal.journal_path, "a") as f:
+        f.write('{"op":"put","entry":{"cache_id":"b"')
+
+    entries = CacheJournal(tmp_path).load()
+    assert set(entries) == {"a"}
+
+
+def test_journal_append_after_torn_record(tmp_path):
+    """Test that a record appended after loading a torn journal survives the next load."""
+    journal = CacheJournal(tmp_path)
+    journal.append_put(_entry("a"))
+    journal.close()
+    with open(journal.journal_path, "a") as f:
+        f.write('{"op":"put","entry":{"cache_id":"x"')
+
+    journal = CacheJournal(tmp_path)
+    assert set(journal.load()) == {"a"}
+    journal.append_put(_entry("b"))
+    journal.close()
+
+    reloaded = CacheJournal(tmp_path)
+    assert set(reloaded.load()) == {"a", "b"}
+    assert reloaded.records == 2
+
+
+@pytest.mark.asyncio
+async def test_mod_persists_changes_through_journal(make_shared_cache, cache_event):
+    """Test that create/update/delete survive a restart without rewriting cache_data.json."""
+    mod = make_shared_cache()
+
+    created = await mod._handle_cache_create(cache_event("shared_cache.create", {"value": "one"}))
+    kept = await mod._handle_cache_create(cache_event("shared_cache.create", {"value": "two"}))
+    await mod._handle_cache_update(
+        cache_event("shared_cache.update", {"cache_id": kept.data["cache_id"], "value": "two-updated"})
+    )
+    await mod._handle_cache_delete(cache_event("shared_cache.delete", {"cache_id": created.data["cache_id"]}))
+
+    # Only the journal was written
+    assert not (mod.storage_path / "cache_data.json").exists()
+    assert mod.get_state()["journal_records"] == 4
+
+    # Restart without shutdown, so the journal has to be replayed
+    mod._journal.close()
+    restarted = make_shared_cache()
+    assert list(restarted.cache_entries) == [kept.data["cache_id"]]
+    assert restarted.cache_entries[kept.data["cache_id"]].value == "two-updated"
+
+    # Shutdown compacts into the snapshot
+    restarted.shutdown()
+    assert (restarted.storage_path / "cache_data.json").exists()
+    assert restarted._journal.journal_path.stat().st_size == 0
+
+
+@pytest.mark.asyncio
+async def test_mod_compacts_when_journal_outgrows_entries(make_shared_cache, cache_event):
+    """Test that the mod compacts automatically once the journal reaches the threshold."""
+    mod = make_shared_cache({"journal_compact_min_records": 5})
+    for i in range(5):
+        await mod._handle_cache_create(cache_event("shared_cache.create", {"value": str(i)}))
+
+    assert mod._journal.records == 0
+    snapshot = json.loads((mod.storage_path / "cache_data.json").read_text())
+    assert len(snapshot) == 5
@@ -0,0 +1,485 @@
+"""
+Tests for chunked binary file transfer in the Shared Cache mod.
+
+This test suite verifies:
+1. Chunked upload over events (offset-addressed chunks, resume, abort)
+2. Chunked download over events
+3. Streaming upload and download over the HTTP routes
+4. Streaming upload and download over gRPC
+5. Access control and error handling for upload sessions, including
+   completion while a stream is still being written
+6. Direct HTTP downloads with Range requests and ETag revalidation
+"""
+
+import pytest
+import asyncio
+import random
+import base64
+import hashlib
+import os
+from pathlib import Path
+
+import aiohttp
+
+from openagents.core.client import AgentClient
+from openagents.core.connectors.grpc_connector import GRPCNetworkConnector
+from openagents.core.network import create_network
+from openagents.launchers.network_launcher import load_network_config
+from openagents.models.event import Event, EventVisibility
+from openagents.mods.core.shared_cache.mod import UploadInProgressError
+
+
+@pytest.fixture
+async def shared_cache_stream_network():
+    """Create and start a network with shared cache mod configured for streaming tests."""
+    config_path = (
+        Path(__file__).parent.parent.parent
+        / "examples"
+        / "test_configs"
+        / "test_shared_cache.yaml"
+    )
+
+    config = load_network_config(str(config_path))
+
+    # Streaming test port range: 50000-51999 (HTTP +2000)
+    grpc_port = random.randint(50000, 51999)
+    http_port = grpc_port + 2000
+
+    for transport in config.network.transports:
+        if transport.type == "grpc":
+            transport.config["port"] = grpc_port
+        elif transport.type == "http":
+            transport.config["port"] = http_port
+
+    network = create_network(config.network)
+    await network.initialize()
+
+    # Small chunks so that every test file spans several of them
+    cache_mod = network.mods["openagents.mods.core.shared_cache"]
+    cache_mod.update_config({"stream_chunk_size": 1024})
+
+    await asyncio.sleep(1.0)
+
+    yield network, config, grpc_port, http_port
+
+    try:
+        await network.shutdown()
+    except Exception as e:
+        print(f"Error during network shutdown: {e}")
+
+
+@pytest.fixture
+async def stream_client(shared_cache_stream_network):
+    """Create an agent client for streaming tests."""
+    network, config, grpc_port, http_port = shared_cache_stream_network
+
+    client = AgentClient(agent_id="stream_agent")
+    await client.connect("localhost", http_port)
+    await asyncio.sleep(1.0)
+
+    yield client
+
+    try:
+        await client.disconnect()
+    except Exception as e:
+        print(f"Error disconnecting stream_agent: {e}")
+
+
+def _cache_event(event_name, source_id, payload):
+    return Event(
+        event_name=event_name,
+        source_id=source_id,
+        payload=payload,
+        relevant_mod="openagents.mods.core.shared_cache",
+        visibility=EventVisibility.MOD_ONLY,
+    )
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_and_download_over_events(stream_client):
+    """Test uploading in chunks (out of order retries included) and reading back in chunks."""
+    content = os.urandom(5000)
+
+    start = await stream_client.send_event(
+        _cache_event(
+            "shared_cache.file.upload.start",
+            "stream_agent",
+            {"filename": "take.wav", "mime_type": "audio/wav", "total_size": len(content)},
+        )
+    )
+    assert start.success, start.message
+    upload_id = start.data["upload_id"]
+    assert start.data["chunk_size"] == 1024
+
+    for offset in range(0, len(content), 2000):
+        chunk = await stream_client.send_event(
+            _cache_event(
+                "shared_cache.file.upload.chunk",
+                "stream_agent",
+                {
+                    "upload_id": upload_id,
+                    "offset": offset,
+                    "data": base64.b64encode(content[offset:offset + 2000]).decode("utf-8"),
+                },
+            )
+        )
+        assert chunk.success, chunk.message
+        assert chunk.data["received"] == min(offset + 2000, len(content))
+
+    # A retried chunk overlapping received data is accepted and changes nothing
+    retry = await stream_client.send_event(
+        _cache_event(
+            "shared_cache.file.upload.chunk",
+            "stream_agent",
+            {"upload_id": upload_id, "offset": 0, "data": base64.b64encode(content[:100]).decode("utf-8")},
+        )
+    )
+    assert retry.success
+    assert retry.data["received"] == len(content)
+
+    complete = await stream_client.send_event(
+        _cache_event("shared_cache.file.upload.complete", "stream_agent", {"upload_id": upload_id})
+    )
+    assert complete.success, complete.message
+    cache_id = complete.data["cache_id"]
+    assert complete.data["file_size"] == len(content)
+    assert complete.data["filename"] == "take.wav"
+
+    downloaded = b""
+    while True:
+        chunk = await stream_client.send_event(
+            _cache_event(
+                "shared_cache.file.download.chunk",
+                "stream_agent",
+                {"cache_id": cache_id, "offset": len(downloaded)},
+            )
+        )
+        assert chunk.success, chunk.message
+        assert chunk.data["length"] <= 1024
+        downloaded += base64.b64decode(chunk.data["data"])
+        if chunk.data["eof"]:
+            break
+    assert downloaded == content
+
+    # The whole-file download event still works for chunked uploads
+    download = await stream_client.send_event(
+        _cache_event("shared_cache.file.download", "stream_agent", {"cache_id": cache_id})
+    )
+    assert download.success
+    assert base64.b64decode(download.data["file_data"]) == content
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_rejects_gaps_and_incomplete_files(stream_client):
+    """Test that chunks may not leave a gap and completion checks the declared size."""
+    start = await stream_client.send_event(
+        _cache_event(
+            "shared_cache.file.upload.start",
+            "stream_agent",
+            {"filename": "gap.bin", "total_size": 10},
+        )
+    )
+    upload_id = start.data["upload_id"]
+
+    gap = await stream_client.send_event(
+        _cache_event(
+            "shared_cache.file.upload.chunk",
+            "stream_agent",
+            {"upload_id": upload_id, "offset": 5, "data": base64.b64encode(b"12345").decode("utf-8")},
+        )
+    )
+    assert not gap.success
+
+    too_long = await stream_client.send_event(
+        _cache_event(
+            "shared_cache.file.upload.chunk",
+            "stream_agent",
+            {"upload_id": upload_id, "offset": 0, "data": base64.b64encode(b"x" * 11).decode("utf-8")},
+        )
+    )
+    assert not too_long.success
+    assert "total_size" in too_long.message
+
+    await stream_client.send_event(
+        _cache_event(
+            "shared_cache.file.upload.chunk",
+            "stream_agent",
+            {"upload_id": upload_id, "offset": 0, "data": base64.b64encode(b"12345").decode("utf-8")},
+        )
+    )
+    status = await stream_client.send_event(
+        _cache_event("shared_cache.file.upload.status", "stream_agent", {"upload_id": upload_id})
+    )
+    assert status.success
+    assert status.data["received"] == 5
+
+    incomplete = await stream_client.send_event(
+        _cache_event("shared_cache.file.upload.complete", "stream_agent", {"upload_id": upload_id})
+    )
+    assert not incomplete.success
+    assert "incomplete" in incomplete.message.lower()
+
+    # Another agent cannot write to or complete this session
+    hijack = await stream_client.send_event(
+        _cache_event("shared_cache.file.upload.complete", "other_agent", {"upload_id": upload_id})
+    )
+    assert not hijack.success
+
+    abort = await stream_client.send_event(
+        _cache_event("shared_cache.file.upload.abort", "stream_agent", {"upload_id": upload_id})
+    )
+    assert abort.success
+    status = await stream_client.send_event(
+        _cache_event("shared_cache.file.upload.status", "stream_agent", {"upload_id": upload_id})
+    )
+    assert not status.success
+
+
+@pytest.mark.asyncio
+async def test_upload_cannot_finish_while_stream_is_writing(make_shared_cache):
+    """Test that complete, abort and other writes are rejected until a stream has ended."""
+    mod = make_shared_cache()
+    session = mod.begin_upload("stream_agent", "take.wav")
+    checked = []
+
+    async def body():
+        yield b"0123456789"
+        # The request body is still streaming: the session must stay open
+        with pytest.raises(UploadInProgressError):
+            await mod.finish_upload(session.upload_id, "stream_agent")
+        with pytest.raises(UploadInProgressError):
+            mod.abort_upload(session.upload_id, "stream_agent")
+        with pytest.raises(UploadInProgressError):
+            await mod.write_upload_chunk(session.upload_id, "stream_agent", 10, b"x")
+        checked.append(True)
+        yield b"abcdefghij"
+
+    received = await mod.write_upload_stream(session.upload_id, "stream_agent", 0, body())
+    assert received == 20
+    assert checked
+
+    cache_entry = await mod.finish_upload(session.upload_id, "stream_agent")
+    content = b"0123456789abcdefghij"
+    assert cache_entry.file_size == 20
+    assert cache_entry.content_hash == hashlib.sha256(content).hexdigest()
+    assert mod.get_file_path(cache_entry.cache_id).read_bytes() == content
+
+
+@pytest.mark.asyncio
+async def test_failed_finish_removes_part_file(make_shared_cache, monkeypatch):
+    """Test that a completion that fails while hashing does not leave the part file behind."""
+    mod = make_shared_cache()
+    session = mod.begin_upload("stream_agent", "take.wav")
+    await mod.write_upload_chunk(session.upload_id, "stream_agent", 0, b"0123456789")
+
+    def failing_hash(path, chunk_size):
+        raise OSError("read error")
+
+    monkeypatch.setattr("openagents.mods.core.shared_cache.mod._sha256_file", failing_hash)
+    with pytest.raises(OSError):
+        await mod.finish_upload(session.upload_id, "stream_agent")
+    assert not session.part_path.exists()
+    assert session.upload_id not in mod.upload_sessions
+
+
+@pytest.mark.asyncio
+async def test_http_streaming_upload_resume_and_download(shared_cache_stream_network, stream_client):
+    """Test the HTTP upload session routes, resuming after a partial body, and the stream download."""
+    network, config, grpc_port, http_port = shared_cache_stream_network
+    base_url = f"http://localhost:{http_port}/api/cache"
+    content = os.urandom(10000)
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            f"{base_url}/uploads",
+            json={"agent_id": "stream_agent", "filename": "../render.mid", "mime_type": "audio/midi", "pinned": True},
+        ) as resp:
+            assert resp.status == 200
+            upload_id = (await resp.json())["upload_id"]
+
+        # First part of the body, then resume from the reported offset
+        async with session.put(
+            f"{base_url}/uploads/{upload_id}",
+            params={"agent_id": "stream_agent"},
+            data=content[:4000],
+        ) as resp:
+            assert resp.status == 200
+            assert (await resp.json())["received"] == 4000
+
+        async with session.get(f"{base_url}/uploads/{upload_id}", params={"agent_id": "stream_agent"}) as resp:
+            received = (await resp.json())["received"]
+        assert received == 4000
+
+        async with session.put(
+            f"{base_url}/uploads/{upload_id}",
+            params={"agent_id": "stream_agent"},
+            headers={"Upload-Offset": str(received)},
+            data=content[received:],
+        ) as resp:
+            assert resp.status == 200
+            assert (await resp.json())["received"] == len(content)
+
+        # Wrong agent and gaps are rejected
+        async with session.put(
+            f"{base_url}/uploads/{upload_id}", params={"agent_id": "other_agent"}, data=b"x"
+        ) as resp:
+            assert resp.status == 403
+        async with session.put(
+            f"{base_url}/uploads/{upload_id}",
+            params={"agent_id": "stream_agent", "offset": str(len(content) + 1)},
+            data=b"x",
+        ) as resp:
+            assert resp.status == 400
+
+        async with session.post(
+            f"{base_url}/uploads/{upload_id}/complete", json={"agent_id": "stream_agent"}
+        ) as resp:
+            assert resp.status == 200
+            result = await resp.json()
+        assert result["filename"] == "render.mid"
+        assert result["file_size"] == len(content)
+        assert network.mods["openagents.mods.core.shared_cache"].get_cache_entry(result["cache_id"]).pinned
+
+        async with session.get(
+            f"{base_url}/stream/{result['cache_id']}", params={"agent_id": "stream_agent"}
+        ) as resp:
+            assert resp.status == 200
+            assert resp.headers["Content-Type"] == "audio/midi"
+            assert int(resp.headers["Content-Length"]) == len(content)
+            assert await resp.read() == content
+
+        async with session.get(f"{base_url}/stream/missing", params={"agent_id": "stream_agent"}) as resp:
+            assert resp.status == 404
+
+        async with session.put(
+            f"{base_url}/uploads/missing", params={"agent_id": "stream_agent"}, data=b"x"
+        ) as resp:
+            assert resp.status == 404
+
+
+@pytest.mark.asyncio
+async def test_grpc_streaming_upload_and_download(shared_cache_stream_network, tmp_path):
+    """Test the UploadFile and DownloadFile gRPC streams through the gRPC connector."""
+    network, config, grpc_port, http_port = shared_cache_stream_network
+    content = os.urandom(7000)
+    source = tmp_path / "hum.wav"
+    source.write_bytes(content)
+
+    connector = GRPCNetworkConnector("localhost", grpc_port, "grpc_stream_agent")
+    assert await connector.connect_to_server()
+    try:
+        upload = await connector.upload_file_stream(
+            str(source), mime_type="audio/wav", chunk_size=1500, pinned=True
+        )
+        assert upload.success, upload.message
+        cache_id = upload.data["cache_id"]
+        assert upload.data["file_size"] == len(content)
+        assert upload.data["filename"] == "hum.wav"
+        assert network.mods["openagents.mods.core.shared_cache"].get_cache_entry(cache_id).pinned
+
+        target = tmp_path / "downloaded.wav"
+        download = await connector.download_file_stream(cache_id, str(target))
+        assert download.success, download.message
+        assert download.data["filename"] == "hum.wav"
+        assert download.data["file_size"] == len(content)
+        assert target.read_bytes() == content
+
+        # Resume from the local file's length
+        partial = tmp_path / "partial.wav"
+        partial.write_bytes(content[:3000])
+        resumed = await connector.download_file_stream(cache_id, str(partial), offset=3000)
+        assert resumed.success, resumed.message
+        assert partial.read_bytes() == content
+
+        # A local file that does not match the offset is left alone
+        partial.write_bytes(content[:1000])
+        mismatch = await connector.download_file_stream(cache_id, str(partial), offset=3000)
+        assert not mismatch.success
+        assert "has 1000 bytes" in mismatch.message
+        assert partial.read_bytes() == content[:1000]
+        gone = await connector.download_file_stream(cache_id, str(tmp_path / "gone.wav"), offset=3000)
+        assert not gone.success
+        assert not (tmp_path / "gone.wav").exists()
+
+        missing = await connector.download_file_stream("missing", str(tmp_path / "missing.bin"))
+        assert not missing.success
+        assert "NOT_FOUND" in missing.message
+        # A failed download leaves no file behind
+        assert not (tmp_path / "missing.bin").exists()
+        assert not (tmp_path / "missing.bin.part").exists()
+    finally:
+        await connector.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_http_download_ranges_and_etag(shared_cache_stream_network, stream_client):
+    """Test that HTTP downloads are served from disk with Range, ETag and group checks."""
+    network, config, grpc_port, http_port = shared_cache_stream_network
+    base_url = f"http://localhost:{http_port}/api/cache"
+    content = os.urandom(6000)
+
+    upload = await stream_client.send_event(
+        _cache_event(
+            "shared_cache.file.upload",
+            "stream_agent",
+            {
+                "file_data": base64.b64encode(content).decode("utf-8"),
+                "filename": "render.wav",
+                "mime_type": "audio/wav",
+            },
+        )
+    )
+    assert upload.success, upload.message
+    cache_id = upload.data["cache_id"]
+
+    restricted = await stream_client.send_event(
+        _cache_event(
+            "shared_cache.file.upload",
+            "stream_agent",
+            {
+                "file_data": base64.b64encode(b"admins only").decode("utf-8"),
+                "filename": "secret.bin",
+                "allowed_agent_groups": ["admin"],
+            },
+        )
+    )
+    assert restricted.success, restricted.message
+
+    params = {"agent_id": "stream_agent"}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{base_url}/download/{cache_id}", params=params) as resp:
+            assert resp.status == 200
+            assert resp.headers["Content-Type"] == "audio/wav"
+            assert resp.headers["Accept-Ranges"] == "bytes"
+            assert resp.headers["Content-Disposition"] == 'attachment; filename="render.wav"'
+            etag = resp.headers["ETag"]
+            assert await resp.read() == content
+
+        # Seeking: a byte range is answered with 206 and only those bytes
+        async with session.get(
+            f"{base_url}/download/{cache_id}", params=params, headers={"Range": "bytes=1000-1999"}
+        ) as resp:
+            assert resp.status == 206
+            assert resp.headers["Content-Range"] == f"bytes 1000-1999/{len(content)}"
+            assert await resp.read() == content[1000:2000]
+
+        async with session.get(
+            f"{base_url}/stream/{cache_id}", params=params, headers={"Range": "bytes=-500"}
+        ) as resp:
+            assert resp.status == 206
+            assert await resp.read() == content[-500:]
+
+        # Revalidation: an unchanged file is not sent again
+        async with session.get(
+            f"{base_url}/download/{cache_id}", params=params, headers={"If-None-Match": etag}
+        ) as resp:
+            assert resp.status == 304
+            assert await resp.read() == b""
+
+        async with session.get(
+            f"{base_url}/download/{restricted.data['cache_id']}", params=params
+        ) as resp:
+            assert resp.status == 403
+
+        async with session.get(f"{base_url}/download/missing", params=params) as resp:
+            assert resp.status == 404